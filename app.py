@@ -1,9 +1,16 @@
+import atexit
+import os
 import dash
+import pandas as pd
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output, State, ctx, no_update, callback
 from flask import Flask
 from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user
 
+# 📌 Copy-on-Write de pandas: los callbacks reciben vistas del frame compartido
+# de utils.data_store, que copian sus datos solo si se las modifica
+pd.set_option("mode.copy_on_write", True)
+
 # 📌 Inicializar Flask
 server = Flask(__name__)
 server.secret_key = 'tu_clave_secreta'
@@ -42,6 +49,11 @@ app = dash.Dash(
 # Ahora importamos las páginas después de instanciar la app
 from pages import home, performance, gps
 
+# 📌 Conexiones con Ollama compartidas: se abren al iniciar y se cierran al salir
+from utils.ollama_integration import conexion as conexion_ollama
+conexion_ollama.start()
+atexit.register(conexion_ollama.close)
+
 # 📌 Layout de Login Mejorado
 def get_login_layout():
     return html.Div([
@@ -222,4 +234,7 @@ def toggle_navbar_collapse(n, is_open):
 
 # 🚀 Ejecutar la aplicación
 if __name__ == '__main__':
+    # Con debug=True atiende el proceso hijo del recargador: la ingesta corre ahí
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        gps.iniciar_ingesta_gps()
     app.run_server(debug=True, port=8060)  # Cambiado de 8050 a 8060
\ No newline at end of file
@@ -0,0 +1,187 @@
+# batch_reports.py
+"""
+Generación por lotes de los informes PDF de GPS y Performance.
+
+Arma un informe por cada equipo, cada posición dentro de un equipo y cada
+jugador (los mismos que se descargan desde el dashboard), en paralelo en
+todos los núcleos, y los escribe en un directorio junto con `manifest.json`.
+Los informes que ya estaban en la caché de informes se copian sin volver a
+generarlos, y los nuevos quedan en ella para las descargas del dashboard.
+
+    python batch_reports.py informes/
+    python batch_reports.py informes/ --pagina gps --niveles equipo posicion
+    python batch_reports.py informes/ --pagina performance --metrica resistencia --desde 2025-01-01 --hasta 2025-01-31
+"""
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import re
+import time
+import unicodedata
+
+# El lote no vigila data/incoming
+os.environ.setdefault("DASHBOARD_INGESTA", "0")
+
+NIVELES = ["equipo", "posicion", "jugador"]
+
+
+def nombre_seguro(*partes):
+    """Nombre de archivo sin acentos ni caracteres especiales."""
+    texto = "_".join(str(parte) for parte in partes)
+    texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Za-z0-9]+", "_", texto).strip("_").lower()
+
+
+def selecciones(indice, columnas, division, niveles):
+    """
+    Combinaciones (equipo, posición, jugador) a informar según los niveles pedidos.
+
+    Args:
+        indice: FilterIndex de la página
+        columnas: Columnas de equipo, posición y jugador del índice
+        division: División elegida ("Todas" para todas)
+        niveles: Subconjunto de NIVELES
+    """
+    col_equipo, col_posicion, col_jugador = columnas
+    for equipo in indice.options(col_equipo, division):
+        if "equipo" in niveles:
+            yield equipo, "Todas", "Todos"
+        for posicion in indice.options(col_posicion, division, equipo):
+            if "posicion" in niveles:
+                yield equipo, posicion, "Todos"
+            if "jugador" in niveles:
+                for jugador in indice.options(col_jugador, division, equipo, posicion):
+                    yield equipo, posicion, jugador
+
+
+def tareas_gps(division, niveles):
+    """Informes de la página GPS: (nombre, filtros, clave de caché, argumentos)."""
+    from pages import gps
+
+    huella = gps.gps_store.fingerprint()
+    columnas = gps.COLUMNAS_DIMENSION_GPS[1:]
+    for equipo, posicion, jugador in selecciones(gps.obtener_indice_gps(), columnas, division, niveles):
+        filtros = (division, equipo, posicion, jugador)
+        clave_datos = gps.clave_filtros_gps(*filtros)
+        yield dict(
+            pagina="gps",
+            archivo=f"gps_{nombre_seguro(equipo, posicion, jugador)}.pdf",
+            filtros=dict(division=division, equipo=equipo, posicion=posicion, jugador=jugador),
+            cache=gps.informes_gps,
+            huella=huella,
+            clave=[clave_datos, *filtros],
+            construir=gps.informe_gps,
+            argumentos=lambda clave_datos=clave_datos, filtros=filtros: gps.argumentos_informe_gps(clave_datos, *filtros),
+        )
+
+
+def tareas_performance(division, niveles, metrica, desde, hasta):
+    """Informes de la página Performance: (nombre, filtros, clave de caché, argumentos)."""
+    from pages import performance
+
+    df = performance.cargar_datos_performance()
+    if df.empty:
+        return
+    if not (desde and hasta):
+        _, _, inicio, fin = performance.rango_fechas_inicial(df)
+        desde, hasta = desde or inicio.isoformat(), hasta or fin.isoformat()
+
+    huella = performance.performance_store.fingerprint()
+    columnas = performance.COLUMNAS_DIMENSION_PERFORMANCE[1:]
+    for equipo, posicion, jugador in selecciones(performance.obtener_indice_performance(), columnas, division, niveles):
+        filtros = (division, equipo, posicion, jugador)
+        clave_datos = performance.clave_filtros_performance(*filtros, desde, hasta)
+        yield dict(
+            pagina="performance",
+            archivo=f"performance_{nombre_seguro(metrica, equipo, posicion, jugador)}.pdf",
+            filtros=dict(division=division, equipo=equipo, posicion=posicion, jugador=jugador,
+                         metrica=metrica, desde=desde, hasta=hasta),
+            cache=performance.informes_performance,
+            huella=huella,
+            clave=[clave_datos, *filtros, metrica],
+            construir=performance.informe_performance,
+            argumentos=lambda clave_datos=clave_datos, filtros=filtros: performance.argumentos_informe_performance(
+                clave_datos, *filtros, metrica
+            ),
+        )
+
+
+def generar_lote(salida, paginas, division="Todas", niveles=NIVELES, metrica=None, desde=None, hasta=None, procesos=None):
+    """
+    Genera los informes y escribe el manifiesto.
+
+    Returns:
+        Lista de entradas del manifiesto
+    """
+    import app  # noqa: F401  (registra las páginas de Dash antes de importarlas)
+    from pages import performance
+
+    os.makedirs(salida, exist_ok=True)
+    tareas = []
+    if "gps" in paginas:
+        tareas.extend(tareas_gps(division, niveles))
+    if "performance" in paginas:
+        tareas.extend(tareas_performance(division, niveles, metrica or performance.METRICA_INICIAL, desde, hasta))
+
+    manifiesto = []
+    inicio = time.perf_counter()
+
+    def escribir(tarea, contenido, desde_cache):
+        with open(os.path.join(salida, tarea["archivo"]), "wb") as f:
+            f.write(contenido)
+        manifiesto.append(dict(archivo=tarea["archivo"], pagina=tarea["pagina"], **tarea["filtros"],
+                               bytes=len(contenido), desde_cache=desde_cache, estado="ok"))
+
+    # spawn: los procesos no heredan el servidor de Dash ni sus hilos
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=procesos or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        pendientes = {}
+        for tarea in tareas:
+            contenido = tarea["cache"].get(tarea["huella"], tarea["clave"])
+            if contenido is not None:
+                escribir(tarea, contenido, desde_cache=True)
+                continue
+            # Los datos se filtran aquí y el documento se arma en otro núcleo
+            pendientes[pool.submit(tarea["construir"], *tarea["argumentos"]())] = tarea
+
+        for futuro in concurrent.futures.as_completed(pendientes):
+            tarea = pendientes[futuro]
+            try:
+                contenido = futuro.result()
+            except Exception as e:
+                print(f"Error al generar {tarea['archivo']}: {e}")
+                manifiesto.append(dict(archivo=tarea["archivo"], pagina=tarea["pagina"], **tarea["filtros"],
+                                       estado="error", error=str(e)))
+                continue
+            tarea["cache"].put(tarea["huella"], tarea["clave"], contenido)
+            escribir(tarea, contenido, desde_cache=False)
+
+    manifiesto.sort(key=lambda entrada: entrada["archivo"])
+    segundos = time.perf_counter() - inicio
+    with open(os.path.join(salida, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(dict(generado=time.strftime("%Y-%m-%d %H:%M:%S"), segundos=round(segundos, 2),
+                       informes=manifiesto), f, ensure_ascii=False, indent=2)
+
+    errores = sum(entrada["estado"] == "error" for entrada in manifiesto)
+    print(f"{len(manifiesto)} informes en {segundos:.1f} s ({errores} con error) -> {salida}")
+    return manifiesto
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera los informes PDF por equipo, posición y jugador")
+    parser.add_argument("salida", help="Directorio donde se escriben los PDF y manifest.json")
+    parser.add_argument("--pagina", nargs="+", choices=["gps", "performance"], default=["gps", "performance"])
+    parser.add_argument("--niveles", nargs="+", choices=NIVELES, default=NIVELES,
+                        help="Informes por equipo, por posición dentro del equipo y/o por jugador")
+    parser.add_argument("--division", default="Todas")
+    parser.add_argument("--metrica", help="Métrica de los informes de performance (por defecto la del dashboard)")
+    parser.add_argument("--desde", help="Fecha inicial de performance (YYYY-MM-DD; por defecto el último mes)")
+    parser.add_argument("--hasta", help="Fecha final de performance (YYYY-MM-DD)")
+    parser.add_argument("--procesos", type=int, help="Procesos en paralelo (por defecto uno por núcleo)")
+    args = parser.parse_args()
+
+    generar_lote(args.salida, args.pagina, args.division, args.niveles, args.metrica, args.desde, args.hasta, args.procesos)
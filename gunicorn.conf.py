@@ -0,0 +1,21 @@
+# gunicorn.conf.py
+# Configuración de producción: gunicorn wsgi:server
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8060')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", min(4, multiprocessing.cpu_count())))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+# Cargar la app una sola vez en el proceso principal (datos, índices y figuras
+# precalentadas) y heredarla en cada worker al hacer fork
+preload_app = True
+
+# Las exportaciones a PDF con análisis de IA pueden tardar
+timeout = 120
+
+
+def post_fork(server, worker):
+    """La vigilancia de data/incoming corre en los workers, no en el proceso principal."""
+    from pages.gps import iniciar_ingesta_gps
+    iniciar_ingesta_gps()
@@ -1,17 +1,28 @@
 import dash
-from dash import html, dcc, Input, Output, State, callback, dash_table
+from dash import html, dcc, Input, Output, State, callback, dash_table, ctx, no_update
 import dash_bootstrap_components as dbc
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objs as go
-import numpy as np
 from dash.exceptions import PreventUpdate
 import os
-from datetime import datetime
-import io
+import time
 from utils.ollama_integration import OllamaAnalysis
-from dash.dependencies import Input, Output, State, ALL, MATCH
-import asyncio
+from utils.data_store import DataStore
+from utils.shared_frame import desde_entorno
+from utils.columnar_cache import cargar_con_cache, guardar_cache, ruta_cache
+from utils.incoming_watcher import IncomingWatcher
+from utils.chunked_csv import leer_csv_por_bloques
+from utils.gps_schema import COLUMNAS_DASHBOARD_GPS, dtypes_lectura, formatos_fecha
+from utils.filter_index import FilterIndex
+from utils.filter_engine import FilterEngine
+from utils.aggregate_cube import AggregateCube
+from utils.result_cache import ResultCache
+from utils.figure_cache import FigureCache
+from utils.figure_builders import figura_vacia, grafico_barras
+from utils.job_queue import JobQueue, LISTO, ERROR, descarga
+from utils.report_cache import ReportCache
+from utils.pdf_reports import FORMATO_INFORMES, informe_gps, nombre_archivo
+from utils import datatable_query
+from dash.dependencies import Input, Output, State, ALL
 import traceback
 
 # Registrar esta página
@@ -22,104 +33,272 @@ dash.register_page(
     name='GPS'
 )
 
+# Columnas de texto que se usan como dimensiones de filtrado
+COLUMNAS_DIMENSION_GPS = ['division', 'team_name', 'position_name', 'athlete_name']
+
+# Columnas de gps_full.csv que usa el dashboard, con los tipos del esquema GPS
+COLUMNAS_GPS = dtypes_lectura(COLUMNAS_DASHBOARD_GPS)
+FECHAS_GPS = formatos_fecha(COLUMNAS_DASHBOARD_GPS)
+
+def leer_csv_gps(path):
+    """Lee el CSV de GPS por bloques, solo con las columnas y dtypes declarados"""
+    return leer_csv_por_bloques(path, COLUMNAS_GPS, FECHAS_GPS)
+
+# Métricas pre-agregadas en el cubo para los gráficos por posición
+METRICAS_CUBO_GPS = ['max_vel', 'total_player_load', 'total_distance']
+
+# Almacén compartido por todos los callbacks del proceso (y entre workers si
+# DASHBOARD_MEMORIA_COMPARTIDA=1)
+gps_store = DataStore(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'gps_full.csv'),
+    lambda path: cargar_con_cache(path, leer_csv_gps, columnas=COLUMNAS_GPS),
+    compartido=desde_entorno('gps')
+)
+
 def cargar_datos_gps():
-    """Carga y preprocesa los datos de GPS"""
-    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
-    
+    """Devuelve los datos de GPS (tipados según utils.gps_schema) desde el almacén en memoria"""
     try:
-        # Cargar CSV
-        df = pd.read_csv(os.path.join(data_dir, 'gps_full.csv'))
-        
-        # Convertir columnas de fecha
-        df['date'] = pd.to_datetime(df['date'], errors='coerce')
-        
-        return df
+        return gps_store.get()
     except Exception as e:
         print(f"Error al cargar los datos GPS: {e}")
         return pd.DataFrame()
 
-def filtrar_dataframe_gps(df, division=None, team=None, position=None, player=None):
-    """Filtra el DataFrame según los criterios seleccionados"""
+def construir_motor_gps(df):
+    """Motor de filtrado por índices invertidos de un frame GPS"""
+    return FilterEngine(df, COLUMNAS_DIMENSION_GPS, columna_fecha='date')
+
+def obtener_motor_gps():
+    """Devuelve el motor de filtrado por índices invertidos de los datos GPS"""
+    return gps_store.derived('motor_filtros', construir_motor_gps)
+
+def filtrar_dataframe_gps(df, division=None, team=None, position=None, player=None, motor=None):
+    """Filtra el DataFrame según los criterios seleccionados (con el motor de su misma versión)"""
+    if df.empty:
+        return df
+    
+    motor = motor if motor is not None else obtener_motor_gps()
+    if motor.n_filas != len(df):
+        raise ValueError("El DataFrame no corresponde a los datos del almacén GPS")
+    
+    filas = motor.filter({
+        'division': division,
+        'team_name': team,
+        'position_name': position,
+        'athlete_name': player
+    })
+    
+    # Sin filtros se devuelve la vista completa; si no, solo se copian las filas elegidas
+    return df if filas is None else df.take(filas)
+
+# Resultados filtrados en el servidor; el dcc.Store solo guarda su clave
+resultados_gps = ResultCache(max_entries=32)
+
+# Figuras ya serializadas por selección de filtros
+figuras_gps = FigureCache(max_entries=128)
+
+# Informes PDF y análisis de Ollama en segundo plano, y los informes ya generados por versión de los datos y filtros
+trabajos_pdf_gps = JobQueue()
+trabajos_analisis_gps = JobQueue(max_hilos=8)
+# Con DASHBOARD_PDF_OLLAMA=1 los informes llevan los análisis de Ollama en lugar de los automáticos
+ANALISIS_OLLAMA_PDF = os.environ.get("DASHBOARD_PDF_OLLAMA", "0") == "1"
+informes_gps = ReportCache(f"gps_v{FORMATO_INFORMES}{'_ollama' if ANALISIS_OLLAMA_PDF else ''}")
+
+# Al recargar los datos se descartan los resultados y figuras anteriores
+gps_store.on_reload(resultados_gps.clear)
+gps_store.on_reload(figuras_gps.clear)
+# Los datos de ejemplo no recortan la caché: cada proceso los genera por su cuenta
+gps_store.on_reload(lambda: None if gps_store.is_fallback() else informes_gps.prune(gps_store.fingerprint()))
+
+def obtener_filtrado_gps(division=None, team=None, position=None, player=None):
+    """Devuelve los datos GPS filtrados, reutilizando resultados ya calculados"""
+    # Frame, versión y motor de una misma versión, aunque el vigilante agregue filas entre medio
+    try:
+        df, version, motor = gps_store.snapshot('motor_filtros', construir_motor_gps)
+    except Exception as e:
+        print(f"Error al cargar los datos GPS: {e}")
+        return pd.DataFrame()
     if df.empty:
         return df
+    
+    return resultados_gps.get_or_compute(
+        (version, division, team, position, player),
+        lambda: filtrar_dataframe_gps(df, division, team, position, player, motor=motor)
+    )
+
+def clave_filtros_gps(division, team, position, player):
+    """Clave liviana que identifica una selección de filtros GPS en el dcc.Store"""
+    return {"pagina": "gps", "filtros": [division, team, position, player]}
+
+def resolver_datos_gps(clave):
+    """Devuelve el DataFrame filtrado que corresponde a una clave del dcc.Store"""
+    if not clave:
+        return pd.DataFrame()
+    return obtener_filtrado_gps(*clave["filtros"])
+
+# Columnas de la tabla de jugadores: columna del DataFrame -> encabezado
+COLUMNAS_TABLA_GPS = {
+    'athlete_name': 'Jugador',
+    'position_name': 'Posición',
+    'team_name': 'Equipo',
+    'max_vel': 'Vel. Máx. (km/h)',
+    'total_distance': 'Distancia (m)',
+    'total_player_load': 'Player Load'
+}
+
+def obtener_tabla_gps(division=None, team=None, position=None, player=None):
+    """Devuelve la tabla de jugadores ya formateada para la selección de filtros"""
+    def construir():
+        filtered_df = obtener_filtrado_gps(division, team, position, player)
+        if filtered_df.empty:
+            return pd.DataFrame(columns=list(COLUMNAS_TABLA_GPS.values()))
+        
+        table_df = filtered_df[list(COLUMNAS_TABLA_GPS)].rename(columns=COLUMNAS_TABLA_GPS)
         
-    filtered_df = df.copy()
+        # Las dimensiones pasan a texto para filtrar y ordenar como strings
+        for col in ['Jugador', 'Posición', 'Equipo']:
+            table_df[col] = table_df[col].astype(object)
+        
+        # Formatear valores numéricos
+        for col in ['Vel. Máx. (km/h)', 'Distancia (m)', 'Player Load']:
+            table_df[col] = table_df[col].astype(float).round(1)
+        
+        return table_df
+    
+    return resultados_gps.get_or_compute(
+        ('tabla', gps_store.version, division, team, position, player),
+        construir
+    )
+
+def figuras_por_posicion_gps(division=None, team=None, position=None, player=None):
+    """Gráficos de velocidad y player load por posición (reutilizados si la selección ya se vio)"""
+    filtros = (gps_store.version, division, team, position, player)
+    velocidad_fig = figuras_gps.get_or_build(
+        ('velocidad',) + filtros,
+        lambda: generar_grafico_velocidad_posicion(medias_por_posicion_gps(division, team, position, player))
+    )
+    player_load_fig = figuras_gps.get_or_build(
+        ('player_load',) + filtros,
+        lambda: generar_grafico_player_load(medias_por_posicion_gps(division, team, position, player))
+    )
+    return velocidad_fig, player_load_fig
+
+def obtener_cubo_gps():
+    """Devuelve el cubo de sumas y conteos por (dimensiones, fecha) de los datos GPS"""
+    return gps_store.derived(
+        'cubo',
+        lambda df: AggregateCube(df, COLUMNAS_DIMENSION_GPS, 'date', METRICAS_CUBO_GPS)
+    )
+
+def medias_por_posicion_gps(division=None, team=None, position=None, player=None):
+    """Calcula las medias por posición de la selección a partir del cubo"""
+    return obtener_cubo_gps().means(
+        {
+            'division': division,
+            'team_name': team,
+            'position_name': position,
+            'athlete_name': player
+        },
+        por='position_name'
+    )
+
+# Columnas que identifican una fila de sesión (para descartar repetidas)
+COLUMNAS_SESION_GPS = ['activity_id', 'athlete_id', 'period_name']
+
+# Directorio donde el staff deja los exports nuevos de Catapult
+DIRECTORIO_INCOMING_GPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'incoming')
+
+def ingerir_archivo_gps(path):
+    """
+    Valida un export de sesión, descarta las filas ya cargadas y agrega el
+    resto al CSV y al almacén en memoria sin recargar todo el archivo.
     
-    if division and division != "Todas":
-        filtered_df = filtered_df[filtered_df['division'] == division]
+    Returns:
+        Cantidad de filas agregadas
+    """
+    encabezado = list(pd.read_csv(gps_store.path, nrows=0).columns)
+    
+    # Texto crudo para escribir el CSV tal cual; versión tipada para la memoria
+    crudo = pd.read_csv(path, dtype=str, keep_default_na=False)
+    faltantes = [col for col in encabezado if col not in crudo.columns]
+    if faltantes:
+        detalle = ', '.join(faltantes[:5]) + ('...' if len(faltantes) > 5 else '')
+        raise ValueError(f"Faltan {len(faltantes)} columnas en {os.path.basename(path)}: {detalle}")
+    crudo = crudo[encabezado]
+    
+    nuevas = leer_csv_gps(path)
+    if nuevas['date'].isna().any():
+        raise ValueError(f"Hay fechas inválidas en {os.path.basename(path)}")
     
-    if team and team != "Todos":
-        filtered_df = filtered_df[filtered_df['team_name'] == team]
+    # Descartar filas repetidas dentro del archivo o ya presentes en el almacén
+    df = gps_store.get()
+    claves = pd.MultiIndex.from_frame(crudo[COLUMNAS_SESION_GPS])
+    existentes = pd.MultiIndex.from_frame(df[COLUMNAS_SESION_GPS].astype(object))
+    nuevas_filas = ~(claves.duplicated() | claves.isin(existentes))
     
-    if position and position != "Todas":
-        filtered_df = filtered_df[filtered_df['position_name'] == position]
+    if not nuevas_filas.any():
+        print(f"{os.path.basename(path)}: sin filas nuevas")
+        return 0
     
-    if player and player != "Todos":
-        filtered_df = filtered_df[filtered_df['athlete_name'] == player]
+    def persistir():
+        # Asegurar que el CSV termina en salto de línea antes de agregar
+        with open(gps_store.path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) not in (b'\n', b'\r'):
+                f.write(b'\n')
+        crudo[nuevas_filas].to_csv(gps_store.path, mode='a', header=False, index=False)
     
-    return filtered_df
+    gps_store.append(nuevas[nuevas_filas], persistir=persistir)
+    
+    # Mantener vigente la caché columnar para el próximo arranque
+    try:
+        guardar_cache(gps_store.get(), ruta_cache(gps_store.path))
+    except Exception as e:
+        print(f"Error al actualizar la caché columnar: {e}")
+    
+    print(f"{os.path.basename(path)}: {int(nuevas_filas.sum())} filas nuevas de {len(crudo)}")
+    return int(nuevas_filas.sum())
 
-def generar_grafico_velocidad_posicion(df):
-    """Genera un gráfico de velocidad máxima por posición"""
-    if df.empty:
+# Los exports nuevos se incorporan solos. La vigilancia no arranca al importar
+# (con preload_app el import ocurre en el proceso principal de gunicorn): la
+# inicia cada worker con iniciar_ingesta_gps y solo uno de ellos ingiere
+vigilante_gps = IncomingWatcher(DIRECTORIO_INCOMING_GPS, ingerir_archivo_gps)
+
+def iniciar_ingesta_gps():
+    """Inicia la vigilancia de data/incoming en este proceso (DASHBOARD_INGESTA=0 la desactiva)."""
+    if os.environ.get("DASHBOARD_INGESTA", "1") == "1":
+        vigilante_gps.start()
+
+def generar_grafico_velocidad_posicion(pos_data):
+    """Genera un gráfico de velocidad máxima por posición a partir de las medias por posición"""
+    if pos_data.empty:
         # Devolver un gráfico vacío
-        fig = go.Figure()
-        fig.update_layout(
-            title="No hay datos disponibles",
-            xaxis_title="",
-            yaxis_title=""
-        )
-        return fig
-    
-    # Agrupar por posición
-    pos_data = df.groupby('position_name').agg({
-        'max_vel': 'mean'
-    }).reset_index()
+        return figura_vacia()
     
     # Crear gráfico de barras
-    fig = px.bar(
-        pos_data,
-        x='position_name',
-        y='max_vel',
-        title='Velocidad Máxima Promedio por Posición',
-        labels={'position_name': 'Posición', 'max_vel': 'Velocidad Máxima (km/h)'},
-        color='max_vel',
-        color_continuous_scale=px.colors.sequential.Viridis
+    return grafico_barras(
+        pos_data['position_name'],
+        pos_data['max_vel'],
+        titulo='Velocidad Máxima Promedio por Posición',
+        titulo_x='Posición',
+        titulo_y='Velocidad Máxima (km/h)',
+        escala_colores='Viridis'
     )
-    
-    fig.update_layout(height=500)
-    return fig
 
-def generar_grafico_player_load(df):
-    """Genera un gráfico de player load por posición"""
-    if df.empty:
+def generar_grafico_player_load(pos_data):
+    """Genera un gráfico de player load por posición a partir de las medias por posición"""
+    if pos_data.empty:
         # Devolver un gráfico vacío
-        fig = go.Figure()
-        fig.update_layout(
-            title="No hay datos disponibles",
-            xaxis_title="",
-            yaxis_title=""
-        )
-        return fig
-    
-    # Agrupar por posición
-    pos_data = df.groupby('position_name').agg({
-        'total_player_load': 'mean'
-    }).reset_index()
+        return figura_vacia()
     
     # Crear gráfico de barras
-    fig = px.bar(
-        pos_data,
-        x='position_name',
-        y='total_player_load',
-        title='Player Load Promedio por Posición',
-        labels={'position_name': 'Posición', 'total_player_load': 'Player Load'},
-        color='total_player_load',
-        color_continuous_scale=px.colors.sequential.Bluered
+    return grafico_barras(
+        pos_data['position_name'],
+        pos_data['total_player_load'],
+        titulo='Player Load Promedio por Posición',
+        titulo_x='Posición',
+        titulo_y='Player Load',
+        escala_colores='Bluered'
     )
-    
-    fig.update_layout(height=500)
-    return fig
 
 # Layout principal del dashboard
 layout = dbc.Container([
@@ -186,7 +365,13 @@ layout = dbc.Container([
                                     color="danger",
                                     className="w-100 mt-3"
                                 ),
-                                dcc.Download(id="download-pdf-gps")
+                                dcc.Download(id="download-pdf-gps"),
+                                # Avance del informe en segundo plano
+                                dcc.Store(id="pdf-job-gps"),
+                                dcc.Interval(id="pdf-job-interval-gps", interval=1000, disabled=True),
+                                dbc.Progress(id="pdf-progress-gps", value=0, striped=True, animated=True,
+                                             className="mt-2", style={"display": "none"}),
+                                html.Div(id="pdf-error-gps", className="text-danger small mt-2")
                             ], width={"size": 3, "offset": 9})
                         ], className="mt-3")
                     ])
@@ -232,6 +417,7 @@ layout = dbc.Container([
                 dbc.CardBody([
                     dash_table.DataTable(
                         id='jugadores-table',
+                        columns=[{"name": col, "id": col} for col in COLUMNAS_TABLA_GPS.values()],
                         style_table={'overflowX': 'auto'},
                         style_cell={
                             'textAlign': 'left',
@@ -241,10 +427,15 @@ layout = dbc.Container([
                             'backgroundColor': 'rgb(230, 230, 230)',
                             'fontWeight': 'bold'
                         },
-                        filter_action="native",
-                        sort_action="native",
+                        # Paginado, filtrado y orden se resuelven en el servidor
+                        page_action="custom",
+                        page_current=0,
+                        page_size=10,
+                        filter_action="custom",
+                        filter_query="",
+                        sort_action="custom",
                         sort_mode="multi",
-                        page_size=10
+                        sort_by=[]
                     )
                 ])
             ])
@@ -271,7 +462,9 @@ layout = dbc.Container([
                             " Generando análisis... Por favor espere."
                         ], style={"display": "none"})
                     ]),
-                    html.Div(id="analysis-content", className="mt-3")
+                    html.Div(id="analysis-content", className="mt-3"),
+                    dcc.Store(id="analysis-job-gps"),
+                    dcc.Interval(id="analysis-job-interval-gps", interval=400, disabled=True)
                 ])
             ])
         ], md=12, className="mb-4")
@@ -281,6 +474,34 @@ layout = dbc.Container([
     html.Div(id="_gps", style={"display": "none"})
 ], fluid=True)
 
+def obtener_indice_gps():
+    """Devuelve el índice de filtros en cascada de los datos GPS"""
+    try:
+        return gps_store.derived(
+            'indice_filtros',
+            lambda df: FilterIndex(df, COLUMNAS_DIMENSION_GPS)
+        )
+    except Exception as e:
+        print(f"Error al construir el índice de filtros GPS: {e}")
+        return None
+
+# Selección con la que abre la página (ver los callbacks de filtros en cascada)
+FILTROS_INICIALES_GPS = ("Todas", "Todos", "Todas", "Todos")
+
+def precalentar_gps():
+    """
+    Carga los datos, construye los índices y el cubo y deja en caché las
+    figuras y la tabla de la vista inicial, para que la primera visita no
+    pague ese costo.
+    """
+    if cargar_datos_gps().empty:
+        return
+    obtener_indice_gps()
+    obtener_motor_gps()
+    obtener_cubo_gps()
+    figuras_por_posicion_gps(*FILTROS_INICIALES_GPS)
+    obtener_tabla_gps(*FILTROS_INICIALES_GPS)
+
 # Cargar opciones de filtros iniciales
 @callback(
     [Output("division-filter-gps", "options"),
@@ -288,14 +509,14 @@ layout = dbc.Container([
     [Input("_gps", "children")]
 )
 def inicializar_filtros_gps(_):
-    df = cargar_datos_gps()
+    indice = obtener_indice_gps()
     
-    if df.empty:
+    if indice is None:
         return [], None
     
     # Opciones para divisiones
     divisiones = [{"label": "Todas", "value": "Todas"}] + [
-        {"label": div, "value": div} for div in sorted(df['division'].unique()) if pd.notna(div)
+        {"label": div, "value": div} for div in indice.options('division')
     ]
     
     return divisiones, "Todas"
@@ -308,17 +529,13 @@ def inicializar_filtros_gps(_):
     prevent_initial_call=True
 )
 def actualizar_equipos_gps(division):
-    df = cargar_datos_gps()
+    indice = obtener_indice_gps()
     
-    if df.empty:
+    if indice is None:
         return [], None
     
-    filtered_df = df.copy()
-    if division and division != "Todas":
-        filtered_df = filtered_df[filtered_df['division'] == division]
-    
     equipos = [{"label": "Todos", "value": "Todos"}] + [
-        {"label": team, "value": team} for team in sorted(filtered_df['team_name'].unique()) if pd.notna(team)
+        {"label": team, "value": team} for team in indice.options('team_name', division)
     ]
     
     return equipos, "Todos"
@@ -332,20 +549,13 @@ def actualizar_equipos_gps(division):
     prevent_initial_call=True
 )
 def actualizar_posiciones_gps(division, team):
-    df = cargar_datos_gps()
+    indice = obtener_indice_gps()
     
-    if df.empty:
+    if indice is None:
         return [], None
     
-    filtered_df = df.copy()
-    if division and division != "Todas":
-        filtered_df = filtered_df[filtered_df['division'] == division]
-    
-    if team and team != "Todos":
-        filtered_df = filtered_df[filtered_df['team_name'] == team]
-    
     posiciones = [{"label": "Todas", "value": "Todas"}] + [
-        {"label": pos, "value": pos} for pos in sorted(filtered_df['position_name'].unique()) if pd.notna(pos)
+        {"label": pos, "value": pos} for pos in indice.options('position_name', division, team)
     ]
     
     return posiciones, "Todas"
@@ -360,50 +570,57 @@ def actualizar_posiciones_gps(division, team):
     prevent_initial_call=True
 )
 def actualizar_jugadores_gps(division, team, position):
-    df = cargar_datos_gps()
+    indice = obtener_indice_gps()
     
-    if df.empty:
+    if indice is None:
         return [], None
     
-    filtered_df = df.copy()
-    if division and division != "Todas":
-        filtered_df = filtered_df[filtered_df['division'] == division]
-    
-    if team and team != "Todos":
-        filtered_df = filtered_df[filtered_df['team_name'] == team]
-    
-    if position and position != "Todas":
-        filtered_df = filtered_df[filtered_df['position_name'] == position]
-    
     jugadores = [{"label": "Todos", "value": "Todos"}] + [
-        {"label": player, "value": player} for player in sorted(filtered_df['athlete_name'].unique()) if pd.notna(player)
+        {"label": player, "value": player} for player in indice.options('athlete_name', division, team, position)
     ]
     
     return jugadores, "Todos"
 
-# Actualizar datos filtrados y componentes
+# Entradas de filtrado comunes a los callbacks de la página
+ENTRADAS_FILTROS_GPS = [
+    Input("division-filter-gps", "value"),
+    Input("team-filter-gps", "value"),
+    Input("position-filter-gps", "value"),
+    Input("player-filter-gps", "value")
+]
+
+# Actualizar la clave de los datos filtrados
 @callback(
-    [Output("filtered-data-gps", "data"),
-     Output("velocidad-plot", "figure"),
-     Output("player-load-plot", "figure"),
-     Output("kpi-cards-row-gps", "children"),
-     Output("jugadores-table", "data"),
-     Output("jugadores-table", "columns")],
-    [Input("division-filter-gps", "value"),
-     Input("team-filter-gps", "value"),
-     Input("position-filter-gps", "value"),
-     Input("player-filter-gps", "value")]
+    Output("filtered-data-gps", "data"),
+    ENTRADAS_FILTROS_GPS
 )
 def actualizar_datos_gps(division, team, position, player):
-    # Cargar y filtrar datos
-    df = cargar_datos_gps()
+    # Cadena vacía en lugar de None cuando no hay datos
+    if cargar_datos_gps().empty:
+        return ""
+    return clave_filtros_gps(division, team, position, player)
+
+# Gráficos por posición
+@callback(
+    [Output("velocidad-plot", "figure"),
+     Output("player-load-plot", "figure")],
+    ENTRADAS_FILTROS_GPS
+)
+def actualizar_graficos_gps(division, team, position, player):
+    if cargar_datos_gps().empty:
+        empty_fig = figura_vacia()
+        return empty_fig, empty_fig
     
-    if df.empty:
-        # Valores por defecto si no hay datos
-        empty_fig = go.Figure()
-        empty_fig.update_layout(title="No hay datos disponibles")
-        
-        empty_kpis = [
+    return figuras_por_posicion_gps(division, team, position, player)
+
+# Tarjetas KPI
+@callback(
+    Output("kpi-cards-row-gps", "children"),
+    ENTRADAS_FILTROS_GPS
+)
+def actualizar_kpis_gps(division, team, position, player):
+    if cargar_datos_gps().empty:
+        return [
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
@@ -412,16 +629,8 @@ def actualizar_datos_gps(division, team, position, player):
                 ])
             ], md=12)
         ]
-        
-        # Importante: Asegurarse de que todos los outputs son del tipo correcto
-        return "", empty_fig, empty_fig, empty_kpis, [], []  # Cadena vacía en lugar de None para data
     
-    # Filtrar datos
-    filtered_df = filtrar_dataframe_gps(df, division, team, position, player)
-    
-    # Generar gráficos
-    velocidad_fig = generar_grafico_velocidad_posicion(filtered_df)
-    player_load_fig = generar_grafico_player_load(filtered_df)
+    filtered_df = obtener_filtrado_gps(division, team, position, player)
     
     # Calcular KPIs
     try:
@@ -437,7 +646,7 @@ def actualizar_datos_gps(division, team, position, player):
         distance_prom = 0
     
     # Crear tarjetas KPI
-    kpi_cards = [
+    return [
         dbc.Col([
             dbc.Card([
                 dbc.CardBody([
@@ -474,30 +683,33 @@ def actualizar_datos_gps(division, team, position, player):
             ], className="text-center")
         ], md=3)
     ]
+
+# Página visible de la tabla de jugadores
+@callback(
+    [Output("jugadores-table", "data"),
+     Output("jugadores-table", "page_count"),
+     Output("jugadores-table", "page_current")],
+    [Input("filtered-data-gps", "data"),
+     Input("jugadores-table", "page_current"),
+     Input("jugadores-table", "page_size"),
+     Input("jugadores-table", "sort_by"),
+     Input("jugadores-table", "filter_query")]
+)
+def actualizar_tabla_gps(clave_datos, page_current, page_size, sort_by, filter_query):
+    # Una selección o un filtro de tabla nuevos vuelven a la primera página
+    if ctx.triggered_id is None or ctx.triggered_prop_ids.keys() & {"filtered-data-gps.data", "jugadores-table.filter_query"}:
+        page_current = 0
     
-    # Preparar datos para la tabla
-    if filtered_df.empty:
-        table_data = []
-        table_columns = []
-    else:
-        # Seleccionar columnas relevantes para la tabla
-        cols = ['athlete_name', 'position_name', 'team_name', 'max_vel', 'total_distance', 'total_player_load']
-        table_df = filtered_df[cols].copy()
-        
-        # Renombrar columnas para mejor visualización
-        table_df.columns = ['Jugador', 'Posición', 'Equipo', 'Vel. Máx. (km/h)', 'Distancia (m)', 'Player Load']
-        
-        # Formatear valores numéricos
-        for col in ['Vel. Máx. (km/h)', 'Distancia (m)', 'Player Load']:
-            if col in table_df.columns:
-                table_df[col] = table_df[col].round(1)
-        
-        # Convertir a formato para DataTable
-        table_data = table_df.to_dict('records')
-        table_columns = [{"name": col, "id": col} for col in table_df.columns]
+    if not clave_datos:
+        return [], 1, page_current
     
-    # Devolver todos los outputs asegurando que ninguno es None o un objeto no serializable
-    return filtered_df.to_json(date_format='iso', orient='split'), velocidad_fig, player_load_fig, kpi_cards, table_data if table_data else [], table_columns if table_columns else []
+    try:
+        table_df = obtener_tabla_gps(*clave_datos["filtros"])
+        data, page_count = datatable_query.pagina(table_df, page_current, page_size, filter_query, sort_by)
+        return data, page_count, page_current
+    except Exception as e:
+        print(f"Error al paginar la tabla de jugadores: {e}")
+        return [], 1, page_current
 
 # Función para generar análisis automático basado en datos
 def generar_analisis_automatico(df):
@@ -555,165 +767,131 @@ El monitoreo de la distancia recorrida es esencial para controlar la carga de tr
             "No se pudo generar un análisis automático de distancia."
         )
 
+# Integración con Ollama compartida por todos los callbacks (una conexión con keep-alive por proceso)
+ollama_gps = OllamaAnalysis(model="deepseek-r1:8b")
+
 # Función que obtiene análisis de Ollama de forma síncrona
 def obtener_analisis_ollama_sincrono(df):
-    """Obtiene análisis de Ollama bloqueando hasta obtener respuesta"""
+    """Obtiene los tres análisis de Ollama bloqueando hasta obtener respuesta (se piden a la vez)"""
     try:
-        # Ollama host - asegúrate de que esta URL sea correcta
-        ollama_host = "http://localhost:11434"
-        # El modelo que ya verificamos que está instalado
-        ollama_model = "deepseek-r1:8b"
-        
-        print(f"Conectando a Ollama en {ollama_host} usando modelo {ollama_model}")
-        
-        # Usamos httpx de forma síncrona para las llamadas
-        import httpx
-        
-        # Verificar la conexión a Ollama con una solicitud simple al modelo
-        # en lugar de usar /api/health que no existe
-        try:
-            with httpx.Client(timeout=30.0) as client:
-                print(f"Probando conexión a Ollama con modelo {ollama_model}...")
-                test_response = client.post(
-                    f"{ollama_host}/api/generate",
-                    json={
-                        "model": ollama_model,
-                        "prompt": "Hola, dame una respuesta corta de una palabra.",
-                        "stream": False
-                    }
-                )
-                
-                if test_response.status_code != 200:
-                    print(f"Error al verificar Ollama: código {test_response.status_code}")
-                    return (
-                        f"No se pudo conectar con el modelo {ollama_model}. Código: {test_response.status_code}",
-                        "Análisis no disponible.",
-                        "Análisis no disponible."
-                    )
-                
-                print("Conexión a Ollama verificada correctamente.")
-        except Exception as e:
-            print(f"Error al conectar con Ollama: {e}")
-            return (
-                f"Error conectando a Ollama: {str(e)}",
-                "Análisis no disponible.",
-                "Análisis no disponible."
-            )
-            
-        # Preparar datos para el análisis (versión simplificada)
-        data_summary = {
-            "total_jugadores": df['athlete_name'].nunique(),
-            "total_registros": len(df),
-            "velocidad_maxima": float(df['max_vel'].max()),
-            "velocidad_promedio": float(df['max_vel'].mean()),
-            "distancia_promedio": float(df['total_distance'].mean()),
-            "player_load_promedio": float(df['total_player_load'].mean())
-        }
-        data_summary_str = str(data_summary)
-        
-        # Crear prompts simples pero efectivos
-        general_prompt = f"""Eres un analista deportivo experto. 
+        return ollama_gps.connection.run(obtener_analisis_ollama(df))
+    except Exception as e:
+        print(f"Error al obtener análisis de Ollama: {e}")
+        print(traceback.format_exc())
+        return (
+            f"Error al conectar con el servicio de análisis: {str(e)}. Verifique que Ollama esté en funcionamiento.",
+            "Análisis de velocidad no disponible.",
+            "Análisis de distancia no disponible."
+        )
+
+async def obtener_analisis_ollama(df):
+    """
+    Pide a Ollama los análisis general, de velocidad y de distancia en paralelo.
+    
+    Tarda lo que la generación más lenta; si alguna falla o supera el tiempo
+    se devuelven las demás y un aviso en su lugar.
+    """
+    ollama = ollama_gps
+    print(f"Conectando a Ollama en {ollama.host} usando modelo {ollama.model}")
+    
+    # Verificar la conexión con /api/tags, que no genera texto
+    error = await ollama.check_health()
+    if error:
+        print(f"Error al verificar Ollama: {error}")
+        return (
+            f"No se pudo conectar con el modelo {ollama.model}. {error}",
+            "Análisis no disponible.",
+            "Análisis no disponible."
+        )
+    
+    # Preparar datos para el análisis (versión simplificada)
+    data_summary = {
+        "total_jugadores": df['athlete_name'].nunique(),
+        "total_registros": len(df),
+        "velocidad_maxima": float(df['max_vel'].max()),
+        "velocidad_promedio": float(df['max_vel'].mean()),
+        "distancia_promedio": float(df['total_distance'].mean()),
+        "player_load_promedio": float(df['total_player_load'].mean())
+    }
+    data_summary_str = str(data_summary)
+    
+    # Crear prompts simples pero efectivos
+    prompts = {
+        "general": f"""Eres un analista deportivo experto. 
 Analiza estos datos GPS de jugadores de fútbol y proporciona un análisis general conciso pero informativo.
 Datos: {data_summary_str}
 Tu análisis debe incluir observaciones sobre velocidad, distancia y rendimiento general.
-"""
-        
-        velocity_prompt = f"""Eres un analista deportivo experto. 
+""",
+        "velocidad": f"""Eres un analista deportivo experto. 
 Analiza específicamente la velocidad en estos datos GPS de jugadores de fútbol.
 Datos: {data_summary_str}
 Proporciona análisis sobre la velocidad máxima, promedios y su importancia en el rendimiento deportivo.
-"""
-        
-        distance_prompt = f"""Eres un analista deportivo experto. 
+""",
+        "distancia": f"""Eres un analista deportivo experto. 
 Analiza específicamente la distancia recorrida en estos datos GPS de jugadores de fútbol.
 Datos: {data_summary_str}
 Proporciona análisis sobre las distancias recorridas y su impacto en el rendimiento y fatiga.
-"""
-        
-        # Realizar llamadas síncronas
-        general_analysis = "No se pudo obtener análisis general."
-        velocity_analysis = "No se pudo obtener análisis de velocidad."
-        distance_analysis = "No se pudo obtener análisis de distancia."
-        
-        with httpx.Client(timeout=60.0) as client:
-            # Análisis general
-            print("Solicitando análisis general...")
-            try:
-                response_general = client.post(
-                    f"{ollama_host}/api/generate",
-                    json={
-                        "model": ollama_model,
-                        "prompt": general_prompt,
-                        "stream": False
-                    },
-                    timeout=30.0
-                )
-                
-                if response_general.status_code == 200:
-                    general_analysis = response_general.json().get("response", "No se pudo obtener un análisis general.")
-                    print("Análisis general recibido correctamente")
-                else:
-                    print(f"Error en respuesta de análisis general: {response_general.status_code}")
-            except Exception as e:
-                print(f"Excepción al solicitar análisis general: {e}")
-            
-            # Análisis de velocidad
-            print("Solicitando análisis de velocidad...")
-            try:
-                response_velocity = client.post(
-                    f"{ollama_host}/api/generate",
-                    json={
-                        "model": ollama_model,
-                        "prompt": velocity_prompt,
-                        "stream": False
-                    },
-                    timeout=30.0
-                )
-                
-                if response_velocity.status_code == 200:
-                    velocity_analysis = response_velocity.json().get("response", "No se pudo obtener un análisis de velocidad.")
-                    print("Análisis de velocidad recibido correctamente")
-                else:
-                    print(f"Error en respuesta de análisis de velocidad: {response_velocity.status_code}")
-            except Exception as e:
-                print(f"Excepción al solicitar análisis de velocidad: {e}")
-            
-            # Análisis de distancia
-            print("Solicitando análisis de distancia...")
-            try:
-                response_distance = client.post(
-                    f"{ollama_host}/api/generate",
-                    json={
-                        "model": ollama_model,
-                        "prompt": distance_prompt,
-                        "stream": False
-                    },
-                    timeout=30.0
-                )
-                
-                if response_distance.status_code == 200:
-                    distance_analysis = response_distance.json().get("response", "No se pudo obtener un análisis de distancia.")
-                    print("Análisis de distancia recibido correctamente")
-                else:
-                    print(f"Error en respuesta de análisis de distancia: {response_distance.status_code}")
-            except Exception as e:
-                print(f"Excepción al solicitar análisis de distancia: {e}")
-        
-        return general_analysis, velocity_analysis, distance_analysis
-        
-    except Exception as e:
-        import traceback
-        print(f"Error al obtener análisis de Ollama: {e}")
-        print(traceback.format_exc())
-        return (
-            f"Error al conectar con el servicio de análisis: {str(e)}. Verifique que Ollama esté en funcionamiento.",
-            "Análisis de velocidad no disponible.",
-            "Análisis de distancia no disponible."
-        )
+""",
+    }
+    
+    print("Solicitando análisis general, de velocidad y de distancia...")
+    resultados = await ollama.generate_many(prompts, timeout=60.0)
+    
+    return (
+        resultados["general"] or "No se pudo obtener análisis general.",
+        resultados["velocidad"] or "No se pudo obtener análisis de velocidad.",
+        resultados["distancia"] or "No se pudo obtener análisis de distancia."
+    )
+
+def argumentos_informe_gps(clave_datos, division, team, position, player):
+    """
+    Resuelve los datos y genera los análisis de un informe PDF.
+
+    Returns:
+        Tupla de argumentos para utils.pdf_reports.informe_gps
+    """
+    df = resolver_datos_gps(clave_datos)
+    
+    # Análisis automático salvo que se pida Ollama (los tres a la vez)
+    general_analysis = "No hay datos suficientes para realizar un análisis."
+    velocity_analysis = "No hay datos suficientes para realizar un análisis."
+    distance_analysis = "No hay datos suficientes para realizar un análisis."
+    if not df.empty and ANALISIS_OLLAMA_PDF:
+        general_analysis, velocity_analysis, distance_analysis = obtener_analisis_ollama_sincrono(df)
+    elif not df.empty:
+        try:
+            general_analysis, velocity_analysis, distance_analysis = generar_analisis_automatico(df)
+        except Exception as e:
+            print(f"Error al obtener análisis: {e}")
+            print(traceback.format_exc())
+            general_analysis = "No se pudo obtener un análisis automático de los datos."
+            velocity_analysis = "Análisis no disponible."
+            distance_analysis = "Análisis no disponible."
+    
+    return (df, division, team, position, player, general_analysis, velocity_analysis, distance_analysis)
+
+def generar_informe_gps(avance, huella, clave_datos, division, team, position, player):
+    """
+    Tarea en segundo plano del informe PDF: resuelve los datos, genera los
+    análisis y arma el documento en el pool de procesos.
+    """
+    avance(20, "Analizando los datos")
+    argumentos = argumentos_informe_gps(clave_datos, division, team, position, player)
+    
+    avance(60, "Armando el PDF")
+    contenido = trabajos_pdf_gps.run_in_process(informe_gps, *argumentos)
+    informes_gps.put(huella, [clave_datos, division, team, position, player], contenido)
+    return dict(contenido=contenido, nombre=nombre_archivo("informe_gps"), tipo="application/pdf")
 
-# Callback para exportar a PDF
+# Exportar a PDF: el informe se genera en segundo plano y se descarga al terminar
 @callback(
-    Output("download-pdf-gps", "data"),
+    [Output("pdf-job-gps", "data"),
+     Output("pdf-job-interval-gps", "disabled"),
+     Output("export-pdf-gps-btn", "disabled"),
+     Output("pdf-progress-gps", "value"),
+     Output("pdf-progress-gps", "label"),
+     Output("pdf-progress-gps", "style"),
+     Output("download-pdf-gps", "data", allow_duplicate=True)],
     [Input("export-pdf-gps-btn", "n_clicks")],
     [State("filtered-data-gps", "data"),
      State("division-filter-gps", "value"),
@@ -722,418 +900,46 @@ Proporciona análisis sobre las distancias recorridas y su impacto en el rendimi
      State("player-filter-gps", "value")],
     prevent_initial_call=True
 )
-def exportar_pdf_gps(n_clicks, json_data, division, team, position, player):
-    """Genera un PDF con análisis de los datos GPS."""
-    print(f"Callback exportar_pdf_gps activado, n_clicks={n_clicks}")  # Log para debug
-    
+def exportar_pdf_gps(n_clicks, clave_datos, division, team, position, player):
+    """Encola la generación del PDF con análisis de los datos GPS (o lo descarga si ya se generó)."""
     if not n_clicks:
         raise PreventUpdate
     
-    try:
-        import base64
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib import colors
-        from reportlab.lib.units import inch, cm
-        
-        # Función para formatear el texto del análisis
-        def formatear_texto_analisis(texto, max_width=80):
-            """
-            Formatea el texto del análisis para que se ajuste mejor al PDF.
-            Divide párrafos largos, ajusta espacios y asegura una correcta visualización.
-            """
-            if not texto:
-                return "No hay análisis disponible."
-            
-            # Eliminar espacios extra y saltos de línea innecesarios
-            texto = ' '.join([line.strip() for line in texto.split('\n') if line.strip()])
-            
-            # Formatear listas numeradas si existen
-            for i in range(1, 10):
-                if f"{i}. " in texto:
-                    texto = texto.replace(f"{i}. ", f"\n{i}. ")
-            
-            # Formatear listas con viñetas si existen
-            if "• " in texto or "* " in texto:
-                texto = texto.replace("• ", "\n• ")
-                texto = texto.replace("* ", "\n• ")
-            
-            # Añadir saltos de párrafo después de puntos finales seguidos de espacio
-            texto = texto.replace(". ", ".\n")
-            
-            # Volver a unir oraciones muy cortas
-            lines = texto.split('\n')
-            result = []
-            
-            for line in lines:
-                if result and len(line) < 40 and not line.startswith("•") and not any(line.startswith(f"{i}.") for i in range(1, 10)):
-                    result[-1] += " " + line
-                else:
-                    result.append(line)
-            
-            return "\n".join(result)
-        
-        # Función para crear párrafos de análisis
-        def crear_parrafo_analisis(texto, estilo):
-            """
-            Crea elementos de párrafo para ReportLab a partir del texto de análisis.
-            """
-            texto_formateado = formatear_texto_analisis(texto)
-            
-            # Dividir en párrafos
-            parrafos = texto_formateado.split('\n')
-            
-            # Crear un párrafo ReportLab para cada línea
-            elementos = []
-            for parrafo in parrafos:
-                if parrafo.strip():
-                    # Añadir formato especial para listas
-                    if parrafo.startswith('•') or any(parrafo.startswith(f"{i}.") for i in range(1, 10)):
-                        elementos.append(Paragraph(f"<b>{parrafo}</b>", estilo))
-                    else:
-                        elementos.append(Paragraph(parrafo, estilo))
-                    elementos.append(Spacer(1, 3))  # Pequeño espacio entre párrafos
-            
-            return elementos
-        
-        print("Creando buffer para PDF...")  # Log para debug
-        # Crear buffer para PDF
-        buffer = io.BytesIO()
-        
-        # Crear documento - usar A4 para mejor presentación
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=A4,
-            leftMargin=1.5*cm,
-            rightMargin=1.5*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm
-        )
-        
-        elements = []
-        
-        # Definir estilos mejorados
-        styles = getSampleStyleSheet()
-        
-        # Estilo para título principal
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.darkblue,
-            spaceAfter=20,
-            alignment=1  # Centrado
-        )
-        
-        # Estilo para subtítulos
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.darkblue,
-            spaceBefore=15,
-            spaceAfter=10
-        )
-        
-        # Estilo para texto normal
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=8
-        )
-        
-        # Estilo para análisis de IA
-        analysis_style = ParagraphStyle(
-            'AnalysisStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            leftIndent=10,
-            rightIndent=10,
-            spaceBefore=5,
-            spaceAfter=5,
-            backColor=colors.lightgrey,
-            borderWidth=0,  # Sin borde
-            borderPadding=5
-        )
-        
-        # Estilo para pies de página e información adicional
-        info_style = ParagraphStyle(
-            'InfoStyle',
-            parent=styles['Italic'],
-            fontSize=8,
-            textColor=colors.darkgrey
-        )
-        
-        # Título con formato mejorado
-        elements.append(Paragraph("Informe de Análisis GPS", title_style))
-        
-        # Línea horizontal después del título
-        elements.append(Spacer(1, 1))
-        elements.append(Table([[""]], colWidths=[doc.width], style=TableStyle([
-            ('LINEABOVE', (0, 0), (-1, 0), 1, colors.darkblue),
-        ])))
-        elements.append(Spacer(1, 10))
-        
-        # Fecha del informe con formato mejorado
-        fecha = datetime.now().strftime("%d/%m/%Y %H:%M")
-        elements.append(Paragraph(f"Generado el: {fecha}", normal_style))
-        elements.append(Spacer(1, 15))
-        
-        print("Convertiendo JSON a DataFrame...")  # Log para debug
-        # Convertir JSON a DataFrame
-        if json_data:
-            df = pd.read_json(json_data, orient='split')
-        else:
-            df = pd.DataFrame()
-        
-        # Obtener análisis usando la función de análisis automático
-        general_analysis = "No hay datos suficientes para realizar un análisis."
-        velocity_analysis = "No hay datos suficientes para realizar un análisis."
-        distance_analysis = "No hay datos suficientes para realizar un análisis."
-        
-        if not df.empty:
-            print("Obteniendo análisis automático...")  # Log para debug
-            try:
-                # Usar análisis automático en lugar de Ollama para evitar errores
-                general_analysis, velocity_analysis, distance_analysis = generar_analisis_automatico(df)
-                print("Análisis obtenidos correctamente")  # Log para debug
-            except Exception as e:
-                import traceback
-                print(f"Error al obtener análisis: {e}")
-                print(traceback.format_exc())
-                general_analysis = "No se pudo obtener un análisis automático de los datos."
-                velocity_analysis = "Análisis no disponible."
-                distance_analysis = "Análisis no disponible."
-        
-        # Sección de filtros aplicados
-        elements.append(Paragraph("Filtros aplicados", subtitle_style))
-        
-        filtros_data = [
-            ["Filtro", "Valor"],
-            ["División", division if division != "Todas" else "Todas las divisiones"],
-            ["Equipo", team if team != "Todos" else "Todos los equipos"],
-            ["Posición", position if position != "Todas" else "Todas las posiciones"],
-            ["Jugador", player if player != "Todos" else "Todos los jugadores"]
-        ]
-        
-        # Tabla de filtros con estilo mejorado
-        filtros_tabla = Table(filtros_data, colWidths=[3*cm, 12*cm])
-        filtros_tabla.setStyle(TableStyle([
-            # Encabezado
-            ('BACKGROUND', (0, 0), (1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (1, 0), colors.white),
-            ('ALIGN', (0, 0), (1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (1, 0), 8),
-            ('TOPPADDING', (0, 0), (1, 0), 8),
-            
-            # Cuerpo de la tabla
-            ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 1), (0, -1), colors.darkblue),
-            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 1), (0, -1), 10),
-            ('VALIGN', (0, 1), (1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (1, -1), 0.5, colors.grey),
-            ('BOTTOMPADDING', (0, 1), (1, -1), 6),
-            ('TOPPADDING', (0, 1), (1, -1), 6),
-            
-            # Bordes exteriores más gruesos
-            ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-        ]))
-        
-        elements.append(filtros_tabla)
-        elements.append(Spacer(1, 20))
-        
-        # Estadísticas Básicas
-        if not df.empty:
-            elements.append(Paragraph("Estadísticas Básicas", subtitle_style))
-            
-            # Calcular estadísticas clave
-            n_jugadores = df['athlete_name'].nunique()
-            max_vel_prom = df['max_vel'].mean()
-            max_vel_max = df['max_vel'].max()
-            player_load_prom = df['total_player_load'].mean()
-            distance_prom = df['total_distance'].mean()
-            
-            # Crear tabla de estadísticas
-            stats_data = [
-                ["Métrica", "Valor"],
-                ["Total Jugadores", f"{n_jugadores}"],
-                ["Velocidad Máxima Promedio", f"{max_vel_prom:.2f} km/h"],
-                ["Velocidad Máxima", f"{max_vel_max:.2f} km/h"],
-                ["Player Load Promedio", f"{player_load_prom:.2f}"],
-                ["Distancia Promedio", f"{distance_prom:.2f} m"]
-            ]
-            
-            # Tabla de estadísticas con estilo mejorado
-            stats_tabla = Table(stats_data, colWidths=[8*cm, 7*cm])
-            stats_tabla.setStyle(TableStyle([
-                # Encabezado
-                ('BACKGROUND', (0, 0), (1, 0), colors.darkblue),
-                ('TEXTCOLOR', (0, 0), (1, 0), colors.white),
-                ('ALIGN', (0, 0), (1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (1, 0), 8),
-                ('TOPPADDING', (0, 0), (1, 0), 8),
-                
-                # Cuerpo de la tabla
-                ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
-                ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-                ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-                ('FONTSIZE', (0, 1), (1, -1), 10),
-                ('VALIGN', (0, 1), (1, -1), 'MIDDLE'),
-                ('GRID', (0, 0), (1, -1), 0.5, colors.grey),
-                ('BOTTOMPADDING', (0, 1), (1, -1), 6),
-                ('TOPPADDING', (0, 1), (1, -1), 6),
-                
-                # Bordes exteriores más gruesos
-                ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-            ]))
-            
-            elements.append(stats_tabla)
-            elements.append(Spacer(1, 15))
-            
-            # Añadir resumen del análisis general
-            elements.append(Paragraph("Análisis General", subtitle_style))
-            
-            # Contenedor para el análisis
-            elementos_analisis = crear_parrafo_analisis(general_analysis, analysis_style)
-            elements.extend(elementos_analisis)
-            elements.append(Spacer(1, 15))
-            
-            # Top jugadores por velocidad
-            elements.append(Paragraph("Top 5 Jugadores por Velocidad Máxima", subtitle_style))
-            
-            if len(df) > 0:
-                top_velocidad = df.sort_values('max_vel', ascending=False).head(5)
-                
-                # Verificar si hay datos disponibles
-                if len(top_velocidad) > 0:
-                    vel_data = [["Jugador", "Posición", "Equipo", "Vel. Máx. (km/h)"]]
-                    
-                    for _, row in top_velocidad.iterrows():
-                        vel_data.append([
-                            row['athlete_name'],
-                            row['position_name'],
-                            row['team_name'],
-                            f"{row['max_vel']:.2f}"
-                        ])
-                    
-                    # Asegurarse de que hay al menos dos filas (encabezado + 1 dato)
-                    if len(vel_data) >= 2:
-                        vel_tabla = Table(vel_data, colWidths=[4*cm, 4*cm, 4*cm, 3*cm])
-                        vel_tabla.setStyle(TableStyle([
-                            # Encabezado
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                            ('FONTSIZE', (0, 0), (-1, 0), 11),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                            ('TOPPADDING', (0, 0), (-1, 0), 8),
-                            
-                            # Cuerpo de la tabla - aplicar estilo solo a filas que existen
-                            ('FONTSIZE', (0, 1), (-1, -1), 9),
-                            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                            ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
-                            ('ALIGN', (3, 1), (3, -1), 'CENTER'),
-                            ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-                            ('TOPPADDING', (0, 1), (-1, -1), 5),
-                            
-                            # Bordes exteriores más gruesos
-                            ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-                        ]))
-                        
-                        # Aplicar estilos de fondo alternados solo si hay suficientes filas
-                        for i in range(1, len(vel_data), 2):
-                            if i < len(vel_data):  # Verificar que la fila existe
-                                vel_tabla.setStyle(TableStyle([
-                                    ('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
-                                ]))
-                        
-                        elements.append(vel_tabla)
-                    else:
-                        elements.append(Paragraph("No hay suficientes datos para mostrar la tabla de velocidades", normal_style))
-                else:
-                    elements.append(Paragraph("No hay datos disponibles para mostrar velocidades máximas", normal_style))
-                
-                elements.append(Spacer(1, 15))
-            
-            # Sección de análisis de velocidad
-            elements.append(Paragraph("Análisis de Velocidad", subtitle_style))
-            elementos_analisis_velocidad = crear_parrafo_analisis(velocity_analysis, analysis_style)
-            elements.extend(elementos_analisis_velocidad)
-            elements.append(Spacer(1, 15))
-            
-            # Sección de análisis de distancia
-            elements.append(Paragraph("Análisis de Distancia", subtitle_style))
-            elementos_analisis_distancia = crear_parrafo_analisis(distance_analysis, analysis_style)
-            elements.extend(elementos_analisis_distancia)
-            elements.append(Spacer(1, 20))
-                
-            # Conclusiones y notas
-            elements.append(Paragraph("Conclusiones", subtitle_style))
-            elements.append(Paragraph("""
-Este informe combina datos objetivos con análisis generados automáticamente. 
-Las recomendaciones están basadas en los patrones detectados en los datos y deben ser 
-evaluadas junto con el criterio profesional del cuerpo técnico.
-
-Los análisis de velocidad, distancia y carga de trabajo pueden ayudar a optimizar el 
-rendimiento de los atletas y prevenir lesiones al ajustar los entrenamientos de forma 
-personalizada según las características de cada jugador y posición.
-            """, normal_style))
-                
-            # Pie de página
-            elements.append(Spacer(1, 30))
-            elements.append(Table([[""]], colWidths=[doc.width], style=TableStyle([
-                ('LINEABOVE', (0, 0), (-1, 0), 0.5, colors.grey),
-            ])))
-            elements.append(Spacer(1, 5))
-            elements.append(Paragraph("Dashboard Deportivo - Análisis GPS - Documento generado automáticamente", info_style))
-            
-        else:
-            elements.append(Paragraph("No hay datos disponibles con los filtros seleccionados.", normal_style))
-        
-        print("Construyendo el PDF...")  # Log para debug
-        # Construir el PDF
-        doc.build(elements)
-        
-        # Obtener el contenido del buffer y codificarlo en base64
-        buffer.seek(0)
-        pdf_bytes = buffer.getvalue()
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        
-        # Crear nombre de archivo
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"informe_gps_{timestamp}.pdf"
-        
-        print(f"PDF generado correctamente: {filename}")  # Log para debug
-        
-        return dict(
-            content=pdf_base64,
-            filename=filename,
-            type="application/pdf",
-            base64=True
-        )
-        
-    except Exception as e:
-        import traceback
-        error_traceback = traceback.format_exc()
-        print(f"Error al generar PDF: {e}")
-        print(f"Traceback: {error_traceback}")
-        
-        # Devolver mensaje de error como texto plano
-        return dict(
-            content=f"Error al generar el PDF: {str(e)}\n\nDetalles técnicos para el soporte:\n{error_traceback}",
-            filename="error.txt",
-            type="text/plain"
-        )
+    huella = gps_store.fingerprint()
+    contenido = informes_gps.get(huella, [clave_datos, division, team, position, player])
+    if contenido is not None:
+        return no_update, True, False, 0, "", {"display": "none"}, \
+            descarga(contenido, nombre_archivo("informe_gps"), "application/pdf")
+    
+    id_trabajo = trabajos_pdf_gps.submit(generar_informe_gps, huella, clave_datos, division, team, position, player)
+    return id_trabajo, False, True, 0, "En cola", {"display": "flex"}, no_update
+
+@callback(
+    [Output("download-pdf-gps", "data"),
+     Output("pdf-job-interval-gps", "disabled", allow_duplicate=True),
+     Output("export-pdf-gps-btn", "disabled", allow_duplicate=True),
+     Output("pdf-progress-gps", "value", allow_duplicate=True),
+     Output("pdf-progress-gps", "label", allow_duplicate=True),
+     Output("pdf-progress-gps", "style", allow_duplicate=True),
+     Output("pdf-error-gps", "children")],
+    [Input("pdf-job-interval-gps", "n_intervals")],
+    [State("pdf-job-gps", "data")],
+    prevent_initial_call=True
+)
+def seguir_pdf_gps(_, id_trabajo):
+    """Muestra el avance del informe y lo descarga cuando está listo."""
+    oculto = {"display": "none"}
+    estado = trabajos_pdf_gps.status(id_trabajo) if id_trabajo else None
+    
+    if estado is None:
+        return no_update, True, False, 0, "", oculto, "No se encontró el informe en curso."
+    if estado["estado"] == ERROR:
+        trabajos_pdf_gps.discard(id_trabajo)
+        return no_update, True, False, 0, "", oculto, f"Error al generar el PDF: {estado['mensaje']}"
+    if estado["estado"] == LISTO:
+        return trabajos_pdf_gps.download(id_trabajo), True, False, 100, "Listo", oculto, ""
+    
+    return no_update, False, True, estado["progreso"], estado["mensaje"], {"display": "flex"}, ""
 
 # Función simplificada para pruebas (solo usar si la función principal sigue fallando)
 @callback(
@@ -1199,72 +1005,121 @@ def exportar_pdf_simple(n_clicks):
             type="text/plain"
         )
 
-# Callback para generar el análisis con Ollama
+def contenido_analisis_gps(general_analysis, terminado=True):
+    """Panel del análisis general; los botones de análisis específicos aparecen al terminar"""
+    analysis_content = [
+        html.H6("Análisis General", className="text-info mt-3"),
+        html.Div([
+            dcc.Markdown(general_analysis, className="analysis-text")
+        ], className="p-3 border rounded bg-light")
+    ]
+    if not terminado:
+        return analysis_content
+    
+    return analysis_content + [
+        # Botones para análisis específicos
+        html.Div([
+            dbc.Button(
+                "Análisis de Velocidad",
+                id={"type": "specific-analysis-btn", "index": "velocidad"},
+                color="outline-primary",
+                size="sm",
+                className="me-2 mt-3"
+            ),
+            dbc.Button(
+                "Análisis de Distancia",
+                id={"type": "specific-analysis-btn", "index": "distancia"},
+                color="outline-primary",
+                size="sm",
+                className="me-2 mt-3"
+            )
+        ]),
+        
+        # Contenedor para análisis específicos
+        html.Div(id="specific-analysis-container", className="mt-3")
+    ]
+
+def generar_analisis_en_vivo_gps(avance, clave_datos):
+    """
+    Tarea en segundo plano del análisis general: recibe el texto de Ollama
+    a medida que se genera y lo va dejando en el estado del trabajo.
+    """
+    df = resolver_datos_gps(clave_datos)
+    texto = ""
+    ultima_escritura = 0
+    for fragmento in ollama_gps.analyze_data_stream(df, analysis_type="general"):
+        texto += fragmento
+        # Como mucho unas cuatro escrituras por segundo (el navegador consulta cada 400 ms)
+        if time.monotonic() - ultima_escritura > 0.25:
+            avance(50, "Generando", texto=texto)
+            ultima_escritura = time.monotonic()
+    
+    return dict(contenido=texto.encode("utf-8"), nombre="analisis_gps.md", tipo="text/markdown")
+
+# Callback para generar el análisis con Ollama: el texto se muestra a medida que se genera
 @callback(
     [Output("analysis-loading", "style"),
-     Output("analysis-content", "children")],
+     Output("analysis-content", "children"),
+     Output("analysis-job-gps", "data"),
+     Output("analysis-job-interval-gps", "disabled"),
+     Output("generate-analysis-btn", "disabled")],
     [Input("generate-analysis-btn", "n_clicks")],
     [State("filtered-data-gps", "data")],
     prevent_initial_call=True
 )
-async def generate_analysis(n_clicks, json_data):
-    """Genera un análisis de los datos utilizando Ollama."""
-    if not n_clicks or not json_data:
+def generate_analysis(n_clicks, clave_datos):
+    """Encola el análisis de los datos con Ollama y muestra el indicador de carga."""
+    if not n_clicks or not clave_datos:
         raise PreventUpdate
     
-    # Mostrar indicador de carga
-    loading_style = {"display": "block"}
-    
     try:
-        # Convertir JSON a DataFrame
-        df = pd.read_json(json_data, orient='split')
-        
-        if df.empty:
-            return {"display": "none"}, html.Div("No hay datos disponibles para analizar.", className="text-muted")
-        
-        # Crear instancia de OllamaAnalysis
-        ollama = OllamaAnalysis(model="deepseek-r1:8b")
+        if resolver_datos_gps(clave_datos).empty:
+            return {"display": "none"}, html.Div("No hay datos disponibles para analizar.", className="text-muted"), \
+                no_update, True, False
         
-        # Obtener análisis general
-        general_analysis = await ollama.analyze_data(df, analysis_type="general")
-        
-        # Formatear análisis como componentes de Dash
-        analysis_content = [
-            html.H6("Análisis General", className="text-info mt-3"),
-            html.Div([
-                dcc.Markdown(general_analysis, className="analysis-text")
-            ], className="p-3 border rounded bg-light"),
-            
-            # Botones para análisis específicos
-            html.Div([
-                dbc.Button(
-                    "Análisis de Velocidad",
-                    id={"type": "specific-analysis-btn", "index": "velocidad"},
-                    color="outline-primary",
-                    size="sm",
-                    className="me-2 mt-3"
-                ),
-                dbc.Button(
-                    "Análisis de Distancia",
-                    id={"type": "specific-analysis-btn", "index": "distancia"},
-                    color="outline-primary",
-                    size="sm",
-                    className="me-2 mt-3"
-                )
-            ]),
-            
-            # Contenedor para análisis específicos
-            html.Div(id="specific-analysis-container", className="mt-3")
-        ]
-        
-        return {"display": "none"}, analysis_content
+        id_trabajo = trabajos_analisis_gps.submit(generar_analisis_en_vivo_gps, clave_datos)
+        return {"display": "block"}, [], id_trabajo, False, True
     
     except Exception as e:
         print(f"Error al generar análisis: {e}")
         return {"display": "none"}, html.Div([
             html.Div("Error al generar el análisis.", className="text-danger"),
             html.Div(f"Detalles: {str(e)}", className="text-muted small")
-        ])
+        ]), no_update, True, False
+
+@callback(
+    [Output("analysis-loading", "style", allow_duplicate=True),
+     Output("analysis-content", "children", allow_duplicate=True),
+     Output("analysis-job-interval-gps", "disabled", allow_duplicate=True),
+     Output("generate-analysis-btn", "disabled", allow_duplicate=True)],
+    [Input("analysis-job-interval-gps", "n_intervals")],
+    [State("analysis-job-gps", "data")],
+    prevent_initial_call=True
+)
+def seguir_analisis_gps(_, id_trabajo):
+    """Muestra el texto del análisis recibido hasta el momento."""
+    oculto = {"display": "none"}
+    estado = trabajos_analisis_gps.status(id_trabajo) if id_trabajo else None
+    
+    if estado is None:
+        return oculto, html.Div("No se encontró el análisis en curso.", className="text-danger"), True, False
+    if estado["estado"] == ERROR:
+        trabajos_analisis_gps.discard(id_trabajo)
+        print(f"Error al generar análisis: {estado['mensaje']}")
+        return oculto, html.Div([
+            html.Div("Error al generar el análisis.", className="text-danger"),
+            html.Div(f"Detalles: {estado['mensaje']}", className="text-muted small")
+        ]), True, False
+    if estado["estado"] == LISTO:
+        texto = (trabajos_analisis_gps.result(id_trabajo) or b"").decode("utf-8")
+        trabajos_analisis_gps.discard(id_trabajo)
+        return oculto, contenido_analisis_gps(texto or "No se pudo obtener un análisis."), True, False
+    
+    # El indicador de carga queda hasta el primer fragmento
+    texto = estado.get("texto")
+    if not texto:
+        return no_update, no_update, False, True
+    return oculto, contenido_analisis_gps(texto, terminado=False), False, True
 
 # Callback para análisis específicos
 @callback(
@@ -1274,27 +1129,24 @@ async def generate_analysis(n_clicks, json_data):
      State("filtered-data-gps", "data")],
     prevent_initial_call=True
 )
-async def generate_specific_analysis(n_clicks_list, btn_ids, json_data):
+def generate_specific_analysis(n_clicks_list, btn_ids, clave_datos):
     """Genera análisis específicos basados en el botón clickeado."""
     ctx_triggered = ctx.triggered_id
-    if not ctx_triggered or not any(n_clicks_list) or not json_data:
+    if not ctx_triggered or not any(n_clicks_list) or not clave_datos:
         raise PreventUpdate
     
     # Determinar qué botón fue clickeado
     triggered_index = ctx_triggered.get("index", "")
     
     try:
-        # Convertir JSON a DataFrame
-        df = pd.read_json(json_data, orient='split')
+        # Obtener los datos filtrados desde la caché del servidor
+        df = resolver_datos_gps(clave_datos)
         
         if df.empty:
             return html.Div("No hay datos disponibles para analizar.", className="text-muted")
         
-        # Crear instancia de OllamaAnalysis
-        ollama = OllamaAnalysis(model="deepseek-r1:8b")
-        
         # Generar análisis específico
-        specific_analysis = await ollama.analyze_data(df, analysis_type=triggered_index)
+        specific_analysis = ollama_gps.analyze_data_sync(df, analysis_type=triggered_index)
         
         # Formatear el resultado
         return html.Div([
@@ -1310,20 +1162,4 @@ async def generate_specific_analysis(n_clicks_list, btn_ids, json_data):
             html.Div(f"Error al generar el análisis de {triggered_index}.", className="text-danger"),
             html.Div(f"Detalles: {str(e)}", className="text-muted small")
         ])
-        
-# Al final de app.py
-if __name__ == '__main__':
-    import socket
-    
-    def is_port_in_use(port):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            return s.connect_ex(('localhost', port)) == 0
-    
-    # Intentar puertos 8060, 8061, 8062 o cualquier disponible
-    port = 8060
-    while is_port_in_use(port) and port < 8070:
-        print(f"Puerto {port} ocupado, intentando {port + 1}")
-        port += 1
-    
-    print(f"Iniciando aplicación en puerto {port}")
-    app.run_server(debug=True, port=port)
+
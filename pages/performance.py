@@ -1,16 +1,26 @@
 import dash
-from dash import html, dcc, Input, Output, State, callback, dash_table
+from dash import html, dcc, Input, Output, State, callback, dash_table, ctx, Patch, no_update
 import dash_bootstrap_components as dbc
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objs as go
 import numpy as np
 from dash.exceptions import PreventUpdate
 import os
-from datetime import datetime, timedelta
-import io
-import base64
-from utils.ollama_integration import OllamaAnalysis
+from datetime import timedelta
+from functools import lru_cache
+from utils.columnar_cache import cargar_con_cache
+from utils.data_store import DataStore
+from utils.shared_frame import desde_entorno
+from utils.filter_index import FilterIndex
+from utils.filter_engine import FilterEngine
+from utils.aggregate_cube import AggregateCube
+from utils.result_cache import ResultCache
+from utils.figure_cache import FigureCache
+from utils.figure_builders import figura_vacia, grafico_barras, grafico_linea
+from utils.job_queue import JobQueue, LISTO, ERROR, descarga
+from utils.report_cache import ReportCache
+from utils.pdf_reports import FORMATO_INFORMES, informe_performance, nombre_archivo
+from utils import datatable_query
 from dash.dependencies import Input, Output, State, ALL, MATCH
 
 # Registrar esta página
@@ -20,28 +30,97 @@ dash.register_page(
     title='Dashboard de Performance',
     name='Performance'
 )
+# Columnas de texto que se usan como dimensiones de filtrado
+COLUMNAS_DIMENSION_PERFORMANCE = ['division', 'equipo', 'posicion', 'jugador']
+
+# Ruta del CSV de rendimiento (puede no existir: se usan datos de ejemplo)
+PERFORMANCE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'performance_stats.csv')
+
+# Métricas numéricas de rendimiento (pre-agregadas en el cubo)
+METRICAS_PERFORMANCE = [
+    'velocidad_media', 'resistencia', 'sprint_maximo', 'pases_completados',
+    'precision_tiros', 'duelos_ganados', 'minutos_jugados'
+]
+
+# Semilla y fechas fijas para que los datos de ejemplo sean reproducibles (los
+# mismos en cada worker, en el lote de informes y de un día para otro)
+SEMILLA_DATOS_DUMMY = 42
+FECHA_FIN_DATOS_DUMMY = pd.Timestamp('2025-01-31')
+
+def tipar_datos_performance(df):
+    """Convierte las dimensiones a categóricas y las métricas a float32"""
+    for col in COLUMNAS_DIMENSION_PERFORMANCE:
+        df[col] = df[col].astype('category')
+    
+    float_cols = df.select_dtypes(include='float64').columns
+    df[float_cols] = df[float_cols].astype('float32')
+    
+    return df
+
+def leer_csv_performance(path):
+    """Lee el CSV de rendimiento y tipa sus columnas"""
+    df = pd.read_csv(path)
+    
+    # Convertir columnas de fecha
+    df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
+    
+    return tipar_datos_performance(df)
+
+# Almacén compartido por todos los callbacks del proceso
+# (sin CSV se usan los datos de ejemplo, generados una vez por proceso)
+performance_store = DataStore(
+    PERFORMANCE_CSV,
+    lambda path: cargar_con_cache(path, leer_csv_performance),
+    fallback=lambda: obtener_datos_dummy(),
+    compartido=desde_entorno('performance')
+)
+
 def cargar_datos_performance():
     """Carga y preprocesa los datos de rendimiento deportivo"""
-    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
-    
     try:
-        # Cargar CSV
-        df = pd.read_csv(os.path.join(data_dir, 'performance_stats.csv'))
-        
-        # Convertir columnas de fecha
-        df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
-        
-        return df
+        return performance_store.get()
     except Exception as e:
         print(f"Error al cargar los datos de performance: {e}")
-        # Crear datos de ejemplo si no existe el archivo
-        return crear_datos_dummy()
+        return obtener_datos_dummy().copy(deep=False)
+
+def obtener_indice_performance():
+    """Devuelve el índice de filtros en cascada de los datos de rendimiento"""
+    try:
+        return performance_store.derived(
+            'indice_filtros',
+            lambda df: FilterIndex(df, COLUMNAS_DIMENSION_PERFORMANCE)
+        )
+    except Exception as e:
+        print(f"Error al construir el índice de filtros de performance: {e}")
+        return None
+
+@lru_cache(maxsize=1)
+def obtener_datos_dummy():
+    """Devuelve los datos de ejemplo del proceso, persistiéndolos si así se configuró"""
+    df = crear_datos_dummy()
+    
+    # DASHBOARD_GUARDAR_DUMMY=1 guarda los datos en performance_stats.csv
+    if os.environ.get('DASHBOARD_GUARDAR_DUMMY') == '1':
+        guardar_datos_dummy(df)
+    
+    return df
+
+def guardar_datos_dummy(df, path=PERFORMANCE_CSV):
+    """Escribe los datos de ejemplo como CSV de rendimiento"""
+    try:
+        salida = df.copy()
+        salida['fecha'] = salida['fecha'].dt.strftime('%Y-%m-%d')
+        salida.to_csv(path, index=False)
+        print(f"Datos de ejemplo guardados en {path}")
+    except Exception as e:
+        print(f"No se pudieron guardar los datos de ejemplo: {e}")
 
-def crear_datos_dummy():
+def crear_datos_dummy(semilla=SEMILLA_DATOS_DUMMY):
     """Crea datos de ejemplo para la demostración"""
-    # Crear fechas para los últimos 30 días
-    fechas = [datetime.now() - timedelta(days=i) for i in range(30)]
-    fechas = sorted(fechas)  # Ordenar cronológicamente
+    rng = np.random.default_rng(semilla)
+    
+    # 30 días en orden cronológico, hasta una fecha fija
+    fechas = pd.date_range(end=FECHA_FIN_DATOS_DUMMY, periods=30, freq='D')
     
     # Divisiones
     divisiones = ['Primera', 'Reserva', 'Sub-20', 'Sub-18']
@@ -60,230 +139,245 @@ def crear_datos_dummy():
         'Andrés Jiménez', 'Roberto Ruiz', 'Álvaro Méndez', 'Diego Vargas'
     ]
     
-    # Crear DataFrame vacío
-    data = []
-    
-    # Generar datos aleatorios
-    for fecha in fechas:
-        for division in divisiones:
-            for i, jugador in enumerate(jugadores):
-                # Asignar atributos
-                equipo = equipos[i % len(equipos)]
-                posicion = posiciones[i % len(posiciones)]
-                
-                # Rendimiento físico (más variado por posición)
-                if posicion == 'Delantero':
-                    velocidad = np.random.normal(29, 3)
-                    resistencia = np.random.normal(75, 8)
-                    sprint_max = np.random.normal(33, 2)
-                elif posicion == 'Centrocampista':
-                    velocidad = np.random.normal(27, 2) 
-                    resistencia = np.random.normal(85, 5)
-                    sprint_max = np.random.normal(31, 2)
-                elif posicion == 'Defensa':
-                    velocidad = np.random.normal(26, 2)
-                    resistencia = np.random.normal(80, 6) 
-                    sprint_max = np.random.normal(30, 2.5)
-                else:  # Portero
-                    velocidad = np.random.normal(23, 2)
-                    resistencia = np.random.normal(65, 8)
-                    sprint_max = np.random.normal(26, 3)
-                
-                # Estadísticas técnicas (ajustadas por posición)
-                if posicion == 'Delantero':
-                    pases_completados = int(np.random.normal(30, 10))
-                    precision_tiros = np.random.normal(75, 10)
-                    duelos_ganados = int(np.random.normal(10, 4))
-                    minutos_jugados = int(np.random.normal(75, 15))
-                elif posicion == 'Centrocampista':
-                    pases_completados = int(np.random.normal(60, 15))
-                    precision_tiros = np.random.normal(65, 12)
-                    duelos_ganados = int(np.random.normal(12, 5))
-                    minutos_jugados = int(np.random.normal(80, 12))
-                elif posicion == 'Defensa':
-                    pases_completados = int(np.random.normal(45, 10))
-                    precision_tiros = np.random.normal(45, 15)
-                    duelos_ganados = int(np.random.normal(15, 5))
-                    minutos_jugados = int(np.random.normal(85, 10))
-                else:  # Portero
-                    pases_completados = int(np.random.normal(25, 8))
-                    precision_tiros = np.random.normal(30, 10)
-                    duelos_ganados = int(np.random.normal(5, 3))
-                    minutos_jugados = int(np.random.normal(90, 5))
-                
-                # Limitar valores
-                velocidad = max(18, min(36, velocidad))
-                resistencia = max(50, min(100, resistencia))
-                sprint_max = max(20, min(38, sprint_max))
-                precision_tiros = max(10, min(100, precision_tiros))
-                pases_completados = max(10, pases_completados)
-                duelos_ganados = max(0, duelos_ganados)
-                minutos_jugados = max(5, min(95, minutos_jugados))
-                
-                # Agregar fila
-                data.append({
-                    'fecha': fecha.strftime('%Y-%m-%d'),
-                    'division': division,
-                    'equipo': equipo,
-                    'jugador': jugador,
-                    'posicion': posicion,
-                    'velocidad_media': round(velocidad, 2),
-                    'resistencia': round(resistencia, 2),
-                    'sprint_maximo': round(sprint_max, 2),
-                    'pases_completados': pases_completados,
-                    'precision_tiros': round(precision_tiros, 2),
-                    'duelos_ganados': duelos_ganados,
-                    'minutos_jugados': minutos_jugados
-                })
-    
-    # Crear DataFrame
-    df = pd.DataFrame(data)
-    df['fecha'] = pd.to_datetime(df['fecha'])
-    
-    return df
+    # Una fila por fecha x división x jugador, en ese orden
+    n_jugadores = len(jugadores)
+    n_filas = len(fechas) * len(divisiones) * n_jugadores
+    idx_jugador = np.tile(np.arange(n_jugadores), len(fechas) * len(divisiones))
+    idx_division = np.tile(np.repeat(np.arange(len(divisiones)), n_jugadores), len(fechas))
+    idx_fecha = np.repeat(np.arange(len(fechas)), len(divisiones) * n_jugadores)
+    
+    # Equipo y posición se asignan rotando por jugador
+    idx_equipo = idx_jugador % len(equipos)
+    idx_posicion = idx_jugador % len(posiciones)
+    
+    # Media y desvío de cada métrica por posición (Portero, Defensa, Centrocampista, Delantero)
+    parametros = {
+        'velocidad_media':   ([23, 26, 27, 29], [2, 2, 2, 3]),
+        'resistencia':       ([65, 80, 85, 75], [8, 6, 5, 8]),
+        'sprint_maximo':     ([26, 30, 31, 33], [3, 2.5, 2, 2]),
+        'pases_completados': ([25, 45, 60, 30], [8, 10, 15, 10]),
+        'precision_tiros':   ([30, 45, 65, 75], [10, 15, 12, 10]),
+        'duelos_ganados':    ([5, 15, 12, 10], [3, 5, 5, 4]),
+        'minutos_jugados':   ([90, 85, 80, 75], [5, 10, 12, 15]),
+    }
+    
+    def muestrear(metrica):
+        media, desvio = (np.asarray(v, dtype=float) for v in parametros[metrica])
+        return rng.normal(media[idx_posicion], desvio[idx_posicion], size=n_filas)
+    
+    # Rendimiento físico y técnico, limitado a rangos realistas
+    velocidad = np.clip(muestrear('velocidad_media'), 18, 36)
+    resistencia = np.clip(muestrear('resistencia'), 50, 100)
+    sprint_max = np.clip(muestrear('sprint_maximo'), 20, 38)
+    precision_tiros = np.clip(muestrear('precision_tiros'), 10, 100)
+    pases_completados = np.maximum(np.trunc(muestrear('pases_completados')), 10).astype(int)
+    duelos_ganados = np.maximum(np.trunc(muestrear('duelos_ganados')), 0).astype(int)
+    minutos_jugados = np.clip(np.trunc(muestrear('minutos_jugados')), 5, 95).astype(int)
+    
+    df = pd.DataFrame({
+        'fecha': fechas[idx_fecha],
+        'division': np.asarray(divisiones)[idx_division],
+        'equipo': np.asarray(equipos)[idx_equipo],
+        'jugador': np.asarray(jugadores)[idx_jugador],
+        'posicion': np.asarray(posiciones)[idx_posicion],
+        'velocidad_media': velocidad.round(2),
+        'resistencia': resistencia.round(2),
+        'sprint_maximo': sprint_max.round(2),
+        'pases_completados': pases_completados,
+        'precision_tiros': precision_tiros.round(2),
+        'duelos_ganados': duelos_ganados,
+        'minutos_jugados': minutos_jugados
+    })
+    
+    return tipar_datos_performance(df)
+
+def construir_motor_performance(df):
+    """Motor de filtrado por índices invertidos de un frame de rendimiento"""
+    return FilterEngine(df, COLUMNAS_DIMENSION_PERFORMANCE, columna_fecha='fecha')
+
+def obtener_motor_performance():
+    """Devuelve el motor de filtrado por índices invertidos de los datos de rendimiento"""
+    return performance_store.derived('motor_filtros', construir_motor_performance)
 
-def filtrar_dataframe_performance(df, division=None, equipo=None, posicion=None, jugador=None, fecha_inicio=None, fecha_fin=None):
-    """Filtra el DataFrame según los criterios seleccionados"""
+def filtrar_dataframe_performance(df, division=None, equipo=None, posicion=None, jugador=None, fecha_inicio=None, fecha_fin=None, motor=None):
+    """Filtra el DataFrame según los criterios seleccionados (con el motor de su misma versión)"""
     if df.empty:
         return df
-        
-    filtered_df = df.copy()
-    
-    if division and division != "Todas":
-        filtered_df = filtered_df[filtered_df['division'] == division]
-    
-    if equipo and equipo != "Todos":
-        filtered_df = filtered_df[filtered_df['equipo'] == equipo]
     
-    if posicion and posicion != "Todas":
-        filtered_df = filtered_df[filtered_df['posicion'] == posicion]
-    
-    if jugador and jugador != "Todos":
-        filtered_df = filtered_df[filtered_df['jugador'] == jugador]
-    
-    if fecha_inicio:
-        filtered_df = filtered_df[filtered_df['fecha'] >= fecha_inicio]
-    
-    if fecha_fin:
-        filtered_df = filtered_df[filtered_df['fecha'] <= fecha_fin]
+    motor = motor if motor is not None else obtener_motor_performance()
+    if motor.n_filas != len(df):
+        raise ValueError("El DataFrame no corresponde a los datos del almacén de performance")
+    
+    filas = motor.filter(
+        {
+            'division': division,
+            'equipo': equipo,
+            'posicion': posicion,
+            'jugador': jugador
+        },
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin
+    )
     
-    return filtered_df
+    # Sin filtros se devuelve la vista completa; si no, solo se copian las filas elegidas
+    return df if filas is None else df.take(filas)
 
-def generar_grafico_evolucion(df, metrica, titulo=None):
-    """Genera un gráfico de evolución temporal de una métrica específica"""
+# Resultados filtrados en el servidor; el dcc.Store solo guarda su clave
+resultados_performance = ResultCache(max_entries=32)
+
+# Informes PDF en segundo plano y los ya generados por versión de los datos y filtros
+trabajos_pdf_performance = JobQueue()
+informes_performance = ReportCache(f'performance_v{FORMATO_INFORMES}')
+
+# Figuras ya serializadas por selección de filtros
+figuras_performance = FigureCache(max_entries=128)
+
+# Al recargar los datos se descartan los resultados y figuras anteriores
+performance_store.on_reload(resultados_performance.clear)
+performance_store.on_reload(figuras_performance.clear)
+# Los datos de ejemplo no recortan la caché: cada proceso los genera por su cuenta
+performance_store.on_reload(lambda: None if performance_store.is_fallback() else informes_performance.prune(performance_store.fingerprint()))
+
+def obtener_filtrado_performance(division=None, equipo=None, posicion=None, jugador=None, fecha_inicio=None, fecha_fin=None):
+    """Devuelve los datos de rendimiento filtrados, reutilizando resultados ya calculados"""
+    # Frame, versión y motor de una misma versión, aunque los datos se recarguen entre medio
+    try:
+        df, version, motor = performance_store.snapshot('motor_filtros', construir_motor_performance)
+    except Exception as e:
+        print(f"Error al cargar los datos de performance: {e}")
+        df = obtener_datos_dummy().copy(deep=False)
+        version, motor = None, construir_motor_performance(df)
     if df.empty:
-        # Devolver un gráfico vacío
-        fig = go.Figure()
-        fig.update_layout(
-            title="No hay datos disponibles",
-            xaxis_title="",
-            yaxis_title=""
-        )
-        return fig
+        return df
     
-    # Agrupar por fecha y calcular el promedio
-    temp_df = df.groupby('fecha')[metrica].mean().reset_index()
+    # Las fechas llegan como texto ISO desde el DatePickerRange
+    fecha_inicio = pd.to_datetime(fecha_inicio) if fecha_inicio else None
+    fecha_fin = pd.to_datetime(fecha_fin) if fecha_fin else None
     
-    # Crear gráfico de línea
-    fig = px.line(
-        temp_df,
-        x='fecha',
-        y=metrica,
-        title=titulo if titulo else f'Evolución de {metrica}',
-        labels={'fecha': 'Fecha', metrica: metrica.replace('_', ' ').title()},
-        markers=True
+    return resultados_performance.get_or_compute(
+        (version, division, equipo, posicion, jugador, fecha_inicio, fecha_fin),
+        lambda: filtrar_dataframe_performance(df, division, equipo, posicion, jugador, fecha_inicio, fecha_fin, motor=motor)
+    )
+
+def clave_filtros_performance(division, equipo, posicion, jugador, fecha_inicio, fecha_fin):
+    """Clave liviana que identifica una selección de filtros de rendimiento en el dcc.Store"""
+    return {
+        "pagina": "performance",
+        "filtros": [division, equipo, posicion, jugador, fecha_inicio, fecha_fin]
+    }
+
+def resolver_datos_performance(clave):
+    """Devuelve el DataFrame filtrado que corresponde a una clave del dcc.Store"""
+    if not clave:
+        return pd.DataFrame()
+    return obtener_filtrado_performance(*clave["filtros"])
+
+def obtener_cubo_performance():
+    """Devuelve el cubo de sumas y conteos por (dimensiones, fecha) de los datos de rendimiento"""
+    return performance_store.derived(
+        'cubo',
+        lambda df: AggregateCube(df, COLUMNAS_DIMENSION_PERFORMANCE, 'fecha', METRICAS_PERFORMANCE)
+    )
+
+def medias_performance(por, metrica, division=None, equipo=None, posicion=None, jugador=None, fecha_inicio=None, fecha_fin=None):
+    """Calcula la media de una métrica agrupada por `por` a partir del cubo"""
+    return obtener_cubo_performance().means(
+        {
+            'division': division,
+            'equipo': equipo,
+            'posicion': posicion,
+            'jugador': jugador
+        },
+        por=por,
+        metricas=[metrica],
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin
     )
+
+def columnas_tabla_performance(metrica):
+    """Columnas de la tabla de rendimiento para la métrica seleccionada"""
+    nombres = ['Jugador', 'Posición', 'Equipo', metrica.replace('_', ' ').title()]
+    return [{"name": col, "id": col} for col in nombres]
+
+def obtener_tabla_performance(metrica, division=None, equipo=None, posicion=None, jugador=None, fecha_inicio=None, fecha_fin=None):
+    """Devuelve la tabla de promedios por jugador ya formateada para la selección de filtros"""
+    def construir():
+        # Promedios por jugador desde el cubo pre-agregado
+        table_df = medias_performance(['jugador', 'posicion', 'equipo'], metrica,
+                                      division, equipo, posicion, jugador, fecha_inicio, fecha_fin)
+        
+        # Ordenar por la métrica seleccionada (descendente)
+        table_df = table_df.sort_values(by=metrica, ascending=False)
+        
+        # Renombrar columnas para mejor visualización
+        table_df = table_df.rename(columns={
+            'jugador': 'Jugador',
+            'posicion': 'Posición',
+            'equipo': 'Equipo',
+            metrica: metrica.replace('_', ' ').title()
+        })
+        
+        # Las dimensiones pasan a texto y los valores se redondean
+        for col in table_df.columns:
+            if col in ['Jugador', 'Posición', 'Equipo']:
+                table_df[col] = table_df[col].astype(object)
+            else:
+                table_df[col] = table_df[col].astype(float).round(2)
+        
+        return table_df
     
-    # Personalizar diseño
-    fig.update_traces(
-        line=dict(width=3),
-        marker=dict(size=8)
+    return resultados_performance.get_or_compute(
+        ('tabla', performance_store.version, metrica, division, equipo, posicion, jugador, fecha_inicio, fecha_fin),
+        construir
     )
+
+def generar_grafico_evolucion(temp_df, metrica, titulo=None):
+    """Genera un gráfico de evolución temporal a partir de las medias por fecha de una métrica"""
+    if temp_df.empty:
+        # Devolver un gráfico vacío
+        return figura_vacia()
     
-    fig.update_layout(
+    # Crear gráfico de línea
+    return grafico_linea(
+        temp_df['fecha'],
+        temp_df[metrica],
+        titulo=titulo if titulo else f'Evolución de {metrica}',
+        titulo_x='Fecha',
+        titulo_y=metrica.replace('_', ' ').title(),
         xaxis=dict(
-            title='Fecha',
             tickformat='%d-%m-%Y',
             tickangle=-45,
             tickmode='auto',
-            nticks=10,
-            showgrid=True,
-            gridwidth=1,
-            gridcolor='lightgray'
-        ),
-        yaxis=dict(
-            title=metrica.replace('_', ' ').title(),
-            showgrid=True,
-            gridwidth=1,
-            gridcolor='lightgray'
+            nticks=10
         ),
-        height=450,
         margin=dict(l=40, r=40, t=60, b=70),
         hovermode='x unified'
     )
-    
-    return fig
 
-def generar_grafico_comparativo(df, metrica, categoria, titulo=None):
-    """Genera un gráfico de barras comparativo por categoría (posición, equipo, etc.)"""
-    if df.empty:
+def generar_grafico_comparativo(temp_df, metrica, categoria, titulo=None):
+    """Genera un gráfico de barras comparativo a partir de las medias por categoría (posición, equipo, etc.)"""
+    if temp_df.empty:
         # Devolver un gráfico vacío
-        fig = go.Figure()
-        fig.update_layout(
-            title="No hay datos disponibles",
-            xaxis_title="",
-            yaxis_title=""
-        )
-        return fig
+        return figura_vacia()
     
-    # Agrupar por la categoría seleccionada
-    if categoria in df.columns:
-        temp_df = df.groupby(categoria)[metrica].mean().reset_index()
-        temp_df = temp_df.sort_values(metrica, ascending=False)
-        
-        # Crear gráfico de barras
-        fig = px.bar(
-            temp_df,
-            x=categoria,
-            y=metrica,
-            title=titulo if titulo else f'{metrica.replace("_", " ").title()} por {categoria.title()}',
-            labels={categoria: categoria.replace('_', ' ').title(), metrica: metrica.replace('_', ' ').title()},
-            color=metrica,
-            color_continuous_scale='viridis',
-            text_auto='.2f'
-        )
-        
-        # Personalizar diseño
-        fig.update_traces(
-            textposition='outside',
-            textfont=dict(size=12),
-        )
-        
-        fig.update_layout(
-            height=450,
-            margin=dict(l=40, r=40, t=60, b=60),
-            xaxis=dict(
-                title=categoria.replace('_', ' ').title(),
-                tickangle=-45 if len(temp_df) > 5 else 0
-            ),
-            yaxis=dict(
-                title=metrica.replace('_', ' ').title(),
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='lightgray'
-            )
-        )
-        
-        return fig
-    else:
+    if categoria not in temp_df.columns:
         # Si la categoría no existe
-        fig = go.Figure()
-        fig.update_layout(
-            title=f"Categoría '{categoria}' no encontrada en los datos",
-            xaxis_title="",
-            yaxis_title=""
-        )
-        return fig
+        return figura_vacia(f"Categoría '{categoria}' no encontrada en los datos")
+    
+    temp_df = temp_df.sort_values(metrica, ascending=False)
+    
+    # Crear gráfico de barras
+    return grafico_barras(
+        temp_df[categoria],
+        temp_df[metrica],
+        titulo=titulo if titulo else f'{metrica.replace("_", " ").title()} por {categoria.title()}',
+        titulo_x=categoria.replace('_', ' ').title(),
+        titulo_y=metrica.replace('_', ' ').title(),
+        escala_colores='Viridis',
+        formato_texto='.2f',
+        height=450,
+        xaxis=dict(tickangle=-45 if len(temp_df) > 5 else 0)
+    )
 
 def generar_grafico_radar(df, jugador, metricas=None):
     """Genera un gráfico de radar para comparar el rendimiento de un jugador"""
@@ -430,6 +524,77 @@ def generar_heatmap_correlacion(df, metricas=None):
     
     return fig
 
+def figuras_metrica_performance(metrica, division=None, equipo=None, posicion=None, jugador=None, fecha_inicio=None, fecha_fin=None):
+    """Gráficos de evolución y comparativa por posición (reutilizados si la selección ya se vio)"""
+    filtros = (division, equipo, posicion, jugador, fecha_inicio, fecha_fin)
+    nombre_metrica = metrica.replace('_', ' ').title()
+    clave_figuras = (performance_store.version, metrica) + filtros
+    evolucion_fig = figuras_performance.get_or_build(
+        ('evolucion',) + clave_figuras,
+        lambda: generar_grafico_evolucion(medias_performance('fecha', metrica, *filtros), metrica, f"Evolución de {nombre_metrica}")
+    )
+    comparativa_fig = figuras_performance.get_or_build(
+        ('comparativa',) + clave_figuras,
+        lambda: generar_grafico_comparativo(
+            medias_performance('posicion', metrica, *filtros).sort_values(metrica, ascending=False),
+            metrica, 'posicion', f"{nombre_metrica} por Posición"
+        )
+    )
+    return evolucion_fig, comparativa_fig
+
+def figura_radar_performance(metrica, division=None, equipo=None, posicion=None, jugador=None, fecha_inicio=None, fecha_fin=None):
+    """Radar del jugador elegido, o del mejor en la métrica si no hay uno elegido"""
+    filtros = (division, equipo, posicion, jugador, fecha_inicio, fecha_fin)
+    if jugador and jugador != "Todos":
+        jugador_radar = jugador
+    else:
+        medias_jugador = medias_performance('jugador', metrica, *filtros)
+        jugador_radar = medias_jugador.loc[medias_jugador[metrica].idxmax(), 'jugador']
+    
+    return figuras_performance.get_or_build(
+        ('radar', performance_store.version, jugador_radar) + filtros,
+        lambda: generar_grafico_radar(obtener_filtrado_performance(*filtros), jugador_radar)
+    )
+
+def figura_heatmap_performance(division=None, equipo=None, posicion=None, jugador=None, fecha_inicio=None, fecha_fin=None):
+    """Mapa de calor de correlaciones de la selección"""
+    filtros = (division, equipo, posicion, jugador, fecha_inicio, fecha_fin)
+    return figuras_performance.get_or_build(
+        ('heatmap', performance_store.version) + filtros,
+        lambda: generar_heatmap_correlacion(obtener_filtrado_performance(*filtros))
+    )
+
+# Selección con la que abre la página (ver los callbacks de filtros en cascada)
+FILTROS_INICIALES = ("Todas", "Todos", "Todas", "Todos")
+METRICA_INICIAL = "velocidad_media"
+
+def rango_fechas_inicial(df):
+    """Fechas límite de los datos y rango predeterminado (último mes)"""
+    min_date = df['fecha'].min().date()
+    max_date = df['fecha'].max().date()
+    return min_date, max_date, max_date - timedelta(days=30), max_date
+
+def precalentar_performance():
+    """
+    Carga los datos, construye los índices y el cubo y deja en caché las
+    figuras y la tabla de la vista inicial, para que la primera visita no
+    pague ese costo.
+    """
+    df = cargar_datos_performance()
+    if df.empty:
+        return
+    obtener_indice_performance()
+    
+    # El navegador devuelve las fechas del DatePickerRange como texto ISO
+    _, _, start_date, end_date = rango_fechas_inicial(df)
+    filtros = FILTROS_INICIALES + (start_date.isoformat(), end_date.isoformat())
+    if obtener_filtrado_performance(*filtros).empty:
+        return
+    figuras_metrica_performance(METRICA_INICIAL, *filtros)
+    figura_radar_performance(METRICA_INICIAL, *filtros)
+    figura_heatmap_performance(*filtros)
+    obtener_tabla_performance(METRICA_INICIAL, *filtros)
+
 # Layout principal del dashboard
 layout = dbc.Container([
     dbc.Row([
@@ -514,7 +679,7 @@ layout = dbc.Container([
                                         {"label": "Duelos Ganados", "value": "duelos_ganados"},
                                         {"label": "Minutos Jugados", "value": "minutos_jugados"}
                                     ],
-                                    value="velocidad_media",
+                                    value=METRICA_INICIAL,
                                     className="dropdown-filter"
                                 )
                             ], md=3, className="mb-2"),
@@ -526,7 +691,13 @@ layout = dbc.Container([
                                 color="danger",
                                 className="w-100"
                                 ),
-                                dcc.Download(id="perf-download-pdf")
+                                dcc.Download(id="perf-download-pdf"),
+                                # Avance del informe en segundo plano
+                                dcc.Store(id="perf-pdf-job"),
+                                dcc.Interval(id="perf-pdf-job-interval", interval=1000, disabled=True),
+                                dbc.Progress(id="perf-pdf-progress", value=0, striped=True, animated=True,
+                                             className="mt-2", style={"display": "none"}),
+                                html.Div(id="perf-pdf-error", className="text-danger small mt-2")
                             ], md=3, className="mb-2")
                         ]),
                     ])
@@ -610,10 +781,15 @@ layout = dbc.Container([
                                 'backgroundColor': 'rgb(248, 248, 248)'
                             }
                         ],
-                        filter_action="native",
-                        sort_action="native",
+                        # Paginado, filtrado y orden se resuelven en el servidor
+                        page_action="custom",
+                        page_current=0,
+                        page_size=10,
+                        filter_action="custom",
+                        filter_query="",
+                        sort_action="custom",
                         sort_mode="multi",
-                        page_size=10
+                        sort_by=[]
                     )
                 ])
             ])
@@ -662,22 +838,17 @@ layout = dbc.Container([
 )
 def inicializar_filtros(_):
     df = cargar_datos_performance()
+    indice = obtener_indice_performance()
     
-    if df.empty:
+    if df.empty or indice is None:
         return [], None, None, None, None, None
     
     # Opciones para divisiones
     divisiones = [{"label": "Todas", "value": "Todas"}] + [
-        {"label": div, "value": div} for div in sorted(df['division'].unique()) if pd.notna(div)
+        {"label": div, "value": div} for div in indice.options('division')
     ]
     
-    # Fechas límite
-    min_date = df['fecha'].min().date()
-    max_date = df['fecha'].max().date()
-    
-    # Fechas predeterminadas (último mes)
-    start_date = (max_date - timedelta(days=30))
-    end_date = max_date
+    min_date, max_date, start_date, end_date = rango_fechas_inicial(df)
     
     return divisiones, "Todas", min_date, max_date, start_date, end_date
 
@@ -689,17 +860,13 @@ def inicializar_filtros(_):
     prevent_initial_call=True
 )
 def actualizar_equipos(division):
-    df = cargar_datos_performance()
+    indice = obtener_indice_performance()
     
-    if df.empty:
+    if indice is None:
         return [], None
     
-    filtered_df = df.copy()
-    if division and division != "Todas":
-        filtered_df = filtered_df[filtered_df['division'] == division]
-    
     equipos = [{"label": "Todos", "value": "Todos"}] + [
-        {"label": team, "value": team} for team in sorted(filtered_df['equipo'].unique()) if pd.notna(team)
+        {"label": team, "value": team} for team in indice.options('equipo', division)
     ]
     
     return equipos, "Todos"
@@ -713,20 +880,13 @@ def actualizar_equipos(division):
     prevent_initial_call=True
 )
 def actualizar_posiciones(division, team):
-    df = cargar_datos_performance()
+    indice = obtener_indice_performance()
     
-    if df.empty:
+    if indice is None:
         return [], None
     
-    filtered_df = df.copy()
-    if division and division != "Todas":
-        filtered_df = filtered_df[filtered_df['division'] == division]
-    
-    if team and team != "Todos":
-        filtered_df = filtered_df[filtered_df['equipo'] == team]
-    
     posiciones = [{"label": "Todas", "value": "Todas"}] + [
-        {"label": pos, "value": pos} for pos in sorted(filtered_df['posicion'].unique()) if pd.notna(pos)
+        {"label": pos, "value": pos} for pos in indice.options('posicion', division, team)
     ]
     
     return posiciones, "Todas"
@@ -741,108 +901,131 @@ def actualizar_posiciones(division, team):
     prevent_initial_call=True
 )
 def actualizar_jugadores(division, team, position):
-    df = cargar_datos_performance()
+    indice = obtener_indice_performance()
     
-    if df.empty:
+    if indice is None:
         return [], None
     
-    filtered_df = df.copy()
-    if division and division != "Todas":
-        filtered_df = filtered_df[filtered_df['division'] == division]
-    
-    if team and team != "Todos":
-        filtered_df = filtered_df[filtered_df['equipo'] == team]
-    
-    if position and position != "Todas":
-        filtered_df = filtered_df[filtered_df['posicion'] == position]
-    
     jugadores = [{"label": "Todos", "value": "Todos"}] + [
-        {"label": player, "value": player} for player in sorted(filtered_df['jugador'].unique()) if pd.notna(player)
+        {"label": player, "value": player} for player in indice.options('jugador', division, team, position)
     ]
     
     return jugadores, "Todos"
 
-# Actualizar datos filtrados y componentes
+# Entradas de filtrado comunes a los callbacks de la página (sin la métrica)
+ENTRADAS_FILTROS = [
+    Input("division-filter", "value"),
+    Input("team-filter", "value"),
+    Input("position-filter", "value"),
+    Input("player-filter", "value"),
+    Input("date-range-filter", "start_date"),
+    Input("date-range-filter", "end_date")
+]
+
+def tarjetas_sin_datos(mensaje, clase="text-center"):
+    """Fila de KPIs que solo muestra un mensaje"""
+    return [
+        dbc.Col([
+            dbc.Card([
+                dbc.CardBody([
+                    html.H6(mensaje, className=clase)
+                ])
+            ])
+        ], md=12)
+    ]
+
+# Actualizar la clave de los datos filtrados
 @callback(
-    [Output("filtered-data", "data"),
-     Output("evolucion-plot", "figure"),
-     Output("comparativa-plot", "figure"),
-     Output("radar-plot", "figure"),
-     Output("heatmap-plot", "figure"),
-     Output("kpi-cards-row", "children"),
-     Output("rendimiento-table", "data"),
-     Output("rendimiento-table", "columns")],
-    [Input("division-filter", "value"),
-     Input("team-filter", "value"),
-     Input("position-filter", "value"),
-     Input("player-filter", "value"),
-     Input("metric-filter", "value"),
-     Input("date-range-filter", "start_date"),
-     Input("date-range-filter", "end_date")]
+    Output("filtered-data", "data"),
+    ENTRADAS_FILTROS
 )
-def actualizar_datos_y_graficos(division, team, position, player, metric, start_date, end_date):
-    """Actualiza todos los componentes con los datos filtrados"""
-    # Cargar y filtrar datos
-    df = cargar_datos_performance()
+def actualizar_datos_filtrados(division, team, position, player, start_date, end_date):
+    """Guarda en el dcc.Store la clave de la selección (las fechas quedan como texto ISO)"""
+    if obtener_filtrado_performance(division, team, position, player, start_date, end_date).empty:
+        return ""
+    return clave_filtros_performance(division, team, position, player, start_date, end_date)
+
+# Gráficos que dependen de la métrica: evolución y comparativa por posición
+@callback(
+    [Output("evolucion-plot", "figure"),
+     Output("comparativa-plot", "figure")],
+    ENTRADAS_FILTROS + [Input("metric-filter", "value")]
+)
+def actualizar_graficos_metrica(division, team, position, player, start_date, end_date, metric):
+    """Actualiza los gráficos de la métrica; si solo cambió la métrica, envía los valores nuevos"""
+    filtros = (division, team, position, player, start_date, end_date)
+    
+    if obtener_filtrado_performance(*filtros).empty:
+        empty_fig = figura_vacia("No hay datos disponibles con los filtros seleccionados")
+        return empty_fig, empty_fig
+    
+    if ctx.triggered_id == "metric-filter":
+        # Los ejes X (fechas y posiciones) ya están en el navegador: solo cambian valores y títulos
+        nombre_metrica = metric.replace('_', ' ').title()
+        evolucion_df = medias_performance('fecha', metric, *filtros)
+        comparativa_df = medias_performance('posicion', metric, *filtros).sort_values(metric, ascending=False)
+        
+        evolucion_fig = Patch()
+        evolucion_fig['data'][0]['y'] = evolucion_df[metric].astype(float).tolist()
+        evolucion_fig['data'][0]['hovertemplate'] = f"Fecha=%{{x}}<br>{nombre_metrica}=%{{y}}<extra></extra>"
+        evolucion_fig['layout']['title']['text'] = f"Evolución de {nombre_metrica}"
+        evolucion_fig['layout']['yaxis']['title']['text'] = nombre_metrica
+        
+        valores = comparativa_df[metric].astype(float).tolist()
+        comparativa_fig = Patch()
+        comparativa_fig['data'][0]['x'] = comparativa_df['posicion'].tolist()
+        comparativa_fig['data'][0]['y'] = valores
+        comparativa_fig['data'][0]['marker']['color'] = valores
+        comparativa_fig['data'][0]['hovertemplate'] = f"Posicion=%{{x}}<br>{nombre_metrica}=%{{y}}<extra></extra>"
+        comparativa_fig['layout']['title']['text'] = f"{nombre_metrica} por Posición"
+        comparativa_fig['layout']['yaxis']['title']['text'] = nombre_metrica
+        comparativa_fig['layout']['coloraxis']['colorbar']['title']['text'] = nombre_metrica
+        return evolucion_fig, comparativa_fig
+    
+    return figuras_metrica_performance(metric, *filtros)
+
+# Gráfico de radar del jugador seleccionado (o del mejor en la métrica)
+@callback(
+    Output("radar-plot", "figure"),
+    ENTRADAS_FILTROS + [Input("metric-filter", "value")]
+)
+def actualizar_radar(division, team, position, player, start_date, end_date, metric):
+    """Actualiza el radar; la métrica solo importa cuando no hay un jugador elegido"""
+    if ctx.triggered_id == "metric-filter" and player and player != "Todos":
+        return no_update
     
-    if df.empty:
-        # Valores por defecto si no hay datos
-        empty_fig = go.Figure()
-        empty_fig.update_layout(title="No hay datos disponibles")
-        
-        empty_kpis = [
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H6("No hay datos disponibles", className="text-center")
-                    ])
-                ])
-            ], md=12)
-        ]
-        
-        return "", empty_fig, empty_fig, empty_fig, empty_fig, empty_kpis, [], []
+    filtros = (division, team, position, player, start_date, end_date)
+    if obtener_filtrado_performance(*filtros).empty:
+        return figura_vacia("No hay datos disponibles con los filtros seleccionados")
     
-    # Convertir fechas a datetime
-    start_date = pd.to_datetime(start_date) if start_date else None
-    end_date = pd.to_datetime(end_date) if end_date else None
+    return figura_radar_performance(metric, *filtros)
+
+# Mapa de calor de correlaciones (no depende de la métrica elegida)
+@callback(
+    Output("heatmap-plot", "figure"),
+    ENTRADAS_FILTROS
+)
+def actualizar_heatmap(division, team, position, player, start_date, end_date):
+    """Actualiza el mapa de calor de correlaciones entre métricas"""
+    filtros = (division, team, position, player, start_date, end_date)
+    if obtener_filtrado_performance(*filtros).empty:
+        return figura_vacia("No hay datos disponibles con los filtros seleccionados")
     
-    # Filtrar datos
-    filtered_df = filtrar_dataframe_performance(df, division, team, position, player, start_date, end_date)
+    return figura_heatmap_performance(*filtros)
+
+# Tarjetas KPI
+@callback(
+    Output("kpi-cards-row", "children"),
+    ENTRADAS_FILTROS + [Input("metric-filter", "value")]
+)
+def actualizar_kpis(division, team, position, player, start_date, end_date, metric):
+    """Actualiza las tarjetas KPI de la métrica seleccionada"""
+    if cargar_datos_performance().empty:
+        return tarjetas_sin_datos("No hay datos disponibles")
     
-    # Si no hay datos después del filtrado
+    filtered_df = obtener_filtrado_performance(division, team, position, player, start_date, end_date)
     if filtered_df.empty:
-        empty_fig = go.Figure()
-        empty_fig.update_layout(title="No hay datos disponibles con los filtros seleccionados")
-        
-        empty_kpis = [
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H6("No hay datos con los filtros seleccionados", className="text-center text-warning")
-                    ])
-                ])
-            ], md=12)
-        ]
-        
-        return "", empty_fig, empty_fig, empty_fig, empty_fig, empty_kpis, [], []
-    
-    # Generar gráficos
-    evolucion_fig = generar_grafico_evolucion(filtered_df, metric, 
-                                            f"Evolución de {metric.replace('_', ' ').title()}")
-    
-    comparativa_fig = generar_grafico_comparativo(filtered_df, metric, 'posicion', 
-                                                f"{metric.replace('_', ' ').title()} por Posición")
-    
-    # Gráfico de radar para el primer jugador (o todos si no se seleccionó ninguno)
-    if player and player != "Todos":
-        radar_fig = generar_grafico_radar(filtered_df, player)
-    else:
-        # Si no hay un jugador específico, mostrar el jugador con mejor métrica
-        mejor_jugador = filtered_df.groupby('jugador')[metric].mean().idxmax()
-        radar_fig = generar_grafico_radar(filtered_df, mejor_jugador)
-    
-    # Mapa de calor de correlaciones
-    heatmap_fig = generar_heatmap_correlacion(filtered_df)
+        return tarjetas_sin_datos("No hay datos con los filtros seleccionados", "text-center text-warning")
     
     # Calcular KPIs
     try:
@@ -859,7 +1042,7 @@ def actualizar_datos_y_graficos(division, team, position, player, metric, start_
         jugador_max = "N/A"
     
     # Crear tarjetas KPI
-    kpi_cards = [
+    return [
         dbc.Col([
             dbc.Card([
                 dbc.CardBody([
@@ -897,47 +1080,65 @@ def actualizar_datos_y_graficos(division, team, position, player, metric, start_
             ], className="text-center")
         ], md=3)
     ]
+
+# Página visible de la tabla de rendimiento
+@callback(
+    [Output("rendimiento-table", "data"),
+     Output("rendimiento-table", "page_count"),
+     Output("rendimiento-table", "columns"),
+     Output("rendimiento-table", "page_current")],
+    [Input("filtered-data", "data"),
+     Input("metric-filter", "value"),
+     Input("rendimiento-table", "page_current"),
+     Input("rendimiento-table", "page_size"),
+     Input("rendimiento-table", "sort_by"),
+     Input("rendimiento-table", "filter_query")]
+)
+def actualizar_tabla_performance(clave_datos, metric, page_current, page_size, sort_by, filter_query):
+    if not metric:
+        return [], 1, [], 0
     
-    # Preparar datos para la tabla
-    if filtered_df.empty:
-        table_data = []
-        table_columns = []
-    else:
-        # Seleccionar columnas relevantes para la tabla
-        cols = ['jugador', 'posicion', 'equipo', metric, 'fecha']
-        table_df = filtered_df[cols].copy()
-        
-        # Agrupar por jugador para mostrar promedios
-        table_df = table_df.groupby(['jugador', 'posicion', 'equipo'])[metric].mean().reset_index()
-        
-        # Ordenar por la métrica seleccionada (descendente)
-        table_df = table_df.sort_values(by=metric, ascending=False)
-        
-        # Renombrar columnas para mejor visualización
-        rename_map = {
-            'jugador': 'Jugador', 
-            'posicion': 'Posición', 
-            'equipo': 'Equipo', 
-            metric: metric.replace('_', ' ').title()
-        }
-        table_df = table_df.rename(columns=rename_map)
-        
-        # Formatear valores numéricos
-        for col in table_df.columns:
-            if col not in ['Jugador', 'Posición', 'Equipo']:
-                table_df[col] = table_df[col].round(2)
-        
-        # Convertir a formato para DataTable
-        table_data = table_df.to_dict('records')
-        table_columns = [{"name": col, "id": col} for col in table_df.columns]
+    columnas = columnas_tabla_performance(metric)
+    
+    # Una selección, métrica o filtro de tabla nuevos vuelven a la primera página
+    if ctx.triggered_id is None or ctx.triggered_prop_ids.keys() & {"filtered-data.data", "metric-filter.value", "rendimiento-table.filter_query"}:
+        page_current = 0
     
-    # Devolver todos los outputs
-    return filtered_df.to_json(date_format='iso', orient='split'), evolucion_fig, comparativa_fig, radar_fig, heatmap_fig, kpi_cards, table_data, table_columns
+    if not clave_datos:
+        return [], 1, columnas, page_current
+    
+    try:
+        table_df = obtener_tabla_performance(metric, *clave_datos["filtros"])
+        data, page_count = datatable_query.pagina(table_df, page_current, page_size, filter_query, sort_by)
+        return data, page_count, columnas, page_current
+    except Exception as e:
+        print(f"Error al paginar la tabla de rendimiento: {e}")
+        return [], 1, columnas, page_current
 
-# Callback para exportar a PDF
+def argumentos_informe_performance(clave_datos, division, team, position, player, metric):
+    """Resuelve los datos de un informe PDF; devuelve los argumentos de utils.pdf_reports.informe_performance"""
+    return (resolver_datos_performance(clave_datos), division, team, position, player, metric)
+
+def generar_informe_performance(avance, huella, clave_datos, division, team, position, player, metric):
+    """Tarea en segundo plano del informe PDF: resuelve los datos y arma el documento en el pool de procesos"""
+    avance(20, "Preparando los datos")
+    argumentos = argumentos_informe_performance(clave_datos, division, team, position, player, metric)
+    
+    avance(50, "Armando el PDF")
+    contenido = trabajos_pdf_performance.run_in_process(informe_performance, *argumentos)
+    informes_performance.put(huella, [clave_datos, division, team, position, player, metric], contenido)
+    return dict(contenido=contenido, nombre=nombre_archivo("informe_rendimiento"), tipo="application/pdf")
+
+# Exportar a PDF: el informe se genera en segundo plano y se descarga al terminar
 @callback(
-    Output("perf-download-pdf", "data"), # Usar el nuevo ID aquí
-    [Input("perf-export-pdf-btn", "n_clicks")], # Y aquí
+    [Output("perf-pdf-job", "data"),
+     Output("perf-pdf-job-interval", "disabled"),
+     Output("perf-export-pdf-btn", "disabled"),
+     Output("perf-pdf-progress", "value"),
+     Output("perf-pdf-progress", "label"),
+     Output("perf-pdf-progress", "style"),
+     Output("perf-download-pdf", "data", allow_duplicate=True)],
+    [Input("perf-export-pdf-btn", "n_clicks")],
     [State("filtered-data", "data"),
      State("division-filter", "value"),
      State("team-filter", "value"),
@@ -946,371 +1147,48 @@ def actualizar_datos_y_graficos(division, team, position, player, metric, start_
      State("metric-filter", "value")],
     prevent_initial_call=True
 )
-def exportar_pdf(n_clicks, json_data, division, team, position, player, metric):
-    """Genera un PDF con análisis de los datos de performance."""
+def exportar_pdf(n_clicks, clave_datos, division, team, position, player, metric):
+    """Encola la generación del PDF con análisis de los datos de performance (o lo descarga si ya se generó)."""
     if not n_clicks:
         raise PreventUpdate
     
-    try:
-        import base64
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib import colors
-        from reportlab.lib.units import inch, cm
-        
-        # Crear buffer para PDF
-        buffer = io.BytesIO()
-        
-        # Crear documento
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=A4,
-            leftMargin=1.5*cm,
-            rightMargin=1.5*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm
-        )
-        
-        elements = []
-        
-        # Definir estilos
-        styles = getSampleStyleSheet()
-        
-        # Estilo para título principal
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.darkblue,
-            spaceAfter=20,
-            alignment=1  # Centrado
-        )
-        
-        # Estilo para subtítulos
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.darkblue,
-            spaceBefore=15,
-            spaceAfter=10
-        )
-        
-        # Estilo para texto normal
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=8
-        )
-        
-        # Título con formato mejorado
-        elements.append(Paragraph("Informe de Rendimiento Deportivo", title_style))
-        
-        # Línea horizontal después del título
-        elements.append(Spacer(1, 1))
-        elements.append(Table([[""]], colWidths=[doc.width], style=TableStyle([
-            ('LINEABOVE', (0, 0), (-1, 0), 1, colors.darkblue),
-        ])))
-        elements.append(Spacer(1, 10))
-        
-        # Fecha del informe con formato mejorado
-        fecha = datetime.now().strftime("%d/%m/%Y %H:%M")
-        elements.append(Paragraph(f"Generado el: {fecha}", normal_style))
-        elements.append(Spacer(1, 15))
-        
-        # Convertir JSON a DataFrame
-        if json_data:
-            df = pd.read_json(json_data, orient='split')
-        else:
-            df = pd.DataFrame()
-        
-        # Sección de filtros aplicados
-        elements.append(Paragraph("Filtros aplicados", subtitle_style))
-        
-        filtros_data = [
-            ["Filtro", "Valor"],
-            ["División", division if division != "Todas" else "Todas las divisiones"],
-            ["Equipo", team if team != "Todos" else "Todos los equipos"],
-            ["Posición", position if position != "Todas" else "Todas las posiciones"],
-            ["Jugador", player if player != "Todos" else "Todos los jugadores"],
-            ["Métrica principal", metric.replace('_', ' ').title()]
-        ]
-        
-        # Tabla de filtros con estilo mejorado
-        filtros_tabla = Table(filtros_data, colWidths=[3*cm, 12*cm])
-        filtros_tabla.setStyle(TableStyle([
-            # Encabezado
-            ('BACKGROUND', (0, 0), (1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (1, 0), colors.white),
-            ('ALIGN', (0, 0), (1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (1, 0), 8),
-            ('TOPPADDING', (0, 0), (1, 0), 8),
-            
-            # Cuerpo de la tabla
-            ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 1), (0, -1), colors.darkblue),
-            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 1), (0, -1), 10),
-            ('VALIGN', (0, 1), (1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (1, -1), 0.5, colors.grey),
-            ('BOTTOMPADDING', (0, 1), (1, -1), 6),
-            ('TOPPADDING', (0, 1), (1, -1), 6),
-            
-            # Bordes exteriores más gruesos
-            ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-        ]))
-        
-        elements.append(filtros_tabla)
-        elements.append(Spacer(1, 20))
-        
-        # Estadísticas Básicas
-        if not df.empty:
-            elements.append(Paragraph("Estadísticas Básicas", subtitle_style))
-            
-            # Calcular estadísticas clave
-            n_jugadores = df['jugador'].nunique()
-            metric_prom = df[metric].mean()
-            metric_max = df[metric].max()
-            metric_min = df[metric].min()
-            
-            # Identificar jugador con valor máximo
-            idx_max = df[metric].idxmax()
-            jugador_max = df.loc[idx_max, 'jugador']
-            equipo_max = df.loc[idx_max, 'equipo']
-            posicion_max = df.loc[idx_max, 'posicion']
-            
-            # Crear tabla de estadísticas
-            stats_data = [
-                ["Métrica", "Valor"],
-                ["Total Jugadores", f"{n_jugadores}"],
-                [f"{metric.replace('_', ' ').title()} Promedio", f"{metric_prom:.2f}"],
-                [f"{metric.replace('_', ' ').title()} Máximo", f"{metric_max:.2f}"],
-                [f"{metric.replace('_', ' ').title()} Mínimo", f"{metric_min:.2f}"],
-                ["Jugador Destacado", f"{jugador_max} ({posicion_max}, {equipo_max})"]
-            ]
-            
-            # Tabla de estadísticas con estilo mejorado
-            stats_tabla = Table(stats_data, colWidths=[8*cm, 7*cm])
-            stats_tabla.setStyle(TableStyle([
-                # Encabezado
-                ('BACKGROUND', (0, 0), (1, 0), colors.darkblue),
-                ('TEXTCOLOR', (0, 0), (1, 0), colors.white),
-                ('ALIGN', (0, 0), (1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (1, 0), 8),
-                ('TOPPADDING', (0, 0), (1, 0), 8),
-                
-                # Cuerpo de la tabla
-                ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
-                ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-                ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-                ('FONTSIZE', (0, 1), (1, -1), 10),
-                ('VALIGN', (0, 1), (1, -1), 'MIDDLE'),
-                ('GRID', (0, 0), (1, -1), 0.5, colors.grey),
-                ('BOTTOMPADDING', (0, 1), (1, -1), 6),
-                ('TOPPADDING', (0, 1), (1, -1), 6),
-                
-                # Bordes exteriores más gruesos
-                ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-            ]))
-            
-            elements.append(stats_tabla)
-            elements.append(Spacer(1, 15))
-            
-            # Top jugadores por la métrica seleccionada
-            elements.append(Paragraph(f"Top 5 Jugadores por {metric.replace('_', ' ').title()}", subtitle_style))
-            
-            if len(df) > 0:
-                # Calcular el promedio de la métrica por jugador
-                top_metric = df.groupby(['jugador', 'posicion', 'equipo'])[metric].mean().reset_index()
-                top_metric = top_metric.sort_values(metric, ascending=False).head(5)
-                
-                # Verificar si hay datos disponibles
-                if len(top_metric) > 0:
-                    top_data = [["Jugador", "Posición", "Equipo", metric.replace('_', ' ').title()]]
-                    
-                    for _, row in top_metric.iterrows():
-                        top_data.append([
-                            row['jugador'],
-                            row['posicion'],
-                            row['equipo'],
-                            f"{row[metric]:.2f}"
-                        ])
-                    
-                    # Asegurarse de que hay al menos dos filas (encabezado + 1 dato)
-                    if len(top_data) >= 2:
-                        top_tabla = Table(top_data, colWidths=[4*cm, 4*cm, 4*cm, 3*cm])
-                        top_tabla.setStyle(TableStyle([
-                            # Encabezado
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                            ('FONTSIZE', (0, 0), (-1, 0), 11),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                            ('TOPPADDING', (0, 0), (-1, 0), 8),
-                            
-                            # Cuerpo de la tabla
-                            ('FONTSIZE', (0, 1), (-1, -1), 9),
-                            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                            ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
-                            ('ALIGN', (3, 1), (3, -1), 'CENTER'),
-                            ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-                            ('TOPPADDING', (0, 1), (-1, -1), 5),
-                            
-                            # Bordes exteriores más gruesos
-                            ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-                        ]))
-                        
-                        # Aplicar estilos de fondo alternados
-                        for i in range(1, len(top_data), 2):
-                            if i < len(top_data):
-                                top_tabla.setStyle(TableStyle([
-                                    ('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
-                                ]))
-                        
-                        elements.append(top_tabla)
-                    else:
-                        elements.append(Paragraph("No hay suficientes datos para mostrar la tabla", normal_style))
-                else:
-                    elements.append(Paragraph("No hay datos disponibles para mostrar", normal_style))
-            
-            elements.append(Spacer(1, 20))
-            
-            # Análisis por posición
-            elements.append(Paragraph(f"Análisis por Posición", subtitle_style))
-            
-            if len(df) > 0:
-                # Calcular el promedio de la métrica por posición
-                posicion_metric = df.groupby('posicion')[metric].mean().reset_index()
-                posicion_metric = posicion_metric.sort_values(metric, ascending=False)
-                
-                # Verificar si hay datos disponibles
-                if len(posicion_metric) > 0:
-                    pos_data = [["Posición", metric.replace('_', ' ').title()]]
-                    
-                    for _, row in posicion_metric.iterrows():
-                        pos_data.append([
-                            row['posicion'],
-                            f"{row[metric]:.2f}"
-                        ])
-                    
-                    # Asegurarse de que hay al menos dos filas (encabezado + 1 dato)
-                    if len(pos_data) >= 2:
-                        pos_tabla = Table(pos_data, colWidths=[8*cm, 7*cm])
-                        pos_tabla.setStyle(TableStyle([
-                            # Encabezado
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                            ('FONTSIZE', (0, 0), (-1, 0), 11),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                            ('TOPPADDING', (0, 0), (-1, 0), 8),
-                            
-                            # Cuerpo de la tabla
-                            ('FONTSIZE', (0, 1), (-1, -1), 10),
-                            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                            ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
-                            ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-                            ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-                            ('TOPPADDING', (0, 1), (-1, -1), 5),
-                            
-                            # Bordes exteriores más gruesos
-                            ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-                        ]))
-                        
-                        # Aplicar estilos de fondo alternados
-                        for i in range(1, len(pos_data), 2):
-                            if i < len(pos_data):
-                                pos_tabla.setStyle(TableStyle([
-                                    ('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
-                                ]))
-                        
-                        elements.append(pos_tabla)
-                    else:
-                        elements.append(Paragraph("No hay suficientes datos para mostrar la tabla", normal_style))
-                else:
-                    elements.append(Paragraph("No hay datos disponibles para mostrar", normal_style))
-            
-            elements.append(Spacer(1, 20))
-            
-            # Conclusiones y recomendaciones
-            elements.append(Paragraph("Conclusiones y Recomendaciones", subtitle_style))
-            
-            # Generar conclusiones básicas basadas en los datos
-            conclusions_text = f"""
-            Este informe presenta un análisis del rendimiento deportivo basado en la métrica {metric.replace('_', ' ').title()}.
-            
-            Los datos analizados muestran un valor promedio de {metric_prom:.2f}, con un máximo de {metric_max:.2f} alcanzado por {jugador_max} ({posicion_max}).
-            
-            El análisis por posición revela que los jugadores en la posición de {posicion_metric.iloc[0]['posicion']} tienen el mejor rendimiento promedio en esta métrica ({posicion_metric.iloc[0][metric]:.2f}).
-            """
-            
-            # Recomendaciones específicas según la métrica
-            if metric == 'velocidad_media':
-                recommendations = """
-                Recomendaciones para mejorar la velocidad media:
-                • Implementar entrenamientos específicos de sprint y aceleración
-                • Realizar ejercicios de resistencia a la velocidad
-                • Incorporar trabajo de potencia y pliometría
-                • Revisar técnica de carrera para optimizar la eficiencia
-                """
-            
-            elements.append(Paragraph(conclusions_text, normal_style))
-            elements.append(Spacer(1, 10))
-            elements.append(Paragraph(recommendations, normal_style))
-            
-            # Pie de página
-            elements.append(Spacer(1, 30))
-            elements.append(Table([[""]], colWidths=[doc.width], style=TableStyle([
-                ('LINEABOVE', (0, 0), (-1, 0), 0.5, colors.grey),
-            ])))
-            elements.append(Spacer(1, 5))
-            elements.append(Paragraph("Dashboard Deportivo - Análisis de Rendimiento - Documento generado automáticamente", 
-                                    ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey)))
-            
-        else:
-            elements.append(Paragraph("No hay datos disponibles con los filtros seleccionados.", normal_style))
-        
-        # Construir el PDF
-        doc.build(elements)
-        
-        # Obtener el contenido del buffer y codificarlo en base64
-        buffer.seek(0)
-        pdf_bytes = buffer.getvalue()
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        
-        # Crear nombre de archivo
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"informe_rendimiento_{timestamp}.pdf"
-        
-        return dict(
-            content=pdf_base64,
-            filename=filename,
-            type="application/pdf",
-            base64=True
-        )
-        
-    except Exception as e:
-        import traceback
-        error_traceback = traceback.format_exc()
-        print(f"Error al generar PDF: {e}")
-        print(f"Traceback: {error_traceback}")
-        
-        # Devolver mensaje de error como texto plano
-        return dict(
-            content=f"Error al generar el PDF: {str(e)}\n\nDetalles técnicos para el soporte:\n{error_traceback}",
-            filename="error.txt",
-            type="text/plain"
-        )
+    huella = performance_store.fingerprint()
+    contenido = informes_performance.get(huella, [clave_datos, division, team, position, player, metric])
+    if contenido is not None:
+        return no_update, True, False, 0, "", {"display": "none"}, \
+            descarga(contenido, nombre_archivo("informe_rendimiento"), "application/pdf")
+    
+    id_trabajo = trabajos_pdf_performance.submit(
+        generar_informe_performance, huella, clave_datos, division, team, position, player, metric
+    )
+    return id_trabajo, False, True, 0, "En cola", {"display": "flex"}, no_update
+
+@callback(
+    [Output("perf-download-pdf", "data"),
+     Output("perf-pdf-job-interval", "disabled", allow_duplicate=True),
+     Output("perf-export-pdf-btn", "disabled", allow_duplicate=True),
+     Output("perf-pdf-progress", "value", allow_duplicate=True),
+     Output("perf-pdf-progress", "label", allow_duplicate=True),
+     Output("perf-pdf-progress", "style", allow_duplicate=True),
+     Output("perf-pdf-error", "children")],
+    [Input("perf-pdf-job-interval", "n_intervals")],
+    [State("perf-pdf-job", "data")],
+    prevent_initial_call=True
+)
+def seguir_pdf(_, id_trabajo):
+    """Muestra el avance del informe y lo descarga cuando está listo."""
+    oculto = {"display": "none"}
+    estado = trabajos_pdf_performance.status(id_trabajo) if id_trabajo else None
+    
+    if estado is None:
+        return no_update, True, False, 0, "", oculto, "No se encontró el informe en curso."
+    if estado["estado"] == ERROR:
+        trabajos_pdf_performance.discard(id_trabajo)
+        return no_update, True, False, 0, "", oculto, f"Error al generar el PDF: {estado['mensaje']}"
+    if estado["estado"] == LISTO:
+        return trabajos_pdf_performance.download(id_trabajo), True, False, 100, "Listo", oculto, ""
+    
+    return no_update, False, True, estado["progreso"], estado["mensaje"], {"display": "flex"}, ""
 
 # Callback para generar el análisis con IA
 @callback(
@@ -1320,17 +1198,17 @@ def exportar_pdf(n_clicks, json_data, division, team, position, player, metric):
     [State("filtered-data", "data")],
     prevent_initial_call=True
 )
-def generate_performance_analysis(n_clicks, json_data):
+def generate_performance_analysis(n_clicks, clave_datos):
     """Genera un análisis de los datos de rendimiento utilizando IA."""
-    if not n_clicks or not json_data:
+    if not n_clicks or not clave_datos:
         raise PreventUpdate
     
     # Mostrar indicador de carga
     loading_style = {"display": "block"}
     
     try:
-        # Convertir JSON a DataFrame
-        df = pd.read_json(json_data, orient='split')
+        # Obtener los datos filtrados desde la caché del servidor
+        df = resolver_datos_performance(clave_datos)
         
         if df.empty:
             return {"display": "none"}, html.Div("No hay datos disponibles para analizar.", className="text-muted")
@@ -1344,7 +1222,7 @@ def generate_performance_analysis(n_clicks, json_data):
         num_posiciones = df['posicion'].nunique()
         
         # Estadísticas por posición
-        pos_stats = df.groupby('posicion').agg({
+        pos_stats = df.groupby('posicion', observed=True).agg({
             'velocidad_media': 'mean',
             'resistencia': 'mean',
             'sprint_maximo': 'mean',
@@ -1384,9 +1262,6 @@ Los datos muestran que el jugador con mayor velocidad media es **{top_vel_jugado
         
         # Intentar conectar con Ollama para un análisis más detallado
         try:
-            # Crear instancia de OllamaAnalysis
-            ollama = OllamaAnalysis(model="deepseek-r1:8b")
-            
             # Preparar mensaje informativo
             ollama_message = html.Div([
                 html.P("Se está intentando conectar con el servicio de IA para un análisis más detallado...", 
@@ -1446,431 +1321,6 @@ Los datos muestran que el jugador con mayor velocidad media es **{top_vel_jugado
             html.Div("Error al generar el análisis.", className="text-danger"),
             html.Div(f"Detalles: {str(e)}", className="text-muted small")
         ])
-    # Callback para exportar a PDF
-@callback(
-    Output("download-pdf", "data"),
-    [Input("export-pdf-btn", "n_clicks")],
-    [State("filtered-data", "data"),
-     State("division-filter", "value"),
-     State("team-filter", "value"),
-     State("position-filter", "value"),
-     State("player-filter", "value"),
-     State("metric-filter", "value")],
-    prevent_initial_call=True
-)
-def exportar_pdf(n_clicks, json_data, division, team, position, player, metric):
-    """Genera un PDF con análisis de los datos de performance."""
-    if not n_clicks:
-        raise PreventUpdate
-    
-    try:
-        import base64
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib import colors
-        from reportlab.lib.units import inch, cm
-        
-        # Crear buffer para PDF
-        buffer = io.BytesIO()
-        
-        # Crear documento
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=A4,
-            leftMargin=1.5*cm,
-            rightMargin=1.5*cm,
-            topMargin=2*cm,
-            bottomMargin=2*cm
-        )
-        
-        elements = []
-        
-        # Definir estilos
-        styles = getSampleStyleSheet()
-        
-        # Estilo para título principal
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.darkblue,
-            spaceAfter=20,
-            alignment=1  # Centrado
-        )
-        
-        # Estilo para subtítulos
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.darkblue,
-            spaceBefore=15,
-            spaceAfter=10
-        )
-        
-        # Estilo para texto normal
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=8
-        )
-        
-        # Título con formato mejorado
-        elements.append(Paragraph("Informe de Rendimiento Deportivo", title_style))
-        
-        # Línea horizontal después del título
-        elements.append(Spacer(1, 1))
-        elements.append(Table([[""]], colWidths=[doc.width], style=TableStyle([
-            ('LINEABOVE', (0, 0), (-1, 0), 1, colors.darkblue),
-        ])))
-        elements.append(Spacer(1, 10))
-        
-        # Fecha del informe con formato mejorado
-        fecha = datetime.now().strftime("%d/%m/%Y %H:%M")
-        elements.append(Paragraph(f"Generado el: {fecha}", normal_style))
-        elements.append(Spacer(1, 15))
-        
-        # Convertir JSON a DataFrame
-        if json_data:
-            df = pd.read_json(json_data, orient='split')
-        else:
-            df = pd.DataFrame()
-        
-        # Sección de filtros aplicados
-        elements.append(Paragraph("Filtros aplicados", subtitle_style))
-        
-        filtros_data = [
-            ["Filtro", "Valor"],
-            ["División", division if division != "Todas" else "Todas las divisiones"],
-            ["Equipo", team if team != "Todos" else "Todos los equipos"],
-            ["Posición", position if position != "Todas" else "Todas las posiciones"],
-            ["Jugador", player if player != "Todos" else "Todos los jugadores"],
-            ["Métrica principal", metric.replace('_', ' ').title()]
-        ]
-        
-        # Tabla de filtros con estilo mejorado
-        filtros_tabla = Table(filtros_data, colWidths=[3*cm, 12*cm])
-        filtros_tabla.setStyle(TableStyle([
-            # Encabezado
-            ('BACKGROUND', (0, 0), (1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (1, 0), colors.white),
-            ('ALIGN', (0, 0), (1, 0), 'CENTER'),
-            ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (1, 0), 8),
-            ('TOPPADDING', (0, 0), (1, 0), 8),
-            
-            # Cuerpo de la tabla
-            ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 1), (0, -1), colors.darkblue),
-            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 1), (0, -1), 10),
-            ('VALIGN', (0, 1), (1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (1, -1), 0.5, colors.grey),
-            ('BOTTOMPADDING', (0, 1), (1, -1), 6),
-            ('TOPPADDING', (0, 1), (1, -1), 6),
-            
-            # Bordes exteriores más gruesos
-            ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-        ]))
-        
-        elements.append(filtros_tabla)
-        elements.append(Spacer(1, 20))
-        
-        # Estadísticas Básicas
-        if not df.empty:
-            elements.append(Paragraph("Estadísticas Básicas", subtitle_style))
-            
-            # Calcular estadísticas clave
-            n_jugadores = df['jugador'].nunique()
-            metric_prom = df[metric].mean()
-            metric_max = df[metric].max()
-            metric_min = df[metric].min()
-            
-            # Identificar jugador con valor máximo
-            idx_max = df[metric].idxmax()
-            jugador_max = df.loc[idx_max, 'jugador']
-            equipo_max = df.loc[idx_max, 'equipo']
-            posicion_max = df.loc[idx_max, 'posicion']
-            
-            # Crear tabla de estadísticas
-            stats_data = [
-                ["Métrica", "Valor"],
-                ["Total Jugadores", f"{n_jugadores}"],
-                [f"{metric.replace('_', ' ').title()} Promedio", f"{metric_prom:.2f}"],
-                [f"{metric.replace('_', ' ').title()} Máximo", f"{metric_max:.2f}"],
-                [f"{metric.replace('_', ' ').title()} Mínimo", f"{metric_min:.2f}"],
-                ["Jugador Destacado", f"{jugador_max} ({posicion_max}, {equipo_max})"]
-            ]
-            
-            # Tabla de estadísticas con estilo mejorado
-            stats_tabla = Table(stats_data, colWidths=[8*cm, 7*cm])
-            stats_tabla.setStyle(TableStyle([
-                # Encabezado
-                ('BACKGROUND', (0, 0), (1, 0), colors.darkblue),
-                ('TEXTCOLOR', (0, 0), (1, 0), colors.white),
-                ('ALIGN', (0, 0), (1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (1, 0), 8),
-                ('TOPPADDING', (0, 0), (1, 0), 8),
-                
-                # Cuerpo de la tabla
-                ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
-                ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-                ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-                ('FONTSIZE', (0, 1), (1, -1), 10),
-                ('VALIGN', (0, 1), (1, -1), 'MIDDLE'),
-                ('GRID', (0, 0), (1, -1), 0.5, colors.grey),
-                ('BOTTOMPADDING', (0, 1), (1, -1), 6),
-                ('TOPPADDING', (0, 1), (1, -1), 6),
-                
-                # Bordes exteriores más gruesos
-                ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-            ]))
-            
-            elements.append(stats_tabla)
-            elements.append(Spacer(1, 15))
-            
-            # Top jugadores por la métrica seleccionada
-            elements.append(Paragraph(f"Top 5 Jugadores por {metric.replace('_', ' ').title()}", subtitle_style))
-            
-            if len(df) > 0:
-                # Calcular el promedio de la métrica por jugador
-                top_metric = df.groupby(['jugador', 'posicion', 'equipo'])[metric].mean().reset_index()
-                top_metric = top_metric.sort_values(metric, ascending=False).head(5)
-                
-                # Verificar si hay datos disponibles
-                if len(top_metric) > 0:
-                    top_data = [["Jugador", "Posición", "Equipo", metric.replace('_', ' ').title()]]
-                    
-                    for _, row in top_metric.iterrows():
-                        top_data.append([
-                            row['jugador'],
-                            row['posicion'],
-                            row['equipo'],
-                            f"{row[metric]:.2f}"
-                        ])
-                    
-                    # Asegurarse de que hay al menos dos filas (encabezado + 1 dato)
-                    if len(top_data) >= 2:
-                        top_tabla = Table(top_data, colWidths=[4*cm, 4*cm, 4*cm, 3*cm])
-                        top_tabla.setStyle(TableStyle([
-                            # Encabezado
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                            ('FONTSIZE', (0, 0), (-1, 0), 11),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                            ('TOPPADDING', (0, 0), (-1, 0), 8),
-                            
-                            # Cuerpo de la tabla
-                            ('FONTSIZE', (0, 1), (-1, -1), 9),
-                            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                            ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
-                            ('ALIGN', (3, 1), (3, -1), 'CENTER'),
-                            ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-                            ('TOPPADDING', (0, 1), (-1, -1), 5),
-                            
-                            # Bordes exteriores más gruesos
-                            ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-                        ]))
-                        
-                        # Aplicar estilos de fondo alternados
-                        for i in range(1, len(top_data), 2):
-                            if i < len(top_data):
-                                top_tabla.setStyle(TableStyle([
-                                    ('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
-                                ]))
-                        
-                        elements.append(top_tabla)
-                    else:
-                        elements.append(Paragraph("No hay suficientes datos para mostrar la tabla", normal_style))
-                else:
-                    elements.append(Paragraph("No hay datos disponibles para mostrar", normal_style))
-            
-            elements.append(Spacer(1, 20))
-            
-            # Análisis por posición
-            elements.append(Paragraph(f"Análisis por Posición", subtitle_style))
-            
-            if len(df) > 0:
-                # Calcular el promedio de la métrica por posición
-                posicion_metric = df.groupby('posicion')[metric].mean().reset_index()
-                posicion_metric = posicion_metric.sort_values(metric, ascending=False)
-                
-                # Verificar si hay datos disponibles
-                if len(posicion_metric) > 0:
-                    pos_data = [["Posición", metric.replace('_', ' ').title()]]
-                    
-                    for _, row in posicion_metric.iterrows():
-                        pos_data.append([
-                            row['posicion'],
-                            f"{row[metric]:.2f}"
-                        ])
-                    
-                    # Asegurarse de que hay al menos dos filas (encabezado + 1 dato)
-                    if len(pos_data) >= 2:
-                        pos_tabla = Table(pos_data, colWidths=[8*cm, 7*cm])
-                        pos_tabla.setStyle(TableStyle([
-                            # Encabezado
-                            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-                            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                            ('FONTSIZE', (0, 0), (-1, 0), 11),
-                            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                            ('TOPPADDING', (0, 0), (-1, 0), 8),
-                            
-                            # Cuerpo de la tabla
-                            ('FONTSIZE', (0, 1), (-1, -1), 10),
-                            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                            ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
-                            ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-                            ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
-                            ('TOPPADDING', (0, 1), (-1, -1), 5),
-                            
-                            # Bordes exteriores más gruesos
-                            ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
-                        ]))
-                        
-                        # Aplicar estilos de fondo alternados
-                        for i in range(1, len(pos_data), 2):
-                            if i < len(pos_data):
-                                pos_tabla.setStyle(TableStyle([
-                                    ('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
-                                ]))
-                        
-                        elements.append(pos_tabla)
-                    else:
-                        elements.append(Paragraph("No hay suficientes datos para mostrar la tabla", normal_style))
-                else:
-                    elements.append(Paragraph("No hay datos disponibles para mostrar", normal_style))
-            
-            elements.append(Spacer(1, 20))
-            
-            # Conclusiones y recomendaciones
-            elements.append(Paragraph("Conclusiones y Recomendaciones", subtitle_style))
-            
-            # Generar conclusiones básicas basadas en los datos
-            conclusions_text = f"""
-            Este informe presenta un análisis del rendimiento deportivo basado en la métrica {metric.replace('_', ' ').title()}.
-            
-            Los datos analizados muestran un valor promedio de {metric_prom:.2f}, con un máximo de {metric_max:.2f} alcanzado por {jugador_max} ({posicion_max}).
-            
-            El análisis por posición revela que los jugadores en la posición de {posicion_metric.iloc[0]['posicion']} tienen el mejor rendimiento promedio en esta métrica ({posicion_metric.iloc[0][metric]:.2f}).
-            """
-            
-            # Recomendaciones específicas según la métrica
-            if metric == 'velocidad_media':
-                recommendations = """
-                Recomendaciones para mejorar la velocidad media:
-                • Implementar entrenamientos específicos de sprint y aceleración
-                • Realizar ejercicios de resistencia a la velocidad
-                • Incorporar trabajo de potencia y pliometría
-                • Revisar técnica de carrera para optimizar la eficiencia
-                """
-            elif metric == 'resistencia':
-                recommendations = """
-                Recomendaciones para mejorar la resistencia:
-                • Aumentar gradualmente el volumen de entrenamiento aeróbico
-                • Incorporar entrenamientos de intervalos de alta intensidad
-                • Realizar entrenamientos de umbral láctico
-                • Monitorear la recuperación y evitar el sobreentrenamiento
-                """
-            elif metric == 'sprint_maximo':
-                recommendations = """
-                Recomendaciones para mejorar el sprint máximo:
-                • Entrenar la fase de aceleración con ejercicios específicos
-                • Incorporar entrenamiento de fuerza explosiva
-                • Trabajar la técnica de carrera a máxima velocidad
-                • Utilizar ejercicios de resistencia específicos (arrastres, cuestas)
-                """
-            elif metric == 'pases_completados':
-                recommendations = """
-                Recomendaciones para mejorar los pases completados:
-                • Realizar ejercicios de precisión de pase con diferentes distancias
-                • Trabajar en situaciones de juego reducido bajo presión
-                • Mejorar la toma de decisiones con ejercicios específicos
-                • Analizar video para identificar patrones de pase efectivos
-                """
-            elif metric == 'precision_tiros':
-                recommendations = """
-                Recomendaciones para mejorar la precisión de tiros:
-                • Incrementar el volumen de repeticiones en entrenamientos
-                • Realizar ejercicios de tiro bajo fatiga y presión
-                • Trabajar la técnica específica según la posición del jugador
-                • Implementar ejercicios de toma de decisiones rápidas
-                """
-            elif metric == 'duelos_ganados':
-                recommendations = """
-                Recomendaciones para mejorar los duelos ganados:
-                • Fortalecer el tren inferior y superior para mejorar en duelos físicos
-                • Trabajar la anticipación y lectura del juego
-                • Mejorar la técnica de entrada y posicionamiento defensivo
-                • Realizar ejercicios de 1v1 en diferentes situaciones de juego
-                """
-            else:
-                recommendations = """
-                Recomendaciones generales:
-                • Individualizar los entrenamientos según el perfil de cada jugador
-                • Monitorear constantemente el rendimiento para detectar mejoras
-                • Establecer objetivos específicos y medibles
-                • Integrar el trabajo técnico, táctico, físico y mental
-                """
-            
-            elements.append(Paragraph(conclusions_text, normal_style))
-            elements.append(Spacer(1, 10))
-            elements.append(Paragraph(recommendations, normal_style))
-            
-            # Pie de página
-            elements.append(Spacer(1, 30))
-            elements.append(Table([[""]], colWidths=[doc.width], style=TableStyle([
-                ('LINEABOVE', (0, 0), (-1, 0), 0.5, colors.grey),
-            ])))
-            elements.append(Spacer(1, 5))
-            elements.append(Paragraph("Dashboard Deportivo - Análisis de Rendimiento - Documento generado automáticamente", 
-                                    ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey)))
-            
-        else:
-            elements.append(Paragraph("No hay datos disponibles con los filtros seleccionados.", normal_style))
-        
-        # Construir el PDF
-        doc.build(elements)
-        
-        # Obtener el contenido del buffer y codificarlo en base64
-        buffer.seek(0)
-        pdf_bytes = buffer.getvalue()
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
-        
-        # Crear nombre de archivo
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"informe_rendimiento_{timestamp}.pdf"
-        
-        return dict(
-            content=pdf_base64,
-            filename=filename,
-            type="application/pdf",
-            base64=True
-        )
-        
-    except Exception as e:
-        import traceback
-        error_traceback = traceback.format_exc()
-        print(f"Error al generar PDF: {e}")
-        print(f"Traceback: {error_traceback}")
-        
-        # Devolver mensaje de error como texto plano
-        return dict(
-            content=f"Error al generar el PDF: {str(e)}\n\nDetalles técnicos para el soporte:\n{error_traceback}",
-            filename="error.txt",
-            type="text/plain"
-        )
 
 # Callback para generar el análisis con IA
 @callback(
@@ -1880,17 +1330,17 @@ def exportar_pdf(n_clicks, json_data, division, team, position, player, metric):
     [State("filtered-data", "data")],
     prevent_initial_call=True
 )
-def generate_performance_analysis(n_clicks, json_data):
+def generate_performance_analysis(n_clicks, clave_datos):
     """Genera un análisis de los datos de rendimiento utilizando IA."""
-    if not n_clicks or not json_data:
+    if not n_clicks or not clave_datos:
         raise PreventUpdate
     
     # Mostrar indicador de carga
     loading_style = {"display": "block"}
     
     try:
-        # Convertir JSON a DataFrame
-        df = pd.read_json(json_data, orient='split')
+        # Obtener los datos filtrados desde la caché del servidor
+        df = resolver_datos_performance(clave_datos)
         
         if df.empty:
             return {"display": "none"}, html.Div("No hay datos disponibles para analizar.", className="text-muted")
@@ -1904,7 +1354,7 @@ def generate_performance_analysis(n_clicks, json_data):
         num_posiciones = df['posicion'].nunique()
         
         # Estadísticas por posición
-        pos_stats = df.groupby('posicion').agg({
+        pos_stats = df.groupby('posicion', observed=True).agg({
             'velocidad_media': 'mean',
             'resistencia': 'mean',
             'sprint_maximo': 'mean',
@@ -1944,9 +1394,6 @@ Los datos muestran que el jugador con mayor velocidad media es **{top_vel_jugado
         
         # Intentar conectar con Ollama para un análisis más detallado
         try:
-            # Crear instancia de OllamaAnalysis
-            ollama = OllamaAnalysis(model="deepseek-r1:8b")
-            
             # Preparar mensaje informativo
             ollama_message = html.Div([
                 html.P("Se está intentando conectar con el servicio de IA para un análisis más detallado...", 
@@ -0,0 +1,36 @@
+# tests/test_columnar_cache.py
+import os
+import time
+
+import pandas as pd
+
+from utils.chunked_csv import leer_csv_por_bloques
+from utils.columnar_cache import cargar_con_cache, guardar_cache, ruta_cache
+from utils.gps_schema import COLUMNAS_DASHBOARD_GPS, dtypes_lectura, formatos_fecha
+
+CSV_GPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'gps_full.csv')
+COLUMNAS = dtypes_lectura(COLUMNAS_DASHBOARD_GPS)
+
+
+def leer(paths):
+    return leer_csv_por_bloques(paths, COLUMNAS, formatos_fecha(COLUMNAS_DASHBOARD_GPS))
+
+
+def test_cache_vencida_se_arma_desde_todas_las_temporadas(tmp_path):
+    crudo = pd.read_csv(CSV_GPS, dtype=str, keep_default_na=False, nrows=50)
+    anterior, actual = tmp_path / 'gps_2023.csv', tmp_path / 'gps_full.csv'
+    crudo.iloc[:30].to_csv(anterior, index=False)
+    crudo.iloc[30:].to_csv(actual, index=False)
+    guardar_cache(leer([str(anterior), str(actual)]), ruta_cache(str(actual)), fuentes=[str(anterior), str(actual)])
+
+    assert len(cargar_con_cache(str(actual), leer, columnas=COLUMNAS)) == 50
+
+    # El CSV del dashboard queda más nuevo que la caché
+    futuro = time.time() + 10
+    os.utime(actual, (futuro, futuro))
+    assert len(cargar_con_cache(str(actual), leer, columnas=COLUMNAS)) == 50
+
+    # Al guardar sin indicar orígenes (ingesta) se conservan los registrados
+    guardar_cache(leer([str(anterior), str(actual)]), ruta_cache(str(actual)))
+    os.utime(anterior, (futuro + 10, futuro + 10))
+    assert len(cargar_con_cache(str(actual), leer, columnas=COLUMNAS)) == 50
@@ -0,0 +1,44 @@
+# tests/test_gps_schema.py
+import os
+
+import pandas as pd
+
+from utils.chunked_csv import leer_csv_por_bloques
+from utils.columnar_cache import cargar_con_cache
+from utils.gps_schema import COLUMNAS_DASHBOARD_GPS, dtypes_lectura, formatos_fecha
+
+CSV_GPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'gps_full.csv')
+
+
+def leer(path):
+    return leer_csv_por_bloques(path, dtypes_lectura(COLUMNAS_DASHBOARD_GPS), formatos_fecha(COLUMNAS_DASHBOARD_GPS))
+
+
+def test_conteo_vacio_no_impide_la_carga(tmp_path):
+    crudo = pd.read_csv(CSV_GPS, dtype=str, keep_default_na=False, nrows=20)
+    crudo.loc[3, 'gen2_acceleration_band1_total_effort_count'] = ''
+    crudo.loc[5, 'ima_band1_decel_count'] = ''
+    path = tmp_path / 'gps.csv'
+    crudo.to_csv(path, index=False)
+
+    df = leer(path)
+
+    assert len(df) == 20
+    assert df['gen2_acceleration_band1_total_effort_count'].dtype == 'float32'
+    assert pd.isna(df.loc[3, 'gen2_acceleration_band1_total_effort_count'])
+    assert pd.isna(df.loc[5, 'ima_band1_decel_count'])
+    assert df['ima_band1_decel_count'].drop(index=5).tolist() == pd.to_numeric(crudo['ima_band1_decel_count']).drop(index=5).tolist()
+
+
+def test_cache_con_otros_tipos_se_descarta(tmp_path):
+    crudo = pd.read_csv(CSV_GPS, dtype=str, keep_default_na=False, nrows=20)
+    path = tmp_path / 'gps.csv'
+    crudo.to_csv(path, index=False)
+    columnas = dtypes_lectura(COLUMNAS_DASHBOARD_GPS)
+
+    # Una caché escrita con los conteos como int16 (esquema anterior)
+    viejo = leer(path).astype({'ima_band1_decel_count': 'int16'})
+    cargar_con_cache(str(path), lambda p: viejo, columnas=columnas)
+
+    df = cargar_con_cache(str(path), leer, columnas=columnas)
+    assert df['ima_band1_decel_count'].dtype == 'float32'
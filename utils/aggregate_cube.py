@@ -0,0 +1,92 @@
+# utils/aggregate_cube.py
+import copy
+
+import numpy as np
+import pandas as pd
+
+from utils.data_store import concatenar
+from utils.filter_engine import FilterEngine
+
+
+class AggregateCube:
+    """
+    Cubo pre-agregado de sumas y conteos por (dimensiones..., fecha).
+
+    Las medias de cualquier combinación de filtros, agrupadas por una
+    dimensión o por fecha, se obtienen sumando celdas del cubo en lugar de
+    recorrer las filas originales.
+    """
+
+    def __init__(self, df, dimensiones, columna_fecha, metricas):
+        """
+        Args:
+            df: DataFrame con los datos crudos
+            dimensiones: Columnas categóricas por las que se filtra y agrupa
+            columna_fecha: Columna de fecha (también es clave del cubo)
+            metricas: Columnas numéricas a agregar
+        """
+        self.dimensiones = list(dimensiones)
+        self.columna_fecha = columna_fecha
+        self.metricas = [m for m in metricas if m in df.columns]
+
+        self.celdas = self._agregar(df)
+        self.motor = FilterEngine(self.celdas, self.dimensiones, columna_fecha=columna_fecha)
+
+    def _agregar(self, df):
+        """Sumas y conteos por (dimensiones..., fecha) de las filas de df."""
+        claves = self.dimensiones + [self.columna_fecha]
+        # Sumar en float64 para no perder precisión con métricas float32
+        valores = df[claves + self.metricas].astype({m: 'float64' for m in self.metricas})
+        agrupado = valores.groupby(claves, observed=True, dropna=False, sort=False)[self.metricas]
+
+        sumas = agrupado.sum().add_suffix('__suma')
+        conteos = agrupado.count().add_suffix('__n')
+        return pd.concat([sumas, conteos], axis=1).reset_index()
+
+    def extended(self, nuevas, inicio=None):
+        """
+        Devuelve un cubo nuevo que además incluye las filas agregadas.
+
+        Las celdas de las filas nuevas se agregan al final aunque repitan una
+        clave ya existente: como las medias se calculan sumando sumas y conteos,
+        el resultado es el mismo que reconstruir el cubo.
+
+        Args:
+            nuevas: DataFrame con las filas agregadas
+            inicio: No se usa; se acepta por compatibilidad con el almacén
+        """
+        nuevo = copy.copy(self)
+        celdas_nuevas = self._agregar(nuevas)
+        nuevo.celdas = concatenar(self.celdas, celdas_nuevas)
+        nuevo.motor = self.motor.extended(nuevo.celdas.iloc[len(self.celdas):], len(self.celdas))
+        return nuevo
+
+    def means(self, criterios, por, metricas=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Calcula la media de las métricas agrupadas por una columna.
+
+        Args:
+            criterios: Diccionario dimensión -> valor seleccionado
+            por: Dimensión o columna de fecha por la que agrupar
+            metricas: Métricas a promediar (por defecto todas las del cubo)
+            fecha_inicio: Fecha mínima incluida (opcional)
+            fecha_fin: Fecha máxima incluida (opcional)
+
+        Returns:
+            DataFrame con la columna `por` y una columna de media por métrica
+        """
+        metricas = list(metricas) if metricas else self.metricas
+
+        filas = self.motor.filter(criterios, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
+        celdas = self.celdas if filas is None else self.celdas.take(filas)
+
+        columnas = [f"{m}__suma" for m in metricas] + [f"{m}__n" for m in metricas]
+        totales = celdas.groupby(por, observed=True)[columnas].sum()
+
+        resultado = pd.DataFrame(index=totales.index)
+        for m in metricas:
+            n = totales[f"{m}__n"].to_numpy()
+            with np.errstate(invalid='ignore', divide='ignore'):
+                resultado[m] = np.where(n > 0, totales[f"{m}__suma"].to_numpy() / n, np.nan)
+
+        return resultado.reset_index()
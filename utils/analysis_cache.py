@@ -0,0 +1,130 @@
+# utils/analysis_cache.py
+"""
+Caché persistente de los análisis generados por Ollama (SQLite).
+
+La clave es el hash de (modelo, tipo de análisis, prompt): como el prompt
+incluye el resumen de los datos, la misma selección de filtros devuelve el
+análisis guardado sin volver a ocupar el modelo. Las entradas vencen a los
+`ttl` segundos y, superados los límites de cantidad o tamaño, se borran
+primero las usadas hace más tiempo. La base se comparte entre los workers.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+def ruta_por_defecto():
+    """Archivo de la base (DASHBOARD_ANALISIS_DB o el temporal del sistema)."""
+    return os.environ.get("DASHBOARD_ANALISIS_DB") or os.path.join(tempfile.gettempdir(), "dashboard_analisis.sqlite3")
+
+
+class AnalysisCache:
+    """Respuestas de Ollama por hash de modelo, tipo de análisis y prompt."""
+
+    def __init__(self, ruta=None, ttl=None, max_entries=2000, max_bytes=50 * 1024 * 1024):
+        """
+        Args:
+            ruta: Archivo SQLite (se crea al primer uso)
+            ttl: Segundos de validez de un análisis (OLLAMA_CACHE_TTL o una semana)
+            max_entries: Cantidad máxima de análisis guardados
+            max_bytes: Tamaño máximo total de los textos guardados
+        """
+        self.ruta = ruta or ruta_por_defecto()
+        self.ttl = ttl or float(os.environ.get("OLLAMA_CACHE_TTL", str(7 * 24 * 3600)))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._creada = False
+
+    @staticmethod
+    def key(modelo, tipo, prompt):
+        """Clave de un análisis."""
+        return hashlib.sha256(json.dumps([modelo, tipo, prompt], ensure_ascii=False).encode()).hexdigest()
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=10)
+        if not self._creada:
+            with self._lock:
+                # WAL: los workers leen mientras otro escribe
+                conexion.execute("PRAGMA journal_mode=WAL")
+                conexion.execute("""
+                    CREATE TABLE IF NOT EXISTS analisis (
+                        clave TEXT PRIMARY KEY,
+                        modelo TEXT,
+                        tipo TEXT,
+                        respuesta TEXT,
+                        bytes INTEGER,
+                        creado REAL,
+                        usado REAL
+                    )
+                """)
+                conexion.execute("CREATE INDEX IF NOT EXISTS analisis_usado ON analisis (usado)")
+                conexion.commit()
+                self._creada = True
+        return conexion
+
+    def get(self, clave):
+        """Devuelve el análisis guardado y vigente, o None."""
+        try:
+            conexion = self._conectar()
+            try:
+                fila = conexion.execute(
+                    "SELECT respuesta FROM analisis WHERE clave = ? AND creado > ?",
+                    (clave, time.time() - self.ttl)
+                ).fetchone()
+                if fila is None:
+                    return None
+                with conexion:
+                    conexion.execute("UPDATE analisis SET usado = ? WHERE clave = ?", (time.time(), clave))
+                return fila[0]
+            finally:
+                conexion.close()
+        except sqlite3.Error as e:
+            print(f"Error al leer la caché de análisis: {e}")
+            return None
+
+    def put(self, clave, modelo, tipo, respuesta):
+        """Guarda un análisis y recorta la caché si supera los límites."""
+        ahora = time.time()
+        try:
+            conexion = self._conectar()
+            try:
+                with conexion:
+                    conexion.execute(
+                        "INSERT OR REPLACE INTO analisis VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (clave, modelo, tipo, respuesta, len(respuesta.encode()), ahora, ahora)
+                    )
+                    self._recortar(conexion)
+            finally:
+                conexion.close()
+        except sqlite3.Error as e:
+            print(f"No se pudo guardar el análisis en la caché: {e}")
+
+    def _recortar(self, conexion):
+        """Borra los vencidos y, si hace falta, los usados hace más tiempo."""
+        conexion.execute("DELETE FROM analisis WHERE creado <= ?", (time.time() - self.ttl,))
+        cantidad, total = conexion.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM analisis").fetchone()
+        if cantidad <= self.max_entries and total <= self.max_bytes:
+            return
+        for clave, tamaño in conexion.execute("SELECT clave, bytes FROM analisis ORDER BY usado").fetchall():
+            if cantidad <= self.max_entries and total <= self.max_bytes:
+                break
+            conexion.execute("DELETE FROM analisis WHERE clave = ?", (clave,))
+            cantidad -= 1
+            total -= tamaño
+
+    def clear(self):
+        """Borra todos los análisis guardados."""
+        try:
+            conexion = self._conectar()
+            try:
+                with conexion:
+                    conexion.execute("DELETE FROM analisis")
+            finally:
+                conexion.close()
+        except sqlite3.Error as e:
+            print(f"Error al vaciar la caché de análisis: {e}")
@@ -0,0 +1,113 @@
+# utils/chunked_csv.py
+"""
+Lectura de CSV grandes por bloques, leyendo solo las columnas necesarias.
+
+Cada bloque se parsea directamente con los dtypes declarados (categóricas,
+float32...), así que en memoria nunca hay más que el bloque en texto más lo
+ya acumulado en formato compacto. Las categorías de todos los bloques se unen
+al final con union_categoricals.
+
+Uso como script para medir la carga de uno o varios archivos de temporada:
+
+    python -m utils.chunked_csv data/gps_2023.csv data/gps_2024.csv
+    python -m utils.chunked_csv data/gps_2023.csv data/gps_full.csv --cache data/gps_full.cols.npz
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Filas por bloque: suficiente para amortizar el parser sin picos de memoria
+TAMAÑO_BLOQUE = 100_000
+
+
+def leer_csv_por_bloques(paths, columnas, fechas=None, tamaño_bloque=TAMAÑO_BLOQUE, informe=False):
+    """
+    Lee uno o varios CSV con el mismo formato en un único DataFrame compacto.
+
+    Args:
+        paths: Ruta o lista de rutas de los CSV
+        columnas: Diccionario columna -> dtype con las columnas a leer
+        fechas: Diccionario columna -> formato para las columnas de fecha
+        tamaño_bloque: Filas por bloque
+        informe: Si es True imprime filas/s, MB/s y memoria máxima del proceso
+
+    Returns:
+        DataFrame con las columnas en el orden declarado
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    fechas = fechas or {}
+
+    # Las fechas se leen como texto y se convierten en cada bloque
+    dtypes = {col: ('object' if col in fechas else tipo) for col, tipo in columnas.items()}
+    partes = {col: [] for col in columnas}
+    filas = 0
+    inicio = time.perf_counter()
+
+    for path in paths:
+        lector = pd.read_csv(path, usecols=list(columnas), dtype=dtypes, chunksize=tamaño_bloque)
+        for bloque in lector:
+            for col, formato in fechas.items():
+                bloque[col] = pd.to_datetime(bloque[col], format=formato, errors='coerce')
+            for col in columnas:
+                partes[col].append(bloque[col])
+            filas += len(bloque)
+
+    # Unir columna por columna, liberando los bloques a medida que se usan
+    datos = {}
+    for col in columnas:
+        bloques = partes.pop(col)
+        if not bloques:
+            datos[col] = pd.Series([], dtype=dtypes[col])
+        elif isinstance(bloques[0].dtype, pd.CategoricalDtype):
+            datos[col] = pd.Series(union_categoricals(bloques, sort_categories=True))
+        else:
+            datos[col] = pd.Series(np.concatenate([b.to_numpy() for b in bloques]), dtype=bloques[0].dtype)
+        del bloques
+
+    df = pd.DataFrame(datos)
+
+    if informe:
+        segundos = time.perf_counter() - inicio
+        megabytes = sum(os.path.getsize(p) for p in paths) / 1e6
+        pico = ""
+        if resource is not None:
+            pico = f", pico del proceso {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB"
+        print(f"{filas} filas de {len(paths)} archivo(s) en {segundos:.2f} s: "
+              f"{filas / max(segundos, 1e-9):,.0f} filas/s, {megabytes / max(segundos, 1e-9):.1f} MB/s, "
+              f"{df.memory_usage(deep=True).sum() / 1e6:.1f} MB en memoria{pico}")
+
+    return df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from utils.columnar_cache import guardar_cache
+    from utils.gps_schema import COLUMNAS_DASHBOARD_GPS, dtypes_lectura, formatos_fecha
+
+    parser = argparse.ArgumentParser(description="Carga por bloques de archivos GPS de una o varias temporadas")
+    parser.add_argument("archivos", nargs="+", help="CSV de GPS con el formato de gps_full.csv")
+    parser.add_argument("--cache", help="Guardar el resultado como caché columnar .cols.npz")
+    parser.add_argument("--bloque", type=int, default=TAMAÑO_BLOQUE, help="Filas por bloque")
+    args = parser.parse_args()
+
+    df = leer_csv_por_bloques(
+        args.archivos,
+        dtypes_lectura(COLUMNAS_DASHBOARD_GPS),
+        formatos_fecha(COLUMNAS_DASHBOARD_GPS),
+        tamaño_bloque=args.bloque,
+        informe=True
+    )
+    if args.cache:
+        # Los orígenes quedan en la caché: si alguno cambia se vuelve a armar desde todos
+        guardar_cache(df, args.cache, fuentes=args.archivos)
+        print(f"Caché escrita en {args.cache}")
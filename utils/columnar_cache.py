@@ -0,0 +1,218 @@
+# utils/columnar_cache.py
+"""
+Caché binaria columnar para los CSV del dashboard.
+
+Cada DataFrame tipado se guarda en un archivo .npz junto al CSV de origen:
+las columnas de texto como códigos enteros más su lista de categorías, las
+fechas como datetime64 y los números con su dtype original. Leer este
+archivo evita parsear texto e inferir fechas en cada arranque.
+
+Una caché puede reunir varios archivos (por ejemplo una temporada por CSV,
+con utils.chunked_csv): la lista de orígenes queda guardada en ella, se
+considera vencida si cualquiera de ellos es más nuevo y entonces se vuelve a
+armar desde todos, no solo desde el CSV del dashboard.
+
+Uso como script para regenerar las cachés:
+
+    python -m utils.columnar_cache data/gps_full.csv
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Versión del formato; cambiarla invalida las cachés existentes
+FORMATO_CACHE = 1
+
+
+def ruta_cache(csv_path):
+    """Devuelve la ruta del archivo de caché asociado a un CSV."""
+    base, _ = os.path.splitext(csv_path)
+    return f"{base}.cols.npz"
+
+
+def fuentes_cache(cache_path):
+    """Archivos de origen registrados en una caché ([] si no existe o no los registra)."""
+    try:
+        with np.load(cache_path, allow_pickle=False) as npz:
+            return list(json.loads(str(npz["__meta__"])).get("fuentes", []))
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def fuentes(csv_path):
+    """
+    Archivos con los que se arma el frame de un CSV: los registrados en su
+    caché más el propio CSV (donde se agregan las sesiones nuevas).
+    """
+    rutas = fuentes_cache(ruta_cache(csv_path))
+    if os.path.abspath(csv_path) not in rutas:
+        rutas.append(os.path.abspath(csv_path))
+
+    existentes = []
+    for ruta in rutas:
+        if os.path.exists(ruta):
+            existentes.append(ruta)
+        else:
+            print(f"No se encuentra {ruta}, registrado en la caché de {os.path.basename(csv_path)}")
+    return existentes
+
+
+def cache_vigente(csv_path):
+    """Indica si existe una caché más nueva que todos sus archivos de origen."""
+    cache_path = ruta_cache(csv_path)
+    try:
+        return os.path.getmtime(cache_path) >= max(os.path.getmtime(ruta) for ruta in fuentes(csv_path))
+    except (OSError, ValueError):
+        return False
+
+
+def leer_fuentes(csv_path, leer_csv):
+    """Lee el frame completo de un CSV: el CSV solo, o todos los archivos de su caché."""
+    rutas = fuentes(csv_path)
+    if len(rutas) > 1:
+        print(f"Se arma {os.path.basename(csv_path)} desde {len(rutas)} archivos: "
+              f"{', '.join(os.path.basename(ruta) for ruta in rutas)}")
+        return leer_csv(rutas), rutas
+    return leer_csv(csv_path), rutas
+
+
+def guardar_cache(df, cache_path, fuentes=None):
+    """
+    Escribe un DataFrame tipado en formato columnar .npz.
+
+    Args:
+        df: DataFrame tipado
+        cache_path: Ruta del .npz
+        fuentes: Archivos de origen del frame; por defecto se conservan los ya
+            registrados en la caché (al agregar sesiones, por ejemplo)
+    """
+    if fuentes is None:
+        fuentes = fuentes_cache(cache_path)
+    arrays = {}
+    columnas = []
+
+    for i, col in enumerate(df.columns):
+        serie = df[col]
+        clave = f"c{i}"
+
+        if isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == object:
+            # El texto se guarda como códigos + categorías para no necesitar pickle
+            categorica = isinstance(serie.dtype, pd.CategoricalDtype)
+            cat = serie.cat if categorica else serie.astype('category').cat
+            arrays[f"{clave}_codes"] = cat.codes.to_numpy()
+            arrays[f"{clave}_cats"] = np.asarray(cat.categories.astype(str), dtype=str)
+            tipo = "category" if categorica else "object"
+        else:
+            arrays[clave] = serie.to_numpy()
+            tipo = "array"
+
+        columnas.append({"name": col, "key": clave, "kind": tipo})
+
+    meta = {"formato": FORMATO_CACHE, "columnas": columnas, "fuentes": [os.path.abspath(f) for f in fuentes]}
+    arrays["__meta__"] = np.array(json.dumps(meta))
+
+    # Escribir a un temporal y renombrar para que ningún lector vea un archivo a medias
+    tmp_path = f"{cache_path}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, cache_path)
+
+
+def leer_cache(cache_path):
+    """Reconstruye el DataFrame guardado por guardar_cache."""
+    with np.load(cache_path, allow_pickle=False) as npz:
+        meta = json.loads(str(npz["__meta__"]))
+        if meta.get("formato") != FORMATO_CACHE:
+            raise ValueError(f"Formato de caché desconocido en {cache_path}")
+
+        datos = {}
+        for col in meta["columnas"]:
+            clave = col["key"]
+            if col["kind"] == "array":
+                datos[col["name"]] = npz[clave]
+            else:
+                valores = pd.Categorical.from_codes(npz[f"{clave}_codes"], npz[f"{clave}_cats"].astype(object))
+                datos[col["name"]] = valores if col["kind"] == "category" else valores.astype(object)
+
+    return pd.DataFrame(datos)
+
+
+def _mismos_tipos(df, columnas):
+    """True si las columnas numéricas de la caché tienen los dtypes declarados."""
+    if not isinstance(columnas, dict):
+        return True
+    return all(str(df[col].dtype) == tipo for col, tipo in columnas.items() if tipo not in ('object', 'category'))
+
+
+def cargar_con_cache(csv_path, leer_csv, columnas=None):
+    """
+    Carga un CSV usando su caché binaria si está vigente.
+
+    Args:
+        csv_path: Ruta del CSV de origen
+        leer_csv: Función que lee y tipa el CSV (o la lista de archivos de
+            origen de la caché) cuando no hay caché vigente
+        columnas: Columnas esperadas, o diccionario columna -> dtype (opcional);
+            si la caché tiene otras, se generó con otro lector y se descarta
+
+    Returns:
+        El DataFrame tipado
+    """
+    cache_path = ruta_cache(csv_path)
+
+    if cache_vigente(csv_path):
+        try:
+            df = leer_cache(cache_path)
+            if columnas is None or (list(df.columns) == list(columnas) and _mismos_tipos(df, columnas)):
+                return df
+            print(f"La caché {cache_path} tiene otras columnas o tipos, se vuelve a leer el CSV")
+        except Exception as e:
+            print(f"Caché inválida en {cache_path}, se vuelve a leer el CSV: {e}")
+
+    df, rutas = leer_fuentes(csv_path, leer_csv)
+
+    try:
+        guardar_cache(df, cache_path, rutas)
+    except Exception as e:
+        # Sin permisos de escritura el dashboard sigue funcionando desde el CSV
+        print(f"No se pudo escribir la caché {cache_path}: {e}")
+
+    return df
+
+
+def convertir(csv_path, leer_csv):
+    """Regenera la caché de un CSV e informa los tiempos de carga."""
+    inicio = time.perf_counter()
+    df, rutas = leer_fuentes(csv_path, leer_csv)
+    t_csv = time.perf_counter() - inicio
+
+    cache_path = ruta_cache(csv_path)
+    guardar_cache(df, cache_path, rutas)
+
+    inicio = time.perf_counter()
+    leer_cache(cache_path)
+    t_cache = time.perf_counter() - inicio
+
+    print(f"{csv_path}: {len(df)} filas, CSV {t_csv * 1000:.1f} ms, caché {t_cache * 1000:.1f} ms -> {cache_path}")
+
+
+if __name__ == "__main__":
+    # Los lectores viven en las páginas, que requieren la app de Dash instanciada
+    import app  # noqa: F401
+    from pages.gps import leer_csv_gps
+    from pages.performance import leer_csv_performance
+
+    lectores = {
+        "gps_full.csv": leer_csv_gps,
+        "performance_stats.csv": leer_csv_performance,
+    }
+
+    for path in sys.argv[1:]:
+        lector = lectores.get(os.path.basename(path))
+        if lector is None:
+            print(f"No hay un lector registrado para {path}")
+            continue
+        convertir(path, lector)
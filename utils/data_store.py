@@ -0,0 +1,304 @@
+# utils/data_store.py
+import contextlib
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+
+# Firma usada cuando el archivo no existe y los datos vienen del fallback
+_SIN_ARCHIVO = "sin-archivo"
+
+
+def _huella_contenido(df):
+    """Hash del contenido de un frame (valores e índice)."""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values.tobytes()).hexdigest()[:24]
+
+
+class DataStore:
+    """
+    Mantiene en memoria un DataFrame cargado desde un archivo y lo comparte
+    entre todos los callbacks del proceso.
+
+    El archivo solo se vuelve a leer cuando cambian su fecha de modificación
+    o su tamaño. Los callbacks reciben vistas del frame que comparten sus
+    datos: la aplicación activa Copy-on-Write de pandas al iniciar (app.py),
+    así una vista copia sus datos al primer intento de modificarla y el frame
+    compartido nunca cambia.
+
+    Con un SharedFrame (memoria compartida), un solo proceso lee el archivo y
+    lo publica; los demás workers mapean la misma generación sin copiarla.
+    """
+
+    def __init__(self, path, reader, fallback=None, compartido=None):
+        """
+        Args:
+            path: Ruta del archivo de datos
+            reader: Función que recibe la ruta y devuelve el DataFrame tipado
+            fallback: Función opcional que genera los datos si el archivo no existe
+            compartido: SharedFrame opcional para compartir el frame entre procesos
+        """
+        self.path = path
+        self.reader = reader
+        self.fallback = fallback
+        self.compartido = compartido
+        self.version = 0
+        self._df = None
+        self._firma = None
+        self._generacion = None
+        self._derivados = {}
+        self._suscriptores = []
+        self._lock = threading.RLock()
+
+    def _leer_firma(self):
+        """Devuelve (mtime, tamaño) del archivo o None si no existe."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _firma_vigente(self):
+        """Firma actual del origen (la marca de datos de ejemplo si no hay archivo)."""
+        firma = self._leer_firma()
+        if firma is None:
+            if self.fallback is None:
+                raise FileNotFoundError(self.path)
+            return _SIN_ARCHIVO
+        return firma
+
+    def _leer(self, firma):
+        """Lee el archivo (o genera los datos de ejemplo). Devuelve (df, origen)."""
+        if firma == _SIN_ARCHIVO:
+            return self.fallback(), "datos de ejemplo"
+        return self.reader(self.path), os.path.basename(self.path)
+
+    def _reemplazar(self, df, firma, origen):
+        """Reemplaza el frame en memoria y descarta lo que dependía del anterior."""
+        self._df = df
+        self._firma = firma
+        self._derivados = {}
+        self.version += 1
+        memoria = df.memory_usage(deep=True).sum() / 1e6
+        print(f"Datos cargados desde {origen}: {len(df)} filas, {memoria:.1f} MB (versión {self.version})")
+
+        # Las cachés que dependen de los datos anteriores ya no sirven
+        self._notificar()
+
+    def _notificar(self):
+        for suscriptor in self._suscriptores:
+            try:
+                suscriptor()
+            except Exception as e:
+                print(f"Error al invalidar una caché tras actualizar {os.path.basename(self.path)}: {e}")
+
+    def _sincronizar_compartido(self, firma):
+        """
+        Publica el archivo si la generación compartida no corresponde a su
+        firma y mapea la generación vigente si es distinta de la actual.
+        """
+        publicada = self.compartido.current()
+        if publicada is None or _como_firma(publicada["firma"]) != firma:
+            with self.compartido.lock():
+                # Otro worker pudo haberla publicado mientras esperábamos
+                publicada = self.compartido.current()
+                if publicada is None or _como_firma(publicada["firma"]) != firma:
+                    df, origen = self._leer(firma)
+                    publicada = self.compartido.publish(df, firma)
+                    print(f"{origen} publicado en memoria compartida (generación {publicada['generacion']})")
+
+        if publicada["generacion"] != self._generacion or self._df is None:
+            df = self.compartido.attach(publicada)
+            self._generacion = publicada["generacion"]
+            self._reemplazar(df, _como_firma(publicada["firma"]),
+                             f"memoria compartida (generación {self._generacion})")
+
+    def get(self):
+        """
+        Devuelve una vista de solo lectura del DataFrame, recargándolo si el
+        archivo cambió en disco (o si otro worker publicó una generación nueva).
+        """
+        firma = self._firma_vigente()
+
+        if self.compartido is not None:
+            publicada = self.compartido.current()
+            if (self._df is None or firma != self._firma or publicada is None
+                    or publicada["generacion"] != self._generacion):
+                with self._lock:
+                    self._sincronizar_compartido(self._firma_vigente())
+        elif self._df is None or firma != self._firma:
+            with self._lock:
+                # Otro hilo pudo haber recargado (o agregado filas) mientras esperábamos el lock
+                firma = self._firma_vigente()
+                if self._df is None or firma != self._firma:
+                    df, origen = self._leer(firma)
+                    self._reemplazar(df, firma, origen)
+
+        # Copia perezosa: comparte los arrays hasta que alguien intente escribir
+        return self._df.copy(deep=False)
+
+    def derived(self, nombre, constructor):
+        """
+        Devuelve una estructura derivada del frame (índices, agregados...),
+        construida una sola vez por cada versión de los datos.
+
+        Args:
+            nombre: Identificador de la estructura
+            constructor: Función que recibe el DataFrame y construye la estructura
+        """
+        self.get()
+        with self._lock:
+            return self._derivado(nombre, constructor)
+
+    def _derivado(self, nombre, constructor):
+        """Estructura derivada de la versión vigente (con el lock tomado)."""
+        entrada = self._derivados.get(nombre)
+        if entrada is None or entrada[0] != self.version:
+            entrada = (self.version, constructor(self._df))
+            self._derivados[nombre] = entrada
+        return entrada[1]
+
+    def snapshot(self, nombre=None, constructor=None):
+        """
+        Devuelve (vista del frame, versión, estructura derivada) tomados juntos
+        bajo el lock: si se agregan filas entre medio, los tres siguen
+        correspondiendo a la misma versión (a diferencia de llamar a get,
+        version y derived por separado).
+
+        Args:
+            nombre, constructor: Estructura derivada a incluir (como en derived);
+                sin ellos el tercer elemento es None
+        """
+        self.get()
+        with self._lock:
+            estructura = self._derivado(nombre, constructor) if nombre is not None else None
+            return self._df.copy(deep=False), self.version, estructura
+
+    def append(self, nuevas, persistir=None):
+        """
+        Agrega filas al frame en memoria sin volver a leer el archivo.
+
+        Las estructuras derivadas que tienen un método `extended(nuevas, inicio)`
+        se actualizan con solo las filas nuevas; el resto se reconstruye en el
+        próximo acceso. Los callbacks que ya tenían la versión anterior la
+        siguen usando sin ver estados intermedios. En memoria compartida el
+        resultado se publica como una generación nueva para los demás workers.
+
+        Args:
+            nuevas: DataFrame con las filas a agregar (mismas columnas)
+            persistir: Función opcional que escribe las filas en el archivo;
+                se ejecuta con el lock tomado y la nueva firma pasa a ser la vigente
+
+        Returns:
+            Número de versión de los datos después de agregar
+        """
+        self.get()
+        with self._lock:
+            bloqueo = self.compartido.lock() if self.compartido is not None else contextlib.nullcontext()
+            with bloqueo:
+                if self.compartido is not None:
+                    # Partir de lo último publicado por cualquier worker
+                    publicada = self.compartido.current()
+                    if publicada is not None and publicada["generacion"] != self._generacion:
+                        self._generacion = publicada["generacion"]
+                        self._reemplazar(self.compartido.attach(publicada), _como_firma(publicada["firma"]),
+                                         f"memoria compartida (generación {self._generacion})")
+
+                if persistir is not None:
+                    persistir()
+                    self._firma = self._firma_vigente()
+
+                inicio = len(self._df)
+                df = concatenar(self._df, nuevas)
+
+                if self.compartido is not None:
+                    publicada = self.compartido.publish(df, self._firma)
+                    self._generacion = publicada["generacion"]
+                    df = self.compartido.attach(publicada)
+
+            agregadas = df.iloc[inicio:]
+
+            derivados = {}
+            for nombre, (version, estructura) in self._derivados.items():
+                if version != self.version or not hasattr(estructura, 'extended'):
+                    continue
+                try:
+                    derivados[nombre] = (self.version + 1, estructura.extended(agregadas, inicio))
+                except Exception as e:
+                    print(f"Error al actualizar '{nombre}', se reconstruirá: {e}")
+
+            self._df = df
+            self._derivados = derivados
+            self.version += 1
+            print(f"Filas agregadas: {len(agregadas)} (total {len(df)}, versión {self.version})")
+
+            self._notificar()
+            return self.version
+
+    def fingerprint(self):
+        """
+        Identificador de los datos vigentes que coincide entre procesos que leen
+        el mismo archivo (para claves de cachés en disco). Cambia al recargar o
+        al agregar filas.
+        """
+        self.get()
+        with self._lock:
+            if self._firma == _SIN_ARCHIVO:
+                # Los datos de ejemplo se generan en cada proceso: la huella sale
+                # de su contenido, que es el mismo en todos los que los generan igual
+                return "ejemplo-" + self.derived('huella', _huella_contenido)
+            return f"{self._firma[0]}-{self._firma[1]}"
+
+    def is_fallback(self):
+        """True si los datos vigentes son los de ejemplo (no hay archivo)."""
+        self.get()
+        with self._lock:
+            return self._firma == _SIN_ARCHIVO
+
+    def on_reload(self, suscriptor):
+        """
+        Registra una función sin argumentos que se llama cada vez que los
+        datos se recargan o se agregan filas (por ejemplo, el `clear` de una caché).
+        """
+        with self._lock:
+            self._suscriptores.append(suscriptor)
+
+    def invalidate(self):
+        """Fuerza una recarga (o un nuevo mapeo de la generación compartida) en el próximo acceso."""
+        with self._lock:
+            self._firma = None
+            self._generacion = None
+
+
+def _como_firma(valor):
+    """Convierte la firma guardada en JSON (lista) a la tupla que usa el almacén."""
+    return tuple(valor) if isinstance(valor, list) else valor
+
+
+def concatenar(base, nuevas):
+    """
+    Concatena filas nuevas a un DataFrame conservando sus dtypes: las columnas
+    categóricas unen sus categorías y el resto se convierte al dtype de la base.
+    """
+    nuevas = nuevas.reindex(columns=base.columns)
+    base_alineada = {}
+    nuevas_alineadas = {}
+
+    for col in base.columns:
+        tipo = base[col].dtype
+        if isinstance(tipo, pd.CategoricalDtype):
+            categorias = tipo.categories.union(pd.Index(nuevas[col].dropna().unique()))
+            tipo = pd.CategoricalDtype(categorias)
+            base_alineada[col] = base[col].cat.set_categories(categorias)
+        else:
+            base_alineada[col] = base[col]
+        try:
+            nuevas_alineadas[col] = nuevas[col].astype(tipo)
+        except (TypeError, ValueError):
+            nuevas_alineadas[col] = nuevas[col]
+
+    return pd.concat(
+        [pd.DataFrame(base_alineada), pd.DataFrame(nuevas_alineadas, index=nuevas.index)],
+        ignore_index=True
+    )
@@ -0,0 +1,111 @@
+# utils/datatable_query.py
+"""
+Paginación, ordenamiento y filtrado en el servidor para dash_table.DataTable
+en modo "custom".
+
+Interpreta la sintaxis de filter_query que genera la tabla (por ejemplo
+`{Jugador} contains Juan && {Vel. Máx. (km/h)} > 30`) y devuelve solo la
+página visible, de modo que el tamaño de la respuesta no depende de la
+cantidad de filas filtradas.
+"""
+import math
+import re
+
+# Operadores que genera la DataTable (en texto o como símbolo) y su forma textual
+OPERADORES = {
+    'ge': 'ge', '>=': 'ge',
+    'le': 'le', '<=': 'le',
+    'lt': 'lt', '<': 'lt',
+    'gt': 'gt', '>': 'gt',
+    'ne': 'ne', '!=': 'ne',
+    'eq': 'eq', '=': 'eq',
+    'contains': 'contains',
+    'datestartswith': 'datestartswith',
+}
+
+# `{columna} operador valor`: el operador se toma entero, nunca de dentro del valor
+CONDICION = re.compile(r'^\{(?P<columna>[^}]+)\}\s*(?P<operador>[si]?(?:[a-z]+|[<>=!]=?))\s*(?P<valor>.*)$')
+
+
+def dividir_condicion(condicion):
+    """
+    Separa una condición de filter_query en (columna, operador, valor).
+
+    Returns:
+        Tupla (columna, operador, valor) o (None, None, None) si no se reconoce
+    """
+    coincidencia = CONDICION.match(condicion.strip())
+    if coincidencia is None:
+        return None, None, None
+
+    nombre, operador, valor = coincidencia.group('columna', 'operador', 'valor')
+    # Las variantes sensibles ("scontains", "s>") e insensibles ("icontains") se tratan igual
+    if operador not in OPERADORES and operador[:1] in ('s', 'i'):
+        operador = operador[1:]
+    nombre_operador = OPERADORES.get(operador)
+    if nombre_operador is None:
+        return None, None, None
+
+    valor = valor.strip()
+    delimitador = valor[0] if valor else ''
+    if len(valor) > 1 and delimitador == valor[-1] and delimitador in ("'", '"', '`'):
+        valor = valor[1:-1].replace('\\' + delimitador, delimitador)
+    elif nombre_operador not in ('contains', 'datestartswith'):
+        # Solo los operadores de comparación convierten el valor a número
+        try:
+            valor = float(valor)
+        except ValueError:
+            pass
+
+    return nombre, nombre_operador, valor
+
+
+def filtrar(df, filter_query):
+    """Aplica un filter_query de la DataTable al DataFrame."""
+    if not filter_query:
+        return df
+
+    for condicion in filter_query.split(' && '):
+        columna, operador, valor = dividir_condicion(condicion)
+        if columna not in df.columns:
+            continue
+
+        serie = df[columna]
+        if operador in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
+            df = df.loc[getattr(serie, operador)(valor)]
+        elif operador == 'contains':
+            df = df.loc[serie.astype(str).str.contains(str(valor), case=False, regex=False, na=False)]
+        elif operador == 'datestartswith':
+            df = df.loc[serie.astype(str).str.startswith(str(valor), na=False)]
+
+    return df
+
+
+def ordenar(df, sort_by):
+    """Ordena el DataFrame según el sort_by de la DataTable."""
+    sort_by = [s for s in (sort_by or []) if s['column_id'] in df.columns]
+    if not sort_by:
+        return df
+
+    return df.sort_values(
+        [s['column_id'] for s in sort_by],
+        ascending=[s['direction'] == 'asc' for s in sort_by],
+        kind='stable'
+    )
+
+
+def pagina(df, page_current, page_size, filter_query=None, sort_by=None):
+    """
+    Filtra, ordena y recorta el DataFrame a la página pedida.
+
+    Returns:
+        Tupla (registros de la página, cantidad total de páginas)
+    """
+    df = ordenar(filtrar(df, filter_query), sort_by)
+
+    page_size = page_size or 10
+    page_current = page_current or 0
+    page_count = max(1, math.ceil(len(df) / page_size))
+
+    inicio = page_current * page_size
+    return df.iloc[inicio:inicio + page_size].to_dict('records'), page_count
@@ -0,0 +1,170 @@
+# utils/figure_builders.py
+import copy
+import time
+
+import numpy as np
+import plotly.graph_objs as go
+
+# Diseño común de todos los gráficos. Es un diccionario plano y no un
+# go.layout.Template: validar una plantilla completa en cada figura cuesta más
+# que construir la figura entera
+DISEÑO_BASE = {
+    'margin': dict(l=40, r=40, t=60, b=60),
+    'xaxis': dict(showgrid=True, gridwidth=1, gridcolor='lightgray'),
+    'yaxis': dict(showgrid=True, gridwidth=1, gridcolor='lightgray'),
+}
+
+
+def _diseño(*cambios):
+    """Copia del diseño base con los cambios aplicados en orden (los ejes se combinan)."""
+    diseño = copy.deepcopy(DISEÑO_BASE)
+    for cambio in cambios:
+        for clave, valor in cambio.items():
+            if isinstance(valor, dict) and isinstance(diseño.get(clave), dict):
+                diseño[clave].update(valor)
+            else:
+                diseño[clave] = valor
+    return diseño
+
+
+def _valores(columna):
+    """Array NumPy de una columna (las categóricas pasan a objetos de Python)."""
+    valores = np.asarray(columna)
+    if valores.dtype.kind not in 'biufcmM':
+        valores = valores.astype(object)
+    return valores
+
+
+def figura_vacia(titulo="No hay datos disponibles"):
+    """Figura sin trazas que solo muestra un título."""
+    return go.Figure(layout=dict(title=titulo, xaxis_title="", yaxis_title=""))
+
+
+def grafico_barras(x, y, titulo, titulo_x, titulo_y, escala_colores='Viridis',
+                   formato_texto=None, height=500, **diseño):
+    """
+    Gráfico de barras coloreadas según su valor.
+
+    Args:
+        x: Categorías (array o Serie)
+        y: Valores (array o Serie)
+        titulo: Título del gráfico
+        titulo_x: Título del eje X
+        titulo_y: Título del eje Y y de la barra de colores
+        escala_colores: Escala continua de Plotly
+        formato_texto: Formato d3 para mostrar el valor sobre cada barra (opcional)
+        height: Alto en píxeles
+        diseño: Cambios adicionales al diseño
+    """
+    x = _valores(x)
+    y = _valores(y).astype(float)
+
+    barra = go.Bar(
+        x=x,
+        y=y,
+        marker=dict(color=y, coloraxis='coloraxis'),
+        hovertemplate=f"{titulo_x}=%{{x}}<br>{titulo_y}=%{{y}}<extra></extra>"
+    )
+    if formato_texto:
+        barra.update(texttemplate=f"%{{y:{formato_texto}}}", textposition='outside', textfont=dict(size=12))
+
+    return go.Figure(
+        data=[barra],
+        layout=_diseño(
+            dict(
+                title=titulo,
+                height=height,
+                xaxis=dict(title=titulo_x),
+                yaxis=dict(title=titulo_y),
+                coloraxis=dict(colorscale=escala_colores, colorbar=dict(title=titulo_y))
+            ),
+            diseño
+        )
+    )
+
+
+def grafico_linea(x, y, titulo, titulo_x, titulo_y, height=450, **diseño):
+    """
+    Gráfico de línea con marcadores (por ejemplo, una métrica a lo largo del tiempo).
+
+    Args:
+        x: Valores del eje X (array o Serie)
+        y: Valores del eje Y (array o Serie)
+        titulo: Título del gráfico
+        titulo_x: Título del eje X
+        titulo_y: Título del eje Y
+        height: Alto en píxeles
+        diseño: Cambios adicionales al diseño
+    """
+    linea = go.Scatter(
+        x=_valores(x),
+        y=_valores(y).astype(float),
+        mode='lines+markers',
+        line=dict(width=3),
+        marker=dict(size=8),
+        hovertemplate=f"{titulo_x}=%{{x}}<br>{titulo_y}=%{{y}}<extra></extra>"
+    )
+
+    return go.Figure(
+        data=[linea],
+        layout=_diseño(
+            dict(
+                title=titulo,
+                height=height,
+                xaxis=dict(title=titulo_x),
+                yaxis=dict(title=titulo_y)
+            ),
+            diseño
+        )
+    )
+
+
+def comparar_con_express(repeticiones=50):
+    """
+    Mide el tiempo de construcción de estas figuras frente a sus equivalentes
+    con plotly.express sobre datos pre-agregados de tamaño típico.
+    """
+    import pandas as pd
+    import plotly.express as px
+
+    rng = np.random.default_rng(0)
+    posiciones = pd.DataFrame({
+        'posicion': [f"Posición {i}" for i in range(12)],
+        'valor': rng.uniform(20, 35, 12)
+    })
+    fechas = pd.DataFrame({
+        'fecha': pd.date_range('2024-01-01', periods=120, freq='D'),
+        'valor': rng.uniform(20, 35, 120)
+    })
+
+    casos = {
+        'barras': (
+            lambda: px.bar(posiciones, x='posicion', y='valor', title='Barras',
+                           labels={'posicion': 'Posición', 'valor': 'Valor'},
+                           color='valor', color_continuous_scale='viridis',
+                           text_auto='.2f').update_layout(height=450),
+            lambda: grafico_barras(posiciones['posicion'], posiciones['valor'], 'Barras',
+                                   'Posición', 'Valor', formato_texto='.2f', height=450)
+        ),
+        'línea': (
+            lambda: px.line(fechas, x='fecha', y='valor', title='Línea',
+                            labels={'fecha': 'Fecha', 'valor': 'Valor'},
+                            markers=True).update_layout(height=450),
+            lambda: grafico_linea(fechas['fecha'], fechas['valor'], 'Línea', 'Fecha', 'Valor')
+        ),
+    }
+
+    for nombre, (express, liviano) in casos.items():
+        tiempos = []
+        for constructor in (express, liviano):
+            constructor()
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                constructor()
+            tiempos.append((time.perf_counter() - inicio) / repeticiones * 1000)
+        print(f"{nombre}: plotly.express {tiempos[0]:.2f} ms, graph_objects {tiempos[1]:.2f} ms "
+              f"({tiempos[0] / tiempos[1]:.1f}x)")
+
+
+if __name__ == "__main__":
+    comparar_con_express()
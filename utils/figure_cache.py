@@ -0,0 +1,71 @@
+# utils/figure_cache.py
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+
+class FigureCache:
+    """
+    Caché LRU de figuras Plotly ya serializadas.
+
+    Guarda el diccionario JSON de cada figura junto con su tamaño en bytes y
+    descarta las menos usadas cuando se supera la cantidad de entradas o el
+    total de bytes. Volver a una selección de filtros ya vista devuelve la
+    figura sin reconstruirla.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=32 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Cantidad máxima de figuras guardadas
+            max_bytes: Tamaño máximo total de las figuras serializadas
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, clave, construir):
+        """
+        Devuelve la figura serializada asociada a la clave, construyéndola si no está.
+
+        Args:
+            clave: Tupla hashable (nombre del gráfico, versión de datos, filtros...)
+            construir: Función sin argumentos que devuelve un go.Figure
+
+        Returns:
+            Diccionario de la figura, listo para la propiedad `figure` de dcc.Graph
+        """
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                return self._entradas[clave][0]
+
+        texto = pio.to_json(construir(), validate=False)
+        figura = json.loads(texto)
+        tamaño = len(texto.encode('utf-8'))
+
+        # Una figura más grande que todo el presupuesto no se guarda
+        if tamaño > self.max_bytes:
+            return figura
+
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self.total_bytes -= anterior[1]
+            self._entradas[clave] = (figura, tamaño)
+            self.total_bytes += tamaño
+            while len(self._entradas) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, liberado) = self._entradas.popitem(last=False)
+                self.total_bytes -= liberado
+
+        return figura
+
+    def clear(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._entradas.clear()
+            self.total_bytes = 0
@@ -0,0 +1,151 @@
+# utils/filter_engine.py
+import copy
+
+import numpy as np
+import pandas as pd
+
+from utils.filter_index import COMODINES
+
+
+class FilterEngine:
+    """
+    Motor de filtrado basado en índices invertidos.
+
+    Para cada columna de dimensión guarda, por cada valor, el array ordenado
+    de posiciones de fila que lo contienen; para la fecha guarda las filas
+    ordenadas cronológicamente. Filtrar es intersecar esos arrays, con un
+    costo proporcional al tamaño del resultado y no al del dataset.
+    """
+
+    def __init__(self, df, columnas, columna_fecha=None):
+        """
+        Args:
+            df: DataFrame a indexar
+            columnas: Columnas categóricas por las que se filtra
+            columna_fecha: Columna de fechas para filtros por rango (opcional)
+        """
+        self.n_filas = len(df)
+        self.columna_fecha = columna_fecha
+        self._filas = {col: _filas_por_valor(df[col]) for col in columnas}
+
+        self._fechas = None
+        if columna_fecha:
+            fechas = df[columna_fecha].to_numpy(dtype='datetime64[ns]')
+            self._fechas = fechas
+            self._orden_fechas = np.argsort(fechas, kind='stable')
+            self._fechas_ordenadas = fechas[self._orden_fechas]
+
+    def filter(self, criterios, fecha_inicio=None, fecha_fin=None):
+        """
+        Devuelve las posiciones de las filas que cumplen todos los criterios.
+
+        Args:
+            criterios: Diccionario columna -> valor ("Todas"/"Todos"/None no filtran)
+            fecha_inicio: Fecha mínima incluida (opcional)
+            fecha_fin: Fecha máxima incluida (opcional)
+
+        Returns:
+            Array ordenado de posiciones, o None si no se aplicó ningún filtro
+        """
+        candidatos = []
+        for col, valor in criterios.items():
+            if valor in COMODINES:
+                continue
+            candidatos.append(self._filas[col].get(valor, np.empty(0, dtype=np.intp)))
+
+        inicio = _a_datetime64(fecha_inicio)
+        fin = _a_datetime64(fecha_fin)
+        hay_fechas = self._fechas is not None and (inicio is not None or fin is not None)
+
+        if not candidatos:
+            if not hay_fechas:
+                return None
+            return self._filas_en_rango(inicio, fin)
+
+        # Empezar por la lista más corta y descartar lo que no está en las demás
+        candidatos.sort(key=len)
+        resultado = candidatos[0]
+        for otras in candidatos[1:]:
+            if len(resultado) == 0:
+                break
+            resultado = resultado[_contenidos(resultado, otras)]
+
+        if hay_fechas:
+            fechas = self._fechas[resultado]
+            mascara = np.ones(len(resultado), dtype=bool)
+            if inicio is not None:
+                mascara &= fechas >= inicio
+            if fin is not None:
+                mascara &= fechas <= fin
+            resultado = resultado[mascara]
+
+        return resultado
+
+    def extended(self, nuevas, inicio):
+        """
+        Devuelve un motor nuevo que además indexa las filas agregadas al final.
+
+        Solo se recorren las filas nuevas: los arrays de los valores que no
+        aparecen en ellas se comparten con este motor, que no se modifica.
+
+        Args:
+            nuevas: DataFrame con las filas agregadas
+            inicio: Posición de la primera fila nueva en el frame completo
+        """
+        nuevo = copy.copy(self)
+        nuevo.n_filas = inicio + len(nuevas)
+        nuevo._filas = {}
+
+        for col, por_valor in self._filas.items():
+            por_valor = dict(por_valor)
+            for valor, filas in _filas_por_valor(nuevas[col]).items():
+                filas = filas + inicio
+                # Las posiciones nuevas son mayores que todas las anteriores: siguen ordenadas
+                anteriores = por_valor.get(valor)
+                por_valor[valor] = filas if anteriores is None else np.concatenate([anteriores, filas])
+            nuevo._filas[col] = por_valor
+
+        if self._fechas is not None:
+            fechas = nuevas[self.columna_fecha].to_numpy(dtype='datetime64[ns]')
+            orden = np.argsort(fechas, kind='stable')
+            # Insertar las fechas nuevas en el orden existente sin reordenar todo
+            lugares = np.searchsorted(self._fechas_ordenadas, fechas[orden], side='right')
+            nuevo._fechas = np.concatenate([self._fechas, fechas])
+            nuevo._orden_fechas = np.insert(self._orden_fechas, lugares, orden + inicio)
+            nuevo._fechas_ordenadas = np.insert(self._fechas_ordenadas, lugares, fechas[orden])
+
+        return nuevo
+
+    def _filas_en_rango(self, inicio, fin):
+        """Posiciones ordenadas de las filas cuya fecha está en [inicio, fin]."""
+        desde = 0 if inicio is None else np.searchsorted(self._fechas_ordenadas, inicio, side='left')
+        hasta = len(self._fechas_ordenadas) if fin is None else np.searchsorted(self._fechas_ordenadas, fin, side='right')
+        return np.sort(self._orden_fechas[desde:hasta])
+
+
+def _filas_por_valor(serie):
+    """Diccionario valor -> array ordenado de las posiciones donde aparece."""
+    codigos, valores = pd.factorize(serie)
+    orden = np.argsort(codigos, kind='stable')
+    # Límites de cada código dentro del orden (los NaN, código -1, quedan fuera)
+    limites = np.searchsorted(codigos[orden], np.arange(len(valores) + 1))
+    return {
+        valor: orden[limites[i]:limites[i + 1]]
+        for i, valor in enumerate(valores)
+    }
+
+
+def _contenidos(valores, ordenados):
+    """Máscara de los elementos de valores presentes en el array ordenado."""
+    if len(ordenados) == 0:
+        return np.zeros(len(valores), dtype=bool)
+    pos = np.searchsorted(ordenados, valores)
+    pos = np.minimum(pos, len(ordenados) - 1)
+    return ordenados[pos] == valores
+
+
+def _a_datetime64(fecha):
+    """Convierte una fecha cualquiera a numpy.datetime64 (o None)."""
+    if fecha is None or fecha == "":
+        return None
+    return pd.Timestamp(fecha).to_datetime64()
@@ -0,0 +1,85 @@
+# utils/filter_index.py
+import copy
+from itertools import product
+
+import pandas as pd
+
+# Valores de los dropdowns que significan "sin filtro"
+COMODINES = {None, "", "Todas", "Todos"}
+
+
+class FilterIndex:
+    """
+    Índice jerárquico para los filtros en cascada (división → equipo →
+    posición → jugador).
+
+    Al construirse precalcula, para cada nivel y cada combinación de filtros
+    de los niveles anteriores (incluido "Todas/Todos"), la lista ordenada de
+    opciones. Responder un dropdown es entonces una búsqueda en un diccionario.
+    """
+
+    def __init__(self, df, columnas):
+        """
+        Args:
+            df: DataFrame con los datos
+            columnas: Columnas de filtrado, de la más general a la más específica
+        """
+        self.columnas = list(columnas)
+        opciones = _opciones_por_clave(df[self.columnas])
+        self._opciones = {clave: sorted(valores) for clave, valores in opciones.items()}
+
+    def extended(self, nuevas, inicio=None):
+        """
+        Devuelve un índice nuevo que además incluye las combinaciones de las
+        filas agregadas. Solo se reordenan las listas que ganan valores.
+
+        Args:
+            nuevas: DataFrame con las filas agregadas
+            inicio: No se usa; se acepta por compatibilidad con el almacén
+        """
+        nuevo = copy.copy(self)
+        nuevo._opciones = dict(self._opciones)
+        for clave, valores in _opciones_por_clave(nuevas[self.columnas]).items():
+            actuales = nuevo._opciones.get(clave, [])
+            if not valores.issubset(actuales):
+                nuevo._opciones[clave] = sorted(valores.union(actuales))
+        return nuevo
+
+    def options(self, columna, *filtros):
+        """
+        Devuelve las opciones ordenadas de una columna dados los filtros de
+        los niveles anteriores.
+
+        Args:
+            columna: Columna cuyas opciones se piden
+            filtros: Valores seleccionados en los niveles anteriores, en orden
+
+        Returns:
+            Lista ordenada de valores (vacía si la combinación no existe)
+        """
+        nivel = self.columnas.index(columna)
+        clave = tuple(None if f in COMODINES else f for f in filtros[:nivel])
+        clave += (None,) * (nivel - len(clave))
+        return self._opciones.get((nivel, clave), [])
+
+
+def _opciones_por_clave(df):
+    """Conjuntos de opciones por (nivel, prefijo de filtros) de un DataFrame."""
+    opciones = {}
+
+    # Solo importan las combinaciones distintas de valores, no las filas
+    combinaciones = df.drop_duplicates()
+
+    for fila in combinaciones.itertuples(index=False):
+        for nivel, valor in enumerate(fila):
+            if pd.isna(valor):
+                continue
+            prefijo = fila[:nivel]
+            # Cada valor del prefijo puede estar fijado o ser comodín
+            for mascara in product((False, True), repeat=nivel):
+                clave = tuple(None if comodin else v for v, comodin in zip(prefijo, mascara))
+                if any(v is not None and pd.isna(v) for v in clave):
+                    continue
+                opciones.setdefault((nivel, clave), set()).add(valor)
+
+    return opciones
@@ -0,0 +1,174 @@
+# utils/gps_schema.py
+"""
+Esquema de tipos de los exports GPS (gps_full.csv).
+
+Declara el dtype de cada columna del CSV: las dimensiones de texto como
+categóricas, las banderas como bool, la temporada como entero chico y los
+conteos y las métricas continuas como float32 (una celda vacía queda como NaN). El dashboard carga solo las columnas de
+COLUMNAS_DASHBOARD_GPS.
+
+Uso como script para ver el ahorro de memoria frente a la lectura por defecto:
+
+    python -m utils.gps_schema data/gps_full.csv
+"""
+import sys
+
+import pandas as pd
+
+# Las fechas vienen como dd/mm/yyyy
+FORMATO_FECHA_GPS = '%d/%m/%Y'
+
+FECHA = 'fecha'
+
+ESQUEMA_GPS = {
+    # Fechas
+    'date': FECHA,
+    'date_id': FECHA,
+    'date_name': FECHA,
+
+    # Banderas
+    'is_injected': 'bool',
+    'is_demo_data': 'bool',
+
+    # Dimensiones y textos repetidos
+    'division': 'category',
+    'team_name': 'category',
+    'position_name': 'category',
+    'athlete_name': 'category',
+    'athlete_id': 'category',
+    'activity_id': 'category',
+    'activity_name': 'category',
+    'period_name': 'category',
+    'start_time_h': 'category',
+    'end_time_h': 'category',
+
+    # Marcas de tiempo en segundos desde 1970 (int64 para no quedar limitadas a 2038)
+    'start_time': 'int64',
+    'end_time': 'int64',
+
+    # Enteros que siempre vienen
+    'temporada': 'int16',
+
+    # Conteos: float32 y no int16, porque un export con una celda vacía no se
+    # podría leer como entero (float32 representa exactos los enteros chicos)
+    'jersey_number': 'float32',
+    'activity_count': 'float32',
+    'int_day_id': 'float32',
+    'gen2_acceleration_band1_total_effort_count': 'float32',
+    'gen2_acceleration_band8_total_effort_count': 'float32',
+    'gen2_acceleration_band1_average_effort_count_session': 'float32',
+    'ima_band1_decel_count': 'float32',
+
+    # Métricas continuas
+    'total_distance': 'float32',
+    'total_duration': 'float32',
+    'total_player_load': 'float32',
+    'max_vel': 'float32',
+    'average_velocity': 'float32',
+    'athlete_max_velocity': 'float32',
+    'max_effort_acceleration': 'float32',
+    'max_effort_deceleration': 'float32',
+    'velocity_band4_total_distance': 'float32',
+    'velocity_band5_total_distance': 'float32',
+    'velocity_band6_total_distance': 'float32',
+    'velocity_band7_total_distance': 'float32',
+    'velocity_band8_total_distance': 'float32',
+    'decc_+_3m/s2_relativo_de_partido': 'float32',
+    'acc_+3m/ss_min': 'float32',
+    'high_speed_distance_per_minute': 'float32',
+    'sprint_distance_per_minute': 'float32',
+    'meterage_per_minute': 'float32',
+    'z_acc_max': 'float32',
+    'z_acc+3_m/ss': 'float32',
+    'z_max_vel': 'float32',
+    'z_sprint_+25.2_km/h': 'float32',
+    'z_mts_19.8-25_km/h': 'float32',
+    'z_mts_14.4-19.8_km/h': 'float32',
+    'z_mts_min': 'float32',
+    'z_PL': 'float32',
+    'z_dist_sesion': 'float32',
+}
+
+# Columnas que carga el dashboard (el resto del export no se usa)
+COLUMNAS_DASHBOARD_GPS = [
+    'date', 'temporada', 'division', 'team_name', 'position_name', 'athlete_name',
+    'athlete_id', 'activity_id', 'activity_name', 'period_name',
+    'total_distance', 'total_duration', 'total_player_load', 'max_vel',
+    'average_velocity', 'athlete_max_velocity',
+    'max_effort_acceleration', 'max_effort_deceleration',
+    'velocity_band4_total_distance', 'velocity_band5_total_distance',
+    'velocity_band6_total_distance', 'velocity_band7_total_distance',
+    'velocity_band8_total_distance',
+    'gen2_acceleration_band1_total_effort_count', 'gen2_acceleration_band8_total_effort_count',
+    'ima_band1_decel_count',
+    'high_speed_distance_per_minute', 'sprint_distance_per_minute', 'meterage_per_minute',
+]
+
+
+def dtypes_lectura(columnas=None):
+    """
+    Diccionario columna -> dtype para pd.read_csv (las fechas se leen como texto).
+
+    Args:
+        columnas: Columnas a incluir, en orden (por defecto todas las del esquema)
+    """
+    columnas = columnas or list(ESQUEMA_GPS)
+    return {col: 'object' if ESQUEMA_GPS[col] == FECHA else ESQUEMA_GPS[col] for col in columnas}
+
+
+def formatos_fecha(columnas=None):
+    """Diccionario columna -> formato de las columnas de fecha incluidas."""
+    columnas = columnas or list(ESQUEMA_GPS)
+    return {col: FORMATO_FECHA_GPS for col in columnas if ESQUEMA_GPS[col] == FECHA}
+
+
+def aplicar_esquema(df):
+    """
+    Devuelve una copia del DataFrame con los tipos del esquema.
+
+    Las columnas que no están en el esquema se dejan como vienen.
+    """
+    df = df.copy()
+    for col in df.columns:
+        tipo = ESQUEMA_GPS.get(col)
+        if tipo is None:
+            continue
+        if tipo == FECHA:
+            df[col] = pd.to_datetime(df[col], format=FORMATO_FECHA_GPS, errors='coerce')
+        else:
+            df[col] = df[col].astype(tipo)
+    return df
+
+
+def informe_memoria(antes, despues):
+    """
+    Texto con el uso de memoria por columna de dos versiones de un frame.
+
+    Args:
+        antes: DataFrame original
+        despues: DataFrame tipado (puede tener menos columnas)
+    """
+    memoria_antes = antes.memory_usage(deep=True, index=False)
+    memoria_despues = despues.memory_usage(deep=True, index=False)
+
+    lineas = [f"{'columna':<55}{'antes':>12}{'después':>12}  dtype"]
+    for col in antes.columns:
+        if col in despues.columns:
+            lineas.append(f"{col:<55}{memoria_antes[col] / 1024:>10.1f}KB{memoria_despues[col] / 1024:>10.1f}KB  "
+                          f"{antes[col].dtype} -> {despues[col].dtype}")
+        else:
+            lineas.append(f"{col:<55}{memoria_antes[col] / 1024:>10.1f}KB{'-':>12}  no se carga")
+
+    total_antes = memoria_antes.sum() / 1e6
+    total_despues = memoria_despues.sum() / 1e6
+    lineas.append(f"{'TOTAL':<55}{total_antes:>10.2f}MB{total_despues:>10.2f}MB  "
+                  f"({total_antes / max(total_despues, 1e-9):.1f}x menos)")
+    return "\n".join(lineas)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        crudo = pd.read_csv(path)
+        tipado = aplicar_esquema(crudo)[COLUMNAS_DASHBOARD_GPS]
+        print(f"{path}: {len(crudo)} filas")
+        print(informe_memoria(crudo, tipado))
@@ -0,0 +1,133 @@
+# utils/incoming_watcher.py
+import glob
+import os
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock, el rename sigue evitando procesar dos veces
+    fcntl = None
+
+
+class IncomingWatcher:
+    """
+    Vigila un directorio de entrada y procesa cada archivo nuevo una sola vez.
+
+    Cada archivo se reclama moviéndolo a `procesando/` (un rename atómico, así
+    que si hay varios procesos vigilando solo uno lo toma). Después se mueve a
+    `procesados/` o, si la función de procesamiento falla, a `rechazados/`.
+
+    Con varios workers vigilando el mismo directorio, solo revisa el que tiene
+    el lock de `.vigilante.lock`: los demás esperan y lo toman si ese proceso
+    termina, así los archivos se incorporan en un único proceso.
+    """
+
+    def __init__(self, directorio, procesar, patron='*.csv', intervalo=5.0, espera=2.0):
+        """
+        Args:
+            directorio: Directorio donde se dejan los archivos nuevos
+            procesar: Función que recibe la ruta de un archivo y lo incorpora
+            patron: Patrón de los archivos a procesar
+            intervalo: Segundos entre revisiones del directorio
+            espera: Segundos sin cambios antes de considerar completo un archivo
+        """
+        self.directorio = directorio
+        self.procesar = procesar
+        self.patron = patron
+        self.intervalo = intervalo
+        self.espera = espera
+        self._detener = threading.Event()
+        self._hilo = None
+        self._archivo_lock = None
+
+    def _subdirectorio(self, nombre):
+        ruta = os.path.join(self.directorio, nombre)
+        os.makedirs(ruta, exist_ok=True)
+        return ruta
+
+    def scan(self):
+        """
+        Procesa los archivos pendientes, del más antiguo al más nuevo.
+
+        Returns:
+            Cantidad de archivos incorporados
+        """
+        pendientes = []
+        for path in glob.glob(os.path.join(self.directorio, self.patron)):
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            # Un archivo modificado hace muy poco puede estar copiándose todavía
+            if time.time() - mtime >= self.espera:
+                pendientes.append((mtime, path))
+
+        procesados = 0
+        for _, path in sorted(pendientes):
+            nombre = os.path.basename(path)
+            reclamado = os.path.join(self._subdirectorio('procesando'), nombre)
+            try:
+                os.replace(path, reclamado)
+            except OSError:
+                # Otro proceso lo tomó primero
+                continue
+
+            marca = datetime.now().strftime("%Y%m%d_%H%M%S")
+            try:
+                self.procesar(reclamado)
+                destino = self._subdirectorio('procesados')
+                procesados += 1
+            except Exception as e:
+                print(f"Error al procesar {nombre}: {e}")
+                destino = self._subdirectorio('rechazados')
+            os.replace(reclamado, os.path.join(destino, f"{marca}_{nombre}"))
+
+        return procesados
+
+    def _tomar_lock(self):
+        """True si este proceso es el que ingiere (tiene o acaba de tomar el lock)."""
+        if fcntl is None or self._archivo_lock is not None:
+            return True
+        archivo = open(os.path.join(self.directorio, '.vigilante.lock'), 'a')
+        try:
+            fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            # Otro proceso está ingiriendo
+            archivo.close()
+            return False
+        self._archivo_lock = archivo
+        return True
+
+    def _soltar_lock(self):
+        if self._archivo_lock is not None:
+            self._archivo_lock.close()
+            self._archivo_lock = None
+
+    def _vigilar(self):
+        try:
+            while not self._detener.is_set():
+                try:
+                    if self._tomar_lock():
+                        self.scan()
+                except Exception as e:
+                    print(f"Error al revisar {self.directorio}: {e}")
+                self._detener.wait(self.intervalo)
+        finally:
+            self._soltar_lock()
+
+    def start(self):
+        """Inicia la revisión periódica en un hilo de fondo."""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        os.makedirs(self.directorio, exist_ok=True)
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._vigilar, name="incoming-watcher", daemon=True)
+        self._hilo.start()
+
+    def stop(self):
+        """Detiene la revisión periódica."""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=self.intervalo + 1)
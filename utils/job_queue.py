@@ -0,0 +1,221 @@
+# utils/job_queue.py
+"""
+Cola local de trabajos en segundo plano (exportaciones a PDF).
+
+Cada trabajo corre en un hilo coordinador que va informando su avance; la
+parte que consume CPU (armar el documento) se delega a un pool de procesos
+con `run_in_process`, así los hilos del servidor quedan libres para los
+callbacks interactivos.
+
+La tabla de trabajos vive en disco (un .json de estado y un .bin con el
+resultado por trabajo): el navegador consulta el estado con un dcc.Interval
+y cualquier worker del servidor puede responderle, no solo el que lo lanzó.
+"""
+import base64
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+
+PENDIENTE = "pendiente"
+EN_CURSO = "en_curso"
+LISTO = "listo"
+ERROR = "error"
+
+
+def directorio_por_defecto():
+    """Directorio de la tabla de trabajos (DASHBOARD_JOBS_DIR o el temporal del sistema)."""
+    return os.environ.get("DASHBOARD_JOBS_DIR") or os.path.join(tempfile.gettempdir(), "dashboard_jobs")
+
+
+def descarga(contenido, nombre, tipo):
+    """Datos para dcc.Download a partir de los bytes de un archivo."""
+    return dict(
+        content=base64.b64encode(contenido).decode('utf-8'),
+        filename=nombre,
+        type=tipo,
+        base64=True
+    )
+
+
+class JobQueue:
+    """
+    Trabajos en segundo plano con avance y resultado consultables por id.
+
+    La tarea recibe como primer argumento una función `avance(porcentaje, mensaje, **datos)`
+    (los datos extra, por ejemplo un resultado parcial, quedan en el estado) y
+    devuelve un diccionario con "contenido" (bytes), "nombre" y "tipo".
+    """
+
+    def __init__(self, directorio=None, max_procesos=None, max_hilos=4, retencion=3600, vencimiento=600):
+        """
+        Args:
+            directorio: Directorio de la tabla de trabajos
+            max_procesos: Procesos para la parte de CPU (DASHBOARD_PROCESOS_PDF o 2)
+            max_hilos: Trabajos coordinados a la vez en este proceso
+            retencion: Segundos que se conservan los trabajos terminados
+            vencimiento: Segundos sin novedades tras los que un trabajo se da por perdido
+        """
+        self.directorio = directorio or directorio_por_defecto()
+        self.max_procesos = max_procesos or int(os.environ.get("DASHBOARD_PROCESOS_PDF", "2"))
+        self.retencion = retencion
+        self.vencimiento = vencimiento
+        os.makedirs(self.directorio, exist_ok=True)
+
+        self._hilos = concurrent.futures.ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="trabajo")
+        self._procesos = None
+        self._lock = threading.Lock()
+
+    def _ruta(self, id_trabajo, extension):
+        # El id viene del navegador: solo se aceptan los hex que genera submit
+        if not id_trabajo or not all(c in "0123456789abcdef" for c in id_trabajo):
+            raise ValueError(f"Id de trabajo inválido: {id_trabajo!r}")
+        return os.path.join(self.directorio, f"{id_trabajo}.{extension}")
+
+    def _escribir_estado(self, id_trabajo, **estado):
+        estado["actualizado"] = time.time()
+        ruta = self._ruta(id_trabajo, "json")
+        tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(estado, f)
+        os.replace(tmp, ruta)
+
+    def submit(self, tarea, *args):
+        """
+        Encola una tarea y devuelve su id.
+
+        Args:
+            tarea: Función `tarea(avance, *args)` que devuelve el resultado
+            *args: Argumentos de la tarea
+        """
+        self._limpiar()
+        id_trabajo = uuid.uuid4().hex
+        self._escribir_estado(id_trabajo, estado=PENDIENTE, progreso=0, mensaje="En cola")
+        self._hilos.submit(self._ejecutar, id_trabajo, tarea, args)
+        return id_trabajo
+
+    def _ejecutar(self, id_trabajo, tarea, args):
+        def avance(progreso, mensaje, **datos):
+            self._escribir_estado(id_trabajo, estado=EN_CURSO, progreso=progreso, mensaje=mensaje, **datos)
+
+        try:
+            avance(0, "Iniciando")
+            resultado = tarea(avance, *args)
+            with open(self._ruta(id_trabajo, "bin"), "wb") as f:
+                f.write(resultado["contenido"])
+            self._escribir_estado(id_trabajo, estado=LISTO, progreso=100, mensaje="Listo",
+                                  nombre=resultado["nombre"], tipo=resultado["tipo"])
+        except Exception as e:
+            print(f"Error en el trabajo {id_trabajo}: {e}")
+            print(traceback.format_exc())
+            self._escribir_estado(id_trabajo, estado=ERROR, progreso=100, mensaje=str(e))
+
+    def _pool(self):
+        """Pool de procesos vigente (se crea al primer uso)."""
+        with self._lock:
+            if self._procesos is None:
+                # spawn: los procesos no heredan los hilos ni los locks del servidor
+                self._procesos = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_procesos,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._procesos
+
+    def _descartar_pool(self, procesos):
+        """Cierra un pool roto; el próximo pedido crea uno nuevo."""
+        with self._lock:
+            # Otro hilo pudo haberlo reemplazado ya
+            if self._procesos is procesos:
+                self._procesos = None
+        procesos.shutdown(wait=False, cancel_futures=True)
+
+    def run_in_process(self, funcion, *args):
+        """
+        Ejecuta `funcion(*args)` en el pool de procesos y espera el resultado.
+
+        La función y sus argumentos deben poder serializarse (funciones de
+        módulo, DataFrames, textos). Si un proceso del pool muere (por falta
+        de memoria, por ejemplo) el pool queda inutilizable: se descarta, se
+        crea otro y se reintenta una vez; si vuelve a fallar el error llega
+        al trabajo, que queda marcado como fallido.
+        """
+        for intento in range(2):
+            procesos = self._pool()
+            try:
+                return procesos.submit(funcion, *args).result()
+            except concurrent.futures.process.BrokenProcessPool as e:
+                self._descartar_pool(procesos)
+                if intento:
+                    raise RuntimeError("El proceso que armaba el resultado terminó inesperadamente") from e
+                print(f"Se reinicia el pool de procesos tras un fallo: {e}")
+
+    def status(self, id_trabajo):
+        """
+        Devuelve el estado de un trabajo ("estado", "progreso", "mensaje"...), o None si no existe.
+        """
+        try:
+            with open(self._ruta(id_trabajo, "json")) as f:
+                estado = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # El worker que lo corría pudo haberse reiniciado
+        if estado["estado"] in (PENDIENTE, EN_CURSO) and time.time() - estado["actualizado"] > self.vencimiento:
+            estado.update(estado=ERROR, mensaje="El trabajo dejó de responder")
+        return estado
+
+    def result(self, id_trabajo):
+        """Devuelve los bytes del resultado de un trabajo terminado, o None."""
+        try:
+            with open(self._ruta(id_trabajo, "bin"), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def download(self, id_trabajo):
+        """
+        Devuelve el resultado de un trabajo terminado en el formato de dcc.Download
+        y lo borra de la tabla, o None si todavía no está listo.
+        """
+        estado = self.status(id_trabajo)
+        contenido = self.result(id_trabajo) if estado and estado["estado"] == LISTO else None
+        if contenido is None:
+            return None
+        self.discard(id_trabajo)
+        return descarga(contenido, estado["nombre"], estado["tipo"])
+
+    def discard(self, id_trabajo):
+        """Borra el estado y el resultado de un trabajo."""
+        for extension in ("json", "bin"):
+            try:
+                os.remove(self._ruta(id_trabajo, extension))
+            except OSError:
+                pass
+
+    def _limpiar(self):
+        """Borra los trabajos que superaron el tiempo de retención."""
+        limite = time.time() - self.retencion
+        try:
+            nombres = os.listdir(self.directorio)
+        except OSError:
+            return
+        for nombre in nombres:
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                if os.path.getmtime(ruta) < limite:
+                    os.remove(ruta)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        """Detiene los hilos y procesos (los trabajos en curso terminan antes)."""
+        self._hilos.shutdown(wait=True)
+        with self._lock:
+            if self._procesos is not None:
+                self._procesos.shutdown(wait=True)
+                self._procesos = None
@@ -1,22 +1,367 @@
 # utils/ollama_integration.py
+import asyncio
 import httpx
 import json
+import os
+import queue
+import threading
 import pandas as pd
 
+from .analysis_cache import AnalysisCache
+from .single_flight import SingleFlight
+
+# Generaciones simultáneas que se le piden a Ollama (el servidor atiende
+# en paralelo hasta su OLLAMA_NUM_PARALLEL y encola el resto)
+MAX_CONCURRENCIA = int(os.environ.get("OLLAMA_MAX_CONCURRENCIA", "3"))
+
+class OllamaConnection:
+    """
+    Conexiones HTTP con Ollama compartidas por todo el proceso.
+    
+    Un único httpx.AsyncClient con keep-alive vive en un event loop propio,
+    en un hilo aparte, y todos los pedidos corren en ese loop: el código
+    síncrono (callbacks de Dash, informes) le entrega corrutinas con `run` e
+    `iterate`, y el que ya corre en otro event loop (por ejemplo un
+    asyncio.run en un hilo) con `run_async` e `iterate_async`. Así ningún
+    loop ajeno abre conexiones propias que queden sin cerrar.
+    """
+    
+    def __init__(self, max_connections=None, max_keepalive_connections=None, keepalive_expiry=None):
+        """
+        Args:
+            max_connections: Conexiones abiertas a la vez (OLLAMA_MAX_CONEXIONES o 10)
+            max_keepalive_connections: Conexiones ociosas que se conservan (OLLAMA_CONEXIONES_OCIOSAS o 5)
+            keepalive_expiry: Segundos que se conserva una conexión ociosa (OLLAMA_KEEPALIVE o 60)
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.environ.get("OLLAMA_MAX_CONEXIONES", "10")),
+            max_keepalive_connections=max_keepalive_connections or int(os.environ.get("OLLAMA_CONEXIONES_OCIOSAS", "5")),
+            keepalive_expiry=keepalive_expiry or float(os.environ.get("OLLAMA_KEEPALIVE", "60"))
+        )
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._client = None
+    
+    def start(self):
+        """Crea el event loop y el cliente compartido (también se crean solos al primer uso)."""
+        with self._lock:
+            # Un worker creado con fork hereda los objetos pero no el hilo del loop
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._loop = asyncio.new_event_loop()
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=60.0)
+            threading.Thread(target=self._loop.run_forever, name="ollama", daemon=True).start()
+    
+    def run(self, corrutina, timeout=None):
+        """Ejecuta una corrutina en el loop compartido y espera su resultado (desde código síncrono)."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(corrutina, self._loop).result(timeout)
+    
+    def iterate(self, generador, timeout=None):
+        """
+        Recorre un generador asíncrono en el loop compartido desde código síncrono.
+        
+        Args:
+            generador: Generador asíncrono (por ejemplo generate_stream)
+            timeout: Segundos máximos de espera entre un elemento y el siguiente
+        """
+        self.start()
+        elementos = queue.Queue()
+        fin = object()
+        
+        async def consumir():
+            try:
+                async for elemento in generador:
+                    elementos.put((elemento, None))
+                elementos.put((fin, None))
+            except Exception as e:
+                elementos.put((None, e))
+        
+        futuro = asyncio.run_coroutine_threadsafe(consumir(), self._loop)
+        try:
+            while True:
+                elemento, error = elementos.get(timeout=timeout)
+                if error is not None:
+                    raise error
+                if elemento is fin:
+                    return
+                yield elemento
+        finally:
+            # Si quien recorre se detiene antes, se corta la respuesta de Ollama
+            futuro.cancel()
+    
+    async def run_async(self, corrutina):
+        """Ejecuta una corrutina en el loop compartido y la espera desde cualquier event loop."""
+        self.start()
+        if asyncio.get_running_loop() is self._loop:
+            return await corrutina
+        # Cancelar la espera cancela también la corrutina en el loop compartido
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(corrutina, self._loop))
+    
+    async def iterate_async(self, generador):
+        """Recorre un generador asíncrono en el loop compartido desde cualquier event loop."""
+        self.start()
+        if asyncio.get_running_loop() is self._loop:
+            async for elemento in generador:
+                yield elemento
+            return
+        
+        loop = asyncio.get_running_loop()
+        elementos = asyncio.Queue()
+        fin = object()
+        
+        def entregar(elemento, error=None):
+            try:
+                loop.call_soon_threadsafe(elementos.put_nowait, (elemento, error))
+            except RuntimeError:
+                # El loop de quien recorría ya se cerró
+                pass
+        
+        async def consumir():
+            try:
+                async for elemento in generador:
+                    entregar(elemento)
+                entregar(fin)
+            except Exception as e:
+                entregar(None, e)
+        
+        futuro = asyncio.run_coroutine_threadsafe(consumir(), self._loop)
+        try:
+            while True:
+                elemento, error = await elementos.get()
+                if error is not None:
+                    raise error
+                if elemento is fin:
+                    return
+                yield elemento
+        finally:
+            # Si quien recorre se detiene antes, se corta la respuesta de Ollama
+            futuro.cancel()
+    
+    def client(self):
+        """
+        Cliente httpx.AsyncClient compartido. Sus pedidos deben correr en el
+        loop compartido: desde otro loop se envuelven con `run_async` o `iterate_async`.
+        """
+        self.start()
+        return self._client
+    
+    def close(self):
+        """Cierra las conexiones y detiene el loop compartido."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result(5)
+            except Exception as e:
+                print(f"Error al cerrar las conexiones con Ollama: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._pid = self._loop = self._client = None
+
+# Conexiones del proceso (app.py las abre al iniciar y las cierra al salir)
+conexion = OllamaConnection()
+
+# Análisis ya generados, compartidos por los workers (OLLAMA_CACHE=0 la desactiva)
+cache_analisis = AnalysisCache()
+
+# Generaciones en curso del proceso: los pedidos idénticos simultáneos comparten una
+generaciones_en_curso = SingleFlight()
+
 class OllamaAnalysis:
-    def __init__(self, model="deepseek-r1:8b", host="http://localhost:11434"):
-        """Inicializa la integración con Ollama."""
+    def __init__(self, model="deepseek-r1:8b", host="http://localhost:11434", connection=None, cache=None):
+        """
+        Inicializa la integración con Ollama.
+        
+        Args:
+            connection: OllamaConnection a usar (por defecto la del proceso)
+            cache: AnalysisCache a usar (por defecto la compartida; False para no guardar análisis)
+        """
         self.model = model
         self.host = host
         self.api_endpoint = f"{host}/api/generate"
+        self.connection = connection or conexion
+        if cache is None:
+            cache = cache_analisis if os.environ.get("OLLAMA_CACHE", "1") == "1" else False
+        self.cache = cache or None
     
-    async def analyze_data(self, data, analysis_type="general"):
+    async def check_health(self, timeout=5.0):
+        """
+        Verifica que Ollama responda y tenga el modelo, sin generar texto.
+        
+        Returns:
+            None si está disponible, o el motivo por el que no lo está
+        """
+        try:
+            response = await self.connection.run_async(
+                self.connection.client().get(f"{self.host}/api/tags", timeout=timeout)
+            )
+            if response.status_code != 200:
+                return f"Ollama respondió con el código {response.status_code}"
+            modelos = {m.get("name") for m in response.json().get("models", [])}
+            if self.model not in modelos:
+                return f"El modelo {self.model} no está instalado en Ollama"
+            return None
+        except Exception as e:
+            return f"Error conectando a Ollama: {str(e)}"
+    
+    def _clave_cache(self, prompt, analysis_type, use_cache):
+        """Clave del análisis en la caché, o None si no se usa."""
+        if self.cache is None or not use_cache:
+            return None
+        return self.cache.key(self.model, analysis_type, prompt)
+    
+    def _clave_en_curso(self, prompt, analysis_type):
+        """Clave para unificar generaciones idénticas simultáneas."""
+        return AnalysisCache.key(f"{self.host}|{self.model}", analysis_type, prompt)
+    
+    async def generate(self, prompt, timeout=60.0, analysis_type=None, use_cache=True):
+        """
+        Devuelve el texto generado por Ollama para un prompt, desde la caché
+        de análisis si ya se generó.
+        
+        Args:
+            prompt: Texto del prompt
+            timeout: Segundos máximos de la generación
+            analysis_type: Tipo de análisis (forma parte de la clave de la caché)
+            use_cache: False para pedirlo al modelo aunque esté guardado
+            
+        Lanza una excepción si la respuesta no es correcta, no trae texto o se
+        supera el tiempo; solo las respuestas con texto se guardan en la caché.
+        """
+        clave = self._clave_cache(prompt, analysis_type, use_cache)
+        if clave is not None:
+            respuesta = self.cache.get(clave)
+            if respuesta is not None:
+                return respuesta
+        
+        async def generar():
+            # Otro pedido igual pudo haber terminado mientras tanto
+            respuesta = self.cache.get(clave) if clave is not None else None
+            if respuesta is None:
+                respuesta = await self._generar(prompt, timeout)
+                if clave is not None:
+                    self.cache.put(clave, self.model, analysis_type, respuesta)
+            return respuesta
+        
+        # Si el mismo análisis ya se está generando, se espera ese resultado
+        return await generaciones_en_curso.run(self._clave_en_curso(prompt, analysis_type), generar)
+    
+    async def _generar(self, prompt, timeout):
+        """Envía un prompt a Ollama y devuelve el texto generado."""
+        response = await self.connection.run_async(self.connection.client().post(
+            self.api_endpoint,
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False
+            },
+            timeout=timeout
+        ))
+        if response.status_code != 200:
+            raise RuntimeError(f"Error al comunicarse con Ollama: {response.status_code}")
+        texto = response.json().get("response")
+        if not texto:
+            # No es un análisis: no debe quedar en la caché como si lo fuera
+            raise RuntimeError("No se pudo obtener un análisis.")
+        return texto
+    
+    async def generate_stream(self, prompt, timeout=60.0, analysis_type=None, use_cache=True):
+        """
+        Envía un prompt a Ollama en modo streaming y va devolviendo el texto a
+        medida que se genera. Si el análisis ya está en la caché se devuelve
+        entero de una vez; si no, se guarda al terminar.
+        
+        Args:
+            prompt: Texto del prompt
+            timeout: Segundos máximos de espera entre un fragmento y el siguiente
+            analysis_type: Tipo de análisis (forma parte de la clave de la caché)
+            use_cache: False para pedirlo al modelo aunque esté guardado
+        """
+        clave = self._clave_cache(prompt, analysis_type, use_cache)
+        if clave is not None:
+            respuesta = self.cache.get(clave)
+            if respuesta is not None:
+                yield respuesta
+                return
+        
+        async def generar():
+            fragmentos = []
+            async for fragmento in self._generar_stream(prompt, timeout):
+                fragmentos.append(fragmento)
+                yield fragmento
+            # Solo se guarda una respuesta con texto del modelo
+            if clave is not None and "".join(fragmentos).strip():
+                self.cache.put(clave, self.model, analysis_type, "".join(fragmentos))
+        
+        # Si el mismo análisis ya se está generando, se siguen sus fragmentos
+        async for fragmento in generaciones_en_curso.stream(self._clave_en_curso(prompt, analysis_type), generar):
+            yield fragmento
+    
+    async def _generar_stream(self, prompt, timeout):
+        """Envía un prompt en modo streaming, con la respuesta leída en el loop compartido."""
+        async for fragmento in self.connection.iterate_async(self._leer_stream(prompt, timeout)):
+            yield fragmento
+    
+    async def _leer_stream(self, prompt, timeout):
+        """Pedido en modo streaming (Ollama responde una línea JSON por fragmento)."""
+        async with self.connection.client().stream(
+            "POST",
+            self.api_endpoint,
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True
+            },
+            timeout=timeout
+        ) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Error al comunicarse con Ollama: {response.status_code}")
+            async for linea in response.aiter_lines():
+                if not linea.strip():
+                    continue
+                fragmento = json.loads(linea)
+                if fragmento.get("error"):
+                    raise RuntimeError(f"Error de Ollama: {fragmento['error']}")
+                if fragmento.get("response"):
+                    yield fragmento["response"]
+                if fragmento.get("done"):
+                    return
+    
+    async def generate_many(self, prompts, max_concurrent=MAX_CONCURRENCIA, timeout=60.0):
+        """
+        Genera varios prompts a la vez.
+        
+        Args:
+            prompts: Diccionario nombre -> prompt
+            max_concurrent: Generaciones en curso a la vez como máximo
+            timeout: Segundos máximos de cada generación
+            
+        Returns:
+            Diccionario nombre -> texto, con None en los que fallaron
+        """
+        semaforo = asyncio.Semaphore(max_concurrent)
+        
+        async def generar(nombre, prompt):
+            async with semaforo:
+                try:
+                    return nombre, await asyncio.wait_for(self.generate(prompt, timeout, analysis_type=nombre), timeout)
+                except Exception as e:
+                    print(f"Error en el análisis '{nombre}': {e!r}")
+                    return nombre, None
+        
+        resultados = await asyncio.gather(*(generar(nombre, prompt) for nombre, prompt in prompts.items()))
+        return dict(resultados)
+    
+    async def analyze_data(self, data, analysis_type="general", use_cache=True):
         """
         Solicita análisis de datos a Ollama.
         
         Args:
             data: DataFrame o datos a analizar
             analysis_type: Tipo de análisis (general, velocidad, distancia, etc.)
+            use_cache: False para no reutilizar un análisis ya generado
             
         Returns:
             El análisis generado por el modelo
@@ -32,26 +377,29 @@ class OllamaAnalysis:
         
         try:
             # Hacer la llamada a la API de Ollama
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_endpoint,
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False
-                    },
-                    timeout=60.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return result.get("response", "No se pudo obtener un análisis.")
-                else:
-                    return f"Error al comunicarse con Ollama: {response.status_code}"
-        
+            return await self.generate(prompt, analysis_type=analysis_type, use_cache=use_cache)
+        except RuntimeError as e:
+            return str(e)
         except Exception as e:
             return f"Error en la comunicación con Ollama: {str(e)}"
     
+    def analyze_data_sync(self, data, analysis_type="general", use_cache=True):
+        """Versión síncrona de analyze_data (usa el loop y las conexiones compartidas)."""
+        return self.connection.run(self.analyze_data(data, analysis_type, use_cache))
+    
+    def analyze_data_stream(self, data, analysis_type="general", use_cache=True):
+        """
+        Versión en streaming de analyze_data para código síncrono: devuelve los
+        fragmentos del análisis a medida que el modelo los genera.
+        
+        Lanza una excepción si la comunicación con Ollama falla.
+        """
+        data_summary = self._prepare_data_summary(data) if isinstance(data, pd.DataFrame) else str(data)
+        prompt = self._create_prompt(data_summary, analysis_type)
+        return self.connection.iterate(
+            self.generate_stream(prompt, analysis_type=analysis_type, use_cache=use_cache), timeout=60.0
+        )
+    
     def _prepare_data_summary(self, df):
         """Prepara un resumen del DataFrame para usar en el prompt."""
         summary = {}
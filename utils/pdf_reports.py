@@ -0,0 +1,546 @@
+# utils/pdf_reports.py
+"""
+Armado de los informes PDF de las páginas GPS y Performance con ReportLab.
+
+Las funciones reciben solo DataFrames y textos y devuelven los bytes del
+PDF, así pueden correr en un proceso aparte (ver utils.job_queue) sin
+importar las páginas de Dash.
+"""
+import io
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from . import report_charts
+
+# Versión del diseño de los informes: al cambiarla no se reutilizan los PDF ya guardados
+FORMATO_INFORMES = 3
+
+# Alto de los gráficos embebidos
+ALTO_GRAFICO = 8*cm
+
+# Métricas del radar del informe de rendimiento (las mismas que en el dashboard)
+METRICAS_RADAR = ['velocidad_media', 'resistencia', 'sprint_maximo', 'precision_tiros', 'duelos_ganados']
+
+# Recomendaciones del informe de rendimiento según la métrica principal
+RECOMENDACIONES_PERFORMANCE = {
+    'velocidad_media': """
+    Recomendaciones para mejorar la velocidad media:
+    • Implementar entrenamientos específicos de sprint y aceleración
+    • Realizar ejercicios de resistencia a la velocidad
+    • Incorporar trabajo de potencia y pliometría
+    • Revisar técnica de carrera para optimizar la eficiencia
+    """,
+    'resistencia': """
+    Recomendaciones para mejorar la resistencia:
+    • Aumentar gradualmente el volumen de entrenamiento aeróbico
+    • Incorporar entrenamientos de intervalos de alta intensidad
+    • Realizar entrenamientos de umbral láctico
+    • Monitorear la recuperación y evitar el sobreentrenamiento
+    """,
+    'sprint_maximo': """
+    Recomendaciones para mejorar el sprint máximo:
+    • Entrenar la fase de aceleración con ejercicios específicos
+    • Incorporar entrenamiento de fuerza explosiva
+    • Trabajar la técnica de carrera a máxima velocidad
+    • Utilizar ejercicios de resistencia específicos (arrastres, cuestas)
+    """,
+    'pases_completados': """
+    Recomendaciones para mejorar los pases completados:
+    • Realizar ejercicios de precisión de pase con diferentes distancias
+    • Trabajar en situaciones de juego reducido bajo presión
+    • Mejorar la toma de decisiones con ejercicios específicos
+    • Analizar video para identificar patrones de pase efectivos
+    """,
+    'precision_tiros': """
+    Recomendaciones para mejorar la precisión de tiros:
+    • Incrementar el volumen de repeticiones en entrenamientos
+    • Realizar ejercicios de tiro bajo fatiga y presión
+    • Trabajar la técnica específica según la posición del jugador
+    • Implementar ejercicios de toma de decisiones rápidas
+    """,
+    'duelos_ganados': """
+    Recomendaciones para mejorar los duelos ganados:
+    • Fortalecer el tren inferior y superior para mejorar en duelos físicos
+    • Trabajar la anticipación y lectura del juego
+    • Mejorar la técnica de entrada y posicionamiento defensivo
+    • Realizar ejercicios de 1v1 en diferentes situaciones de juego
+    """,
+}
+
+RECOMENDACIONES_GENERALES = """
+    Recomendaciones generales:
+    • Individualizar los entrenamientos según el perfil de cada jugador
+    • Monitorear constantemente el rendimiento para detectar mejoras
+    • Establecer objetivos específicos y medibles
+    • Integrar el trabajo técnico, táctico, físico y mental
+    """
+
+
+def nombre_archivo(prefijo):
+    """Nombre del PDF descargado, con la fecha y hora de generación."""
+    return f"{prefijo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+
+
+def _estilos():
+    """Estilos de párrafo comunes a los informes."""
+    styles = getSampleStyleSheet()
+    return {
+        'titulo': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.darkblue,
+            spaceAfter=20,
+            alignment=1  # Centrado
+        ),
+        'subtitulo': ParagraphStyle(
+            'CustomSubtitle',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor=colors.darkblue,
+            spaceBefore=15,
+            spaceAfter=10
+        ),
+        'normal': ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=8
+        ),
+        'analisis': ParagraphStyle(
+            'AnalysisStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            leftIndent=10,
+            rightIndent=10,
+            spaceBefore=5,
+            spaceAfter=5,
+            backColor=colors.lightgrey,
+            borderWidth=0,  # Sin borde
+            borderPadding=5
+        ),
+        'info': ParagraphStyle(
+            'InfoStyle',
+            parent=styles['Italic'],
+            fontSize=8,
+            textColor=colors.darkgrey
+        ),
+        'pie': ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.grey),
+    }
+
+
+def _documento(buffer):
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=1.5*cm,
+        rightMargin=1.5*cm,
+        topMargin=2*cm,
+        bottomMargin=2*cm
+    )
+
+
+def _encabezado(titulo, doc, estilos):
+    """Título, línea horizontal y fecha de generación."""
+    return [
+        Paragraph(titulo, estilos['titulo']),
+        Spacer(1, 1),
+        Table([[""]], colWidths=[doc.width], style=TableStyle([
+            ('LINEABOVE', (0, 0), (-1, 0), 1, colors.darkblue),
+        ])),
+        Spacer(1, 10),
+        Paragraph(f"Generado el: {datetime.now().strftime('%d/%m/%Y %H:%M')}", estilos['normal']),
+        Spacer(1, 15),
+    ]
+
+
+def _pie(texto, doc, estilo):
+    return [
+        Spacer(1, 30),
+        Table([[""]], colWidths=[doc.width], style=TableStyle([
+            ('LINEABOVE', (0, 0), (-1, 0), 0.5, colors.grey),
+        ])),
+        Spacer(1, 5),
+        Paragraph(texto, estilo),
+    ]
+
+
+def _filas_filtros(division, team, position, player):
+    return [
+        ["Filtro", "Valor"],
+        ["División", division if division != "Todas" else "Todas las divisiones"],
+        ["Equipo", team if team != "Todos" else "Todos los equipos"],
+        ["Posición", position if position != "Todas" else "Todas las posiciones"],
+        ["Jugador", player if player != "Todos" else "Todos los jugadores"]
+    ]
+
+
+def _tabla_filtros(filas):
+    """Tabla de filtros aplicados (nombre y valor)."""
+    tabla = Table(filas, colWidths=[3*cm, 12*cm])
+    tabla.setStyle(TableStyle([
+        # Encabezado
+        ('BACKGROUND', (0, 0), (1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (1, 0), colors.white),
+        ('ALIGN', (0, 0), (1, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (1, 0), 8),
+        ('TOPPADDING', (0, 0), (1, 0), 8),
+
+        # Cuerpo de la tabla
+        ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 1), (0, -1), colors.darkblue),
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 1), (0, -1), 10),
+        ('VALIGN', (0, 1), (1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (1, -1), 0.5, colors.grey),
+        ('BOTTOMPADDING', (0, 1), (1, -1), 6),
+        ('TOPPADDING', (0, 1), (1, -1), 6),
+
+        # Bordes exteriores más gruesos
+        ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
+    ]))
+    return tabla
+
+
+def _tabla_estadisticas(filas):
+    """Tabla de estadísticas básicas (métrica y valor)."""
+    tabla = Table(filas, colWidths=[8*cm, 7*cm])
+    tabla.setStyle(TableStyle([
+        # Encabezado
+        ('BACKGROUND', (0, 0), (1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (1, 0), colors.white),
+        ('ALIGN', (0, 0), (1, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (1, 0), 8),
+        ('TOPPADDING', (0, 0), (1, 0), 8),
+
+        # Cuerpo de la tabla
+        ('BACKGROUND', (0, 1), (0, -1), colors.lightgrey),
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+        ('ALIGN', (1, 1), (1, -1), 'CENTER'),
+        ('FONTSIZE', (0, 1), (1, -1), 10),
+        ('VALIGN', (0, 1), (1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (1, -1), 0.5, colors.grey),
+        ('BOTTOMPADDING', (0, 1), (1, -1), 6),
+        ('TOPPADDING', (0, 1), (1, -1), 6),
+
+        # Bordes exteriores más gruesos
+        ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
+    ]))
+    return tabla
+
+
+def _tabla_listado(filas, anchos, tamaño_fuente=9):
+    """Tabla de ranking con filas alternadas; la última columna es el valor."""
+    valor = len(anchos) - 1
+    tabla = Table(filas, colWidths=anchos)
+    tabla.setStyle(TableStyle([
+        # Encabezado
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('TOPPADDING', (0, 0), (-1, 0), 8),
+
+        # Cuerpo de la tabla
+        ('FONTSIZE', (0, 1), (-1, -1), tamaño_fuente),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (valor, 1), (valor, -1), 'CENTER'),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
+        ('TOPPADDING', (0, 1), (-1, -1), 5),
+
+        # Bordes exteriores más gruesos
+        ('BOX', (0, 0), (-1, -1), 1, colors.darkblue)
+    ]))
+
+    # Fondo alternado
+    for i in range(1, len(filas), 2):
+        tabla.setStyle(TableStyle([('BACKGROUND', (0, i), (-1, i), colors.lightgrey)]))
+    return tabla
+
+
+def _graficos(graficos, doc):
+    """Gráficos embebidos uno debajo del otro, a todo el ancho de la página."""
+    elementos = []
+    for grafico in graficos:
+        elementos.append(report_charts.elemento(grafico, doc.width, ALTO_GRAFICO))
+        elementos.append(Spacer(1, 10))
+    return elementos
+
+
+def _grafico_radar(df, jugador, metric):
+    """Radar del jugador (o del mejor en la métrica) frente al promedio de su posición, en % del máximo."""
+    metricas = [m for m in METRICAS_RADAR if m in df.columns]
+    if jugador == "Todos" or jugador not in set(df['jugador']):
+        medias = df.groupby('jugador', observed=True)[metric].mean()
+        jugador = medias.idxmax()
+
+    jugador_df = df[df['jugador'] == jugador]
+    posicion = jugador_df['posicion'].iloc[0]
+    posicion_df = df[df['posicion'] == posicion]
+    maximos = [max(df[m].max(), 0.0001) for m in metricas]
+    return report_charts.radar(
+        [m.replace('_', ' ').title() for m in metricas],
+        [
+            (jugador, [jugador_df[m].mean() / maximo * 100 for m, maximo in zip(metricas, maximos)]),
+            (f"Promedio {posicion}", [posicion_df[m].mean() / maximo * 100 for m, maximo in zip(metricas, maximos)]),
+        ],
+        f"Perfil de Rendimiento: {jugador}"
+    )
+
+
+def formatear_texto_analisis(texto):
+    """
+    Formatea el texto de un análisis para el PDF: separa listas numeradas y
+    con viñetas en renglones y vuelve a unir las oraciones muy cortas.
+    """
+    if not texto:
+        return "No hay análisis disponible."
+
+    # Eliminar espacios extra y saltos de línea innecesarios
+    texto = ' '.join([line.strip() for line in texto.split('\n') if line.strip()])
+
+    # Formatear listas numeradas si existen
+    for i in range(1, 10):
+        if f"{i}. " in texto:
+            texto = texto.replace(f"{i}. ", f"\n{i}. ")
+
+    # Formatear listas con viñetas si existen
+    if "• " in texto or "* " in texto:
+        texto = texto.replace("• ", "\n• ")
+        texto = texto.replace("* ", "\n• ")
+
+    # Añadir saltos de párrafo después de puntos finales seguidos de espacio
+    texto = texto.replace(". ", ".\n")
+
+    # Volver a unir oraciones muy cortas
+    result = []
+    for line in texto.split('\n'):
+        if result and len(line) < 40 and not line.startswith("•") and not any(line.startswith(f"{i}.") for i in range(1, 10)):
+            result[-1] += " " + line
+        else:
+            result.append(line)
+
+    return "\n".join(result)
+
+
+def _parrafos_analisis(texto, estilo):
+    """Párrafos de ReportLab para un texto de análisis (las listas en negrita)."""
+    elementos = []
+    for parrafo in formatear_texto_analisis(texto).split('\n'):
+        if parrafo.strip():
+            if parrafo.startswith('•') or any(parrafo.startswith(f"{i}.") for i in range(1, 10)):
+                elementos.append(Paragraph(f"<b>{parrafo}</b>", estilo))
+            else:
+                elementos.append(Paragraph(parrafo, estilo))
+            elementos.append(Spacer(1, 3))  # Pequeño espacio entre párrafos
+    return elementos
+
+
+def informe_gps(df, division, team, position, player, general_analysis, velocity_analysis, distance_analysis):
+    """
+    Arma el informe PDF de datos GPS.
+
+    Args:
+        df: Datos GPS ya filtrados
+        division, team, position, player: Filtros aplicados
+        general_analysis, velocity_analysis, distance_analysis: Textos de análisis
+
+    Returns:
+        Bytes del PDF
+    """
+    buffer = io.BytesIO()
+    doc = _documento(buffer)
+    estilos = _estilos()
+
+    elements = _encabezado("Informe de Análisis GPS", doc, estilos)
+
+    # Sección de filtros aplicados
+    elements.append(Paragraph("Filtros aplicados", estilos['subtitulo']))
+    elements.append(_tabla_filtros(_filas_filtros(division, team, position, player)))
+    elements.append(Spacer(1, 20))
+
+    if df.empty:
+        elements.append(Paragraph("No hay datos disponibles con los filtros seleccionados.", estilos['normal']))
+        doc.build(elements)
+        return buffer.getvalue()
+
+    # Estadísticas Básicas
+    elements.append(Paragraph("Estadísticas Básicas", estilos['subtitulo']))
+    elements.append(_tabla_estadisticas([
+        ["Métrica", "Valor"],
+        ["Total Jugadores", f"{df['athlete_name'].nunique()}"],
+        ["Velocidad Máxima Promedio", f"{df['max_vel'].mean():.2f} km/h"],
+        ["Velocidad Máxima", f"{df['max_vel'].max():.2f} km/h"],
+        ["Player Load Promedio", f"{df['total_player_load'].mean():.2f}"],
+        ["Distancia Promedio", f"{df['total_distance'].mean():.2f} m"]
+    ]))
+    elements.append(Spacer(1, 15))
+
+    # Gráficos por posición (los mismos del dashboard)
+    pos_data = df.groupby('position_name', observed=True)[['max_vel', 'total_player_load']].mean().reset_index()
+    elements.append(Paragraph("Gráficos por Posición", estilos['subtitulo']))
+    elements.extend(_graficos([
+        report_charts.barras(pos_data['position_name'], pos_data['max_vel'], 'Velocidad Máxima Promedio por Posición',
+                             'Posición', 'Velocidad Máxima (km/h)', 'Viridis'),
+        report_charts.barras(pos_data['position_name'], pos_data['total_player_load'], 'Player Load Promedio por Posición',
+                             'Posición', 'Player Load', 'Bluered'),
+    ], doc))
+
+    # Resumen del análisis general
+    elements.append(Paragraph("Análisis General", estilos['subtitulo']))
+    elements.extend(_parrafos_analisis(general_analysis, estilos['analisis']))
+    elements.append(Spacer(1, 15))
+
+    # Top jugadores por velocidad
+    elements.append(Paragraph("Top 5 Jugadores por Velocidad Máxima", estilos['subtitulo']))
+    top_velocidad = df.sort_values('max_vel', ascending=False).head(5)
+    vel_data = [["Jugador", "Posición", "Equipo", "Vel. Máx. (km/h)"]] + [
+        [row['athlete_name'], row['position_name'], row['team_name'], f"{row['max_vel']:.2f}"]
+        for _, row in top_velocidad.iterrows()
+    ]
+    elements.append(_tabla_listado(vel_data, [4*cm, 4*cm, 4*cm, 3*cm]))
+    elements.append(Spacer(1, 15))
+
+    # Análisis de velocidad y de distancia
+    elements.append(Paragraph("Análisis de Velocidad", estilos['subtitulo']))
+    elements.extend(_parrafos_analisis(velocity_analysis, estilos['analisis']))
+    elements.append(Spacer(1, 15))
+
+    elements.append(Paragraph("Análisis de Distancia", estilos['subtitulo']))
+    elements.extend(_parrafos_analisis(distance_analysis, estilos['analisis']))
+    elements.append(Spacer(1, 20))
+
+    # Conclusiones y notas
+    elements.append(Paragraph("Conclusiones", estilos['subtitulo']))
+    elements.append(Paragraph("""
+Este informe combina datos objetivos con análisis generados automáticamente.
+Las recomendaciones están basadas en los patrones detectados en los datos y deben ser
+evaluadas junto con el criterio profesional del cuerpo técnico.
+
+Los análisis de velocidad, distancia y carga de trabajo pueden ayudar a optimizar el
+rendimiento de los atletas y prevenir lesiones al ajustar los entrenamientos de forma
+personalizada según las características de cada jugador y posición.
+    """, estilos['normal']))
+
+    elements.extend(_pie("Dashboard Deportivo - Análisis GPS - Documento generado automáticamente", doc, estilos['info']))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def informe_performance(df, division, team, position, player, metric):
+    """
+    Arma el informe PDF de rendimiento deportivo para una métrica.
+
+    Args:
+        df: Datos de rendimiento ya filtrados
+        division, team, position, player: Filtros aplicados
+        metric: Métrica principal del informe
+
+    Returns:
+        Bytes del PDF
+    """
+    buffer = io.BytesIO()
+    doc = _documento(buffer)
+    estilos = _estilos()
+    nombre_metrica = metric.replace('_', ' ').title()
+
+    elements = _encabezado("Informe de Rendimiento Deportivo", doc, estilos)
+
+    # Sección de filtros aplicados
+    elements.append(Paragraph("Filtros aplicados", estilos['subtitulo']))
+    elements.append(_tabla_filtros(
+        _filas_filtros(division, team, position, player) + [["Métrica principal", nombre_metrica]]
+    ))
+    elements.append(Spacer(1, 20))
+
+    if df.empty:
+        elements.append(Paragraph("No hay datos disponibles con los filtros seleccionados.", estilos['normal']))
+        doc.build(elements)
+        return buffer.getvalue()
+
+    # Estadísticas Básicas
+    elements.append(Paragraph("Estadísticas Básicas", estilos['subtitulo']))
+    metric_prom = df[metric].mean()
+    metric_max = df[metric].max()
+    metric_min = df[metric].min()
+
+    # Jugador con el valor máximo
+    idx_max = df[metric].idxmax()
+    jugador_max = df.loc[idx_max, 'jugador']
+    equipo_max = df.loc[idx_max, 'equipo']
+    posicion_max = df.loc[idx_max, 'posicion']
+
+    elements.append(_tabla_estadisticas([
+        ["Métrica", "Valor"],
+        ["Total Jugadores", f"{df['jugador'].nunique()}"],
+        [f"{nombre_metrica} Promedio", f"{metric_prom:.2f}"],
+        [f"{nombre_metrica} Máximo", f"{metric_max:.2f}"],
+        [f"{nombre_metrica} Mínimo", f"{metric_min:.2f}"],
+        ["Jugador Destacado", f"{jugador_max} ({posicion_max}, {equipo_max})"]
+    ]))
+    elements.append(Spacer(1, 15))
+
+    # Top jugadores por la métrica seleccionada
+    elements.append(Paragraph(f"Top 5 Jugadores por {nombre_metrica}", estilos['subtitulo']))
+    top_metric = df.groupby(['jugador', 'posicion', 'equipo'], observed=True)[metric].mean().reset_index()
+    top_metric = top_metric.sort_values(metric, ascending=False).head(5)
+    top_data = [["Jugador", "Posición", "Equipo", nombre_metrica]] + [
+        [row['jugador'], row['posicion'], row['equipo'], f"{row[metric]:.2f}"]
+        for _, row in top_metric.iterrows()
+    ]
+    elements.append(_tabla_listado(top_data, [4*cm, 4*cm, 4*cm, 3*cm]))
+    elements.append(Spacer(1, 20))
+
+    # Evolución y perfil del jugador
+    posicion_metric = df.groupby('posicion', observed=True)[metric].mean().reset_index()
+    posicion_metric = posicion_metric.sort_values(metric, ascending=False)
+    evolucion = df.groupby(df['fecha'].dt.date)[metric].mean()
+    elements.append(Paragraph("Gráficos", estilos['subtitulo']))
+    elements.extend(_graficos([
+        report_charts.linea(evolucion.index, evolucion.values, f"Evolución de {nombre_metrica}", 'Fecha', nombre_metrica),
+        report_charts.barras(posicion_metric['posicion'], posicion_metric[metric], f"{nombre_metrica} por Posición",
+                             'Posición', nombre_metrica),
+        _grafico_radar(df, player, metric),
+    ], doc))
+
+    # Análisis por posición
+    elements.append(Paragraph("Análisis por Posición", estilos['subtitulo']))
+    pos_data = [["Posición", nombre_metrica]] + [
+        [row['posicion'], f"{row[metric]:.2f}"] for _, row in posicion_metric.iterrows()
+    ]
+    elements.append(_tabla_listado(pos_data, [8*cm, 7*cm], tamaño_fuente=10))
+    elements.append(Spacer(1, 20))
+
+    # Conclusiones y recomendaciones
+    elements.append(Paragraph("Conclusiones y Recomendaciones", estilos['subtitulo']))
+    conclusions_text = f"""
+    Este informe presenta un análisis del rendimiento deportivo basado en la métrica {nombre_metrica}.
+
+    Los datos analizados muestran un valor promedio de {metric_prom:.2f}, con un máximo de {metric_max:.2f} alcanzado por {jugador_max} ({posicion_max}).
+
+    El análisis por posición revela que los jugadores en la posición de {posicion_metric.iloc[0]['posicion']} tienen el mejor rendimiento promedio en esta métrica ({posicion_metric.iloc[0][metric]:.2f}).
+    """
+    elements.append(Paragraph(conclusions_text, estilos['normal']))
+    elements.append(Spacer(1, 10))
+    elements.append(Paragraph(RECOMENDACIONES_PERFORMANCE.get(metric, RECOMENDACIONES_GENERALES), estilos['normal']))
+
+    elements.extend(_pie("Dashboard Deportivo - Análisis de Rendimiento - Documento generado automáticamente",
+                         doc, estilos['pie']))
+
+    doc.build(elements)
+    return buffer.getvalue()
@@ -0,0 +1,135 @@
+# utils/report_cache.py
+"""
+Caché en disco de informes ya generados (bytes de los PDF).
+
+Cada informe se guarda como `<huella>_<hash de la clave>.pdf`, donde la
+huella identifica la versión de los datos (DataStore.fingerprint) y la clave
+los filtros. Con datos nuevos cambian todas las claves; `prune` borra lo que
+quedó de versiones anteriores y ya nadie usa. El tamaño total se acota
+borrando primero los informes usados hace más tiempo.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+def directorio_por_defecto():
+    """Directorio base de los informes (DASHBOARD_REPORTS_DIR o el temporal del sistema)."""
+    return os.environ.get("DASHBOARD_REPORTS_DIR") or os.path.join(tempfile.gettempdir(), "dashboard_informes")
+
+
+class ReportCache:
+    """Informes generados por versión de los datos y filtros, compartidos entre procesos."""
+
+    def __init__(self, nombre, directorio=None, max_bytes=200 * 1024 * 1024, extension=".pdf"):
+        """
+        Args:
+            nombre: Subdirectorio de la caché (por ejemplo la página)
+            directorio: Directorio base (por defecto el temporal del sistema)
+            max_bytes: Tamaño máximo total de los informes guardados
+            extension: Extensión de los archivos guardados
+        """
+        self.directorio = os.path.join(directorio or directorio_por_defecto(), nombre)
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._lock = threading.Lock()
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta(self, huella, clave):
+        resumen = hashlib.sha256(json.dumps(clave, sort_keys=True, default=str).encode()).hexdigest()[:32]
+        return os.path.join(self.directorio, f"{huella}_{resumen}{self.extension}")
+
+    def get(self, huella, clave):
+        """
+        Devuelve los bytes del informe guardado o None.
+
+        Args:
+            huella: Versión de los datos
+            clave: Filtros del informe (lista o diccionario serializable a JSON)
+        """
+        ruta = self._ruta(huella, clave)
+        try:
+            with open(ruta, "rb") as f:
+                contenido = f.read()
+        except OSError:
+            return None
+
+        # La fecha de modificación marca el último uso para el recorte
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        return contenido
+
+    def put(self, huella, clave, contenido):
+        """Guarda un informe y recorta la caché si supera el tamaño máximo."""
+        ruta = self._ruta(huella, clave)
+        tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(contenido)
+            os.replace(tmp, ruta)
+        except OSError as e:
+            print(f"No se pudo guardar el informe en la caché: {e}")
+            return
+        self._recortar()
+
+    def _archivos(self):
+        """Lista (ruta, tamaño, último uso) de los informes guardados."""
+        archivos = []
+        try:
+            nombres = os.listdir(self.directorio)
+        except OSError:
+            return archivos
+        for nombre in nombres:
+            if not nombre.endswith(self.extension):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                stat = os.stat(ruta)
+            except OSError:
+                continue
+            archivos.append((ruta, stat.st_size, stat.st_mtime))
+        return archivos
+
+    def _recortar(self):
+        """Borra los informes usados hace más tiempo hasta quedar bajo max_bytes."""
+        with self._lock:
+            archivos = self._archivos()
+            total = sum(tamaño for _, tamaño, _ in archivos)
+            for ruta, tamaño, _ in sorted(archivos, key=lambda archivo: archivo[2]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(ruta)
+                    total -= tamaño
+                except OSError:
+                    pass
+
+    def prune(self, huella, gracia=600):
+        """
+        Borra los informes de versiones de los datos distintas de `huella`.
+
+        Los usados en los últimos `gracia` segundos se conservan: otro worker
+        que todavía no recargó los datos puede estar sirviéndolos.
+        """
+        limite = time.time() - gracia
+        with self._lock:
+            for ruta, _, usado in self._archivos():
+                if not os.path.basename(ruta).startswith(f"{huella}_") and usado < limite:
+                    try:
+                        os.remove(ruta)
+                    except OSError:
+                        pass
+
+    def clear(self):
+        """Borra todos los informes guardados."""
+        with self._lock:
+            for ruta, _, _ in self._archivos():
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
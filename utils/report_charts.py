@@ -0,0 +1,228 @@
+# utils/report_charts.py
+"""
+Gráficos de los informes PDF.
+
+Cada gráfico se describe con un diccionario simple (tipo, títulos y datos ya
+agregados) y su hash identifica la imagen. Con kaleido (en requirements.txt)
+se arma la misma figura de Plotly que muestra el dashboard y se rasteriza a
+PNG; los PNG se guardan en disco por hash, compartidos por todos los procesos,
+así un lote de informes no vuelve a dibujar los gráficos repetidos (por
+ejemplo los de un equipo en los informes de cada uno de sus jugadores). Si
+kaleido no está o falla, el gráfico se dibuja con reportlab.graphics,
+vectorial y sin rasterizar.
+
+Se llama desde utils.pdf_reports, que corre en el pool de procesos de los
+informes: el dibujo nunca ocupa los hilos del servidor.
+"""
+import functools
+import hashlib
+import io
+import json
+
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.charts.spider import SpiderChart
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.lib import colors
+from reportlab.platypus import Image
+
+from .report_cache import ReportCache
+
+try:
+    import kaleido
+except ImportError:  # Sin kaleido: gráficos vectoriales de ReportLab
+    kaleido = None
+
+# Escala de los PNG respecto del tamaño en puntos (nitidez al imprimir)
+ESCALA_PNG = 2
+
+# Extremos de las escalas de colores usadas en el dashboard
+ESCALAS = {
+    'Viridis': ['#440154', '#21918c', '#fde725'],
+    'Bluered': ['#0000ff', '#ff0000'],
+}
+
+_imagenes = None
+
+
+def _cache_imagenes():
+    """Caché de PNG por hash del gráfico (se crea al primer uso en cada proceso)."""
+    global _imagenes
+    if _imagenes is None:
+        _imagenes = ReportCache("graficos", max_bytes=100 * 1024 * 1024, extension=".png")
+    return _imagenes
+
+
+def _numeros(valores):
+    """Lista de floats redondeados: el mismo dato da siempre el mismo hash."""
+    return [round(float(v), 6) for v in valores]
+
+
+def barras(categorias, valores, titulo, titulo_x, titulo_y, escala_colores='Viridis'):
+    """Gráfico de barras coloreadas según su valor (como utils.figure_builders.grafico_barras)."""
+    return dict(tipo='barras', titulo=titulo, titulo_x=titulo_x, titulo_y=titulo_y,
+                escala=escala_colores, x=[str(c) for c in categorias], y=_numeros(valores))
+
+
+def linea(x, y, titulo, titulo_x, titulo_y):
+    """Gráfico de línea con marcadores; las fechas se pasan como texto."""
+    return dict(tipo='linea', titulo=titulo, titulo_x=titulo_x, titulo_y=titulo_y,
+                x=[str(v) for v in x], y=_numeros(y))
+
+
+def radar(etiquetas, series, titulo):
+    """
+    Gráfico de radar en escala 0-100.
+
+    Args:
+        etiquetas: Nombre de cada eje
+        series: Lista de (nombre, valores) en el orden de las etiquetas
+        titulo: Título del gráfico
+    """
+    return dict(tipo='radar', titulo=titulo, etiquetas=list(etiquetas),
+                series=[[str(nombre), _numeros(valores)] for nombre, valores in series])
+
+
+def huella(grafico, ancho, alto):
+    """Hash del gráfico y su tamaño."""
+    texto = json.dumps([grafico, ancho, alto], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def figura_plotly(grafico):
+    """Figura de Plotly de un gráfico, con el mismo estilo que el dashboard."""
+    import plotly.graph_objs as go
+
+    from .figure_builders import grafico_barras, grafico_linea
+
+    if grafico['tipo'] == 'barras':
+        return grafico_barras(grafico['x'], grafico['y'], grafico['titulo'], grafico['titulo_x'],
+                              grafico['titulo_y'], escala_colores=grafico['escala'], formato_texto='.2f')
+    if grafico['tipo'] == 'linea':
+        return grafico_linea(grafico['x'], grafico['y'], grafico['titulo'], grafico['titulo_x'], grafico['titulo_y'])
+
+    fig = go.Figure()
+    estilos = [
+        dict(line=dict(color='darkblue', width=3), fillcolor='rgba(0, 0, 255, 0.2)'),
+        dict(line=dict(color='crimson', width=2, dash='dot'), fillcolor='rgba(220, 20, 60, 0.1)'),
+    ]
+    for (nombre, valores), estilo in zip(grafico['series'], estilos):
+        fig.add_trace(go.Scatterpolar(r=valores, theta=grafico['etiquetas'], fill='toself', name=nombre, **estilo))
+    fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        title=grafico['titulo'],
+        margin=dict(l=40, r=40, t=60, b=60),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.15, xanchor="center", x=0.5)
+    )
+    return fig
+
+
+def _color_escala(escala, t):
+    """Color interpolado en la escala para t entre 0 y 1."""
+    puntos = [colors.HexColor(c) for c in ESCALAS.get(escala, ESCALAS['Viridis'])]
+    tramo = min(int(t * (len(puntos) - 1)), len(puntos) - 2)
+    local = t * (len(puntos) - 1) - tramo
+    return colors.linearlyInterpolatedColor(puntos[tramo], puntos[tramo + 1], 0, 1, local)
+
+
+def _titulo(dibujo, texto, ancho, alto):
+    dibujo.add(String(ancho / 2, alto - 14, texto, fontName='Helvetica-Bold', fontSize=11,
+                      fillColor=colors.darkblue, textAnchor='middle'))
+
+
+@functools.lru_cache(maxsize=256)
+def _dibujo(texto, ancho, alto):
+    """
+    Dibujo vectorial de ReportLab de un gráfico, cuando no hay PNG.
+
+    Se cachea por su JSON solo dentro del proceso: los objetos de los gráficos
+    de ReportLab no se pueden serializar para guardarlos en disco.
+    """
+    grafico = json.loads(texto)
+    dibujo = Drawing(ancho, alto)
+    _titulo(dibujo, grafico['titulo'], ancho, alto)
+
+    if grafico['tipo'] == 'radar':
+        grafico_radar = SpiderChart()
+        lado = alto - 100
+        grafico_radar.x, grafico_radar.y = (ancho - lado) / 2, 55
+        grafico_radar.width = grafico_radar.height = lado
+        grafico_radar.data = [valores for _, valores in grafico['series']]
+        grafico_radar.labels = grafico['etiquetas']
+        grafico_radar.spokeLabels.fontSize = 8
+        for i, color in enumerate([colors.darkblue, colors.crimson][:len(grafico['series'])]):
+            grafico_radar.strands[i].strokeColor = color
+            grafico_radar.strands[i].strokeWidth = 2
+            grafico_radar.strands[i].fillColor = colors.Color(color.red, color.green, color.blue, alpha=0.15)
+        dibujo.add(grafico_radar)
+
+        leyenda = Legend()
+        leyenda.x, leyenda.y = 20, 40
+        leyenda.alignment = 'right'
+        leyenda.fontSize = 8
+        leyenda.colorNamePairs = list(zip([colors.darkblue, colors.crimson], [n for n, _ in grafico['series']]))
+        dibujo.add(leyenda)
+        return dibujo
+
+    x, y = grafico['x'], grafico['y']
+    grafico_xy = VerticalBarChart() if grafico['tipo'] == 'barras' else HorizontalLineChart()
+    grafico_xy.x, grafico_xy.y = 50, 60
+    grafico_xy.width, grafico_xy.height = ancho - 70, alto - 90
+    grafico_xy.data = [y]
+    grafico_xy.valueAxis.valueMin = 0 if min(y, default=0) >= 0 else None
+    grafico_xy.valueAxis.labels.fontSize = 8
+    grafico_xy.categoryAxis.labels.fontSize = 7
+    grafico_xy.categoryAxis.labels.angle = 30 if len(x) > 5 else 0
+    grafico_xy.categoryAxis.labels.boxAnchor = 'ne' if len(x) > 5 else 'n'
+
+    if grafico['tipo'] == 'barras':
+        grafico_xy.categoryAxis.categoryNames = x
+        minimo, maximo = min(y, default=0), max(y, default=0)
+        for i, valor in enumerate(y):
+            t = (valor - minimo) / (maximo - minimo) if maximo > minimo else 0.5
+            grafico_xy.bars[(0, i)].fillColor = _color_escala(grafico['escala'], t)
+        grafico_xy.bars.strokeColor = None
+    else:
+        # Solo unas diez fechas rotuladas
+        paso = max(1, len(x) // 10)
+        grafico_xy.categoryAxis.categoryNames = [v if i % paso == 0 else '' for i, v in enumerate(x)]
+        grafico_xy.lines[0].strokeColor = colors.HexColor('#636efa')
+        grafico_xy.lines[0].strokeWidth = 2
+    dibujo.add(grafico_xy)
+
+    # Título del eje Y, vertical
+    titulo_y = Group(String(0, 0, grafico['titulo_y'], fontSize=8, textAnchor='middle'))
+    titulo_y.translate(14, grafico_xy.y + grafico_xy.height / 2)
+    titulo_y.rotate(90)
+    dibujo.add(titulo_y)
+    return dibujo
+
+
+def _png(grafico, ancho, alto):
+    """PNG de la figura de Plotly, desde la caché en disco si ya se dibujó."""
+    clave = huella(grafico, ancho, alto)
+    # Otra versión de kaleido puede rasterizar distinto
+    version = f"kaleido-{getattr(kaleido, '__version__', '')}"
+    cache = _cache_imagenes()
+    contenido = cache.get(version, clave)
+    if contenido is None:
+        contenido = figura_plotly(grafico).to_image(format="png", width=int(ancho), height=int(alto), scale=ESCALA_PNG)
+        cache.put(version, clave, contenido)
+    return contenido
+
+
+def elemento(grafico, ancho, alto):
+    """
+    Flowable de ReportLab con el gráfico.
+
+    Args:
+        grafico: Diccionario creado con barras, linea o radar
+        ancho, alto: Tamaño en puntos
+    """
+    if kaleido is not None:
+        try:
+            return Image(io.BytesIO(_png(grafico, ancho, alto)), width=ancho, height=alto)
+        except Exception as e:
+            print(f"No se pudo rasterizar el gráfico, se dibuja con ReportLab: {e}")
+    return _dibujo(json.dumps(grafico, sort_keys=True, ensure_ascii=False), ancho, alto)
@@ -0,0 +1,49 @@
+# utils/result_cache.py
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Caché LRU en el servidor para resultados de filtrado.
+
+    Los callbacks guardan en el dcc.Store solo la clave de los filtros y
+    resuelven el DataFrame aquí, en lugar de serializarlo al navegador.
+    """
+
+    def __init__(self, max_entries=32):
+        """
+        Args:
+            max_entries: Cantidad máxima de resultados guardados
+        """
+        self.max_entries = max_entries
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, clave, calcular):
+        """
+        Devuelve el resultado asociado a la clave, calculándolo si no está.
+
+        Args:
+            clave: Tupla hashable que identifica el resultado
+            calcular: Función sin argumentos que produce el resultado
+        """
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                return self._entradas[clave]
+
+        resultado = calcular()
+
+        with self._lock:
+            self._entradas[clave] = resultado
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entries:
+                self._entradas.popitem(last=False)
+
+        return resultado
+
+    def clear(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._entradas.clear()
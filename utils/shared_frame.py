@@ -0,0 +1,165 @@
+# utils/shared_frame.py
+"""
+DataFrames compartidos entre procesos mediante archivos mapeados en memoria.
+
+Un proceso publica el frame como un .npy por columna (las categóricas como
+códigos + categorías) dentro de un directorio de generación bajo /dev/shm;
+el resto de los workers lo mapea en modo solo lectura con np.load(mmap_mode='r'),
+de modo que todas las páginas físicas se comparten y adjuntarse no lee ni
+parsea nada. Un archivo `actual.json`, reemplazado de forma atómica, indica la
+generación vigente y la firma del archivo de origen que la produjo.
+
+Se activa con la variable de entorno DASHBOARD_MEMORIA_COMPARTIDA=1.
+"""
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin memoria compartida
+    fcntl = None
+
+# Generaciones anteriores que se conservan para los workers que todavía las abren
+GENERACIONES_CONSERVADAS = 2
+
+
+def directorio_por_defecto():
+    """Directorio base de los frames compartidos (tmpfs si está disponible)."""
+    if os.environ.get("DASHBOARD_SHM_DIR"):
+        return os.environ["DASHBOARD_SHM_DIR"]
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "dashboard")
+
+
+def desde_entorno(nombre):
+    """Devuelve un SharedFrame si la memoria compartida está activada, o None."""
+    if os.environ.get("DASHBOARD_MEMORIA_COMPARTIDA", "0") != "1" or fcntl is None:
+        return None
+    return SharedFrame(nombre)
+
+
+class SharedFrame:
+    """
+    Frame publicado en memoria compartida por generaciones.
+
+    La publicación se serializa entre procesos con un lock de archivo; la
+    lectura no necesita lock porque cada generación es inmutable.
+    """
+
+    def __init__(self, nombre, directorio=None):
+        """
+        Args:
+            nombre: Identificador del frame (por ejemplo "gps")
+            directorio: Directorio base (por defecto /dev/shm/dashboard)
+        """
+        self.nombre = nombre
+        self.directorio = os.path.join(directorio or directorio_por_defecto(), nombre)
+        os.makedirs(self.directorio, exist_ok=True)
+
+    @property
+    def _ruta_actual(self):
+        return os.path.join(self.directorio, "actual.json")
+
+    def current(self):
+        """
+        Devuelve la descripción de la generación vigente, o None si no hay.
+
+        Returns:
+            Diccionario con "generacion" (int) y "firma" (lista) del origen
+        """
+        try:
+            with open(self._ruta_actual) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @contextlib.contextmanager
+    def lock(self):
+        """Lock exclusivo entre procesos para publicar."""
+        with open(os.path.join(self.directorio, ".lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def publish(self, df, firma):
+        """
+        Publica el frame como una generación nueva y la marca como vigente.
+
+        Debe llamarse con `lock()` tomado.
+
+        Args:
+            df: DataFrame a publicar
+            firma: Firma del archivo de origen (para detectar recargas)
+
+        Returns:
+            La descripción de la nueva generación
+        """
+        actual = self.current()
+        generacion = (actual["generacion"] + 1) if actual else 1
+        destino = os.path.join(self.directorio, f"gen-{generacion}")
+        shutil.rmtree(destino, ignore_errors=True)
+        os.makedirs(destino)
+
+        columnas = []
+        for i, col in enumerate(df.columns):
+            serie = df[col]
+            clave = f"c{i}"
+            if isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == object:
+                categorica = isinstance(serie.dtype, pd.CategoricalDtype)
+                cat = serie.cat if categorica else serie.astype('category').cat
+                np.save(os.path.join(destino, f"{clave}_codes.npy"), cat.codes.to_numpy())
+                np.save(os.path.join(destino, f"{clave}_cats.npy"), np.asarray(cat.categories.astype(str), dtype=str))
+                tipo = "category" if categorica else "object"
+            else:
+                np.save(os.path.join(destino, f"{clave}.npy"), serie.to_numpy())
+                tipo = "array"
+            columnas.append({"name": col, "key": clave, "kind": tipo})
+
+        with open(os.path.join(destino, "meta.json"), "w") as f:
+            json.dump({"columnas": columnas}, f)
+
+        descripcion = {"generacion": generacion, "firma": list(firma) if isinstance(firma, tuple) else firma}
+        tmp = f"{self._ruta_actual}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(descripcion, f)
+        os.replace(tmp, self._ruta_actual)
+
+        # Los procesos que ya mapearon una generación borrada la siguen viendo
+        for viejo in os.listdir(self.directorio):
+            if viejo.startswith("gen-") and int(viejo[4:]) <= generacion - GENERACIONES_CONSERVADAS:
+                shutil.rmtree(os.path.join(self.directorio, viejo), ignore_errors=True)
+
+        return descripcion
+
+    def attach(self, descripcion):
+        """
+        Mapea una generación publicada como DataFrame de solo lectura.
+
+        Args:
+            descripcion: Resultado de current() o publish()
+        """
+        origen = os.path.join(self.directorio, f"gen-{descripcion['generacion']}")
+        with open(os.path.join(origen, "meta.json")) as f:
+            meta = json.load(f)
+
+        datos = {}
+        for col in meta["columnas"]:
+            clave = col["key"]
+            if col["kind"] == "array":
+                datos[col["name"]] = np.load(os.path.join(origen, f"{clave}.npy"), mmap_mode='r')
+            else:
+                codigos = np.load(os.path.join(origen, f"{clave}_codes.npy"), mmap_mode='r')
+                categorias = np.load(os.path.join(origen, f"{clave}_cats.npy")).astype(object)
+                # Sin validar para que los códigos sigan siendo el array mapeado
+                valores = pd.Categorical.from_codes(codigos, dtype=pd.CategoricalDtype(categorias), validate=False)
+                datos[col["name"]] = valores if col["kind"] == "category" else valores.astype(object)
+
+        return pd.DataFrame(datos, copy=False)
@@ -0,0 +1,163 @@
+# utils/single_flight.py
+"""
+Unificación de pedidos idénticos en curso ("single flight").
+
+Cuando varios usuarios piden a la vez el mismo análisis, solo el primero lo
+genera; los demás esperan ese mismo resultado en lugar de encolar otra
+generación idéntica en Ollama. El resultado se publica en un
+concurrent.futures.Future, así lo pueden esperar corrutinas de distintos
+event loops (con asyncio.wrap_future) y hilos del mismo proceso.
+
+La generación corre en una tarea propia y no depende de quién la inició: si
+ese pedido se cancela (por ejemplo porque el usuario cerró la página) sigue
+para los demás, y solo se cancela cuando ya nadie la espera. Si igual se
+cancela desde afuera, uno de los que esperaban la vuelve a iniciar.
+"""
+import asyncio
+import concurrent.futures
+import threading
+
+
+class FlightCancelled(RuntimeError):
+    """La generación compartida se canceló sin que la cancelaran quienes la esperaban."""
+
+
+class _Vuelo:
+    """Una generación en curso: su resultado final y los fragmentos recibidos."""
+
+    def __init__(self):
+        self.futuro = concurrent.futures.Future()
+        # En curso: los que esperan no pueden cancelarlo
+        self.futuro.set_running_or_notify_cancel()
+        self.fragmentos = []
+        self.interesados = 0
+        self.loop = None
+        self.tarea = None
+
+
+class SingleFlight:
+    """Generaciones en curso por clave, compartidas por los pedidos idénticos."""
+
+    def __init__(self, espera_fragmentos=0.05):
+        """
+        Args:
+            espera_fragmentos: Segundos entre consultas de los que siguen un streaming
+        """
+        self.espera_fragmentos = espera_fragmentos
+        self._lock = threading.Lock()
+        self._en_curso = {}
+
+    def _unirse(self, clave):
+        """Devuelve (vuelo, True si este pedido es el que lo inicia)."""
+        with self._lock:
+            vuelo = self._en_curso.get(clave)
+            propio = vuelo is None
+            if propio:
+                vuelo = self._en_curso[clave] = _Vuelo()
+            vuelo.interesados += 1
+            return vuelo, propio
+
+    def _iniciar(self, vuelo, corrutina):
+        """Lanza la generación como tarea del loop en curso."""
+        vuelo.loop = asyncio.get_running_loop()
+        vuelo.tarea = vuelo.loop.create_task(corrutina)
+
+    def _dejar(self, clave, vuelo):
+        """Un pedido deja de esperar; si era el último, se cancela la generación."""
+        with self._lock:
+            vuelo.interesados -= 1
+            if vuelo.interesados > 0 or vuelo.futuro.done():
+                return
+            # Los pedidos nuevos no se suman a una generación que se va a cancelar
+            if self._en_curso.get(clave) is vuelo:
+                del self._en_curso[clave]
+        try:
+            vuelo.loop.call_soon_threadsafe(vuelo.tarea.cancel)
+        except RuntimeError:
+            # El loop de la generación ya se cerró
+            pass
+
+    def _terminar(self, clave, vuelo, resultado=None, error=None):
+        with self._lock:
+            if self._en_curso.get(clave) is vuelo:
+                del self._en_curso[clave]
+        if error is not None:
+            vuelo.futuro.set_exception(error)
+        else:
+            vuelo.futuro.set_result(resultado)
+
+    async def _generar(self, clave, vuelo, funcion):
+        try:
+            resultado = await funcion()
+        except asyncio.CancelledError:
+            self._terminar(clave, vuelo, error=FlightCancelled("La generación se canceló"))
+            raise
+        except Exception as e:
+            self._terminar(clave, vuelo, error=e)
+        else:
+            self._terminar(clave, vuelo, resultado=resultado)
+
+    async def _generar_fragmentos(self, clave, vuelo, funcion):
+        try:
+            async for fragmento in funcion():
+                vuelo.fragmentos.append(fragmento)
+        except asyncio.CancelledError:
+            self._terminar(clave, vuelo, error=FlightCancelled("La generación se canceló"))
+            raise
+        except Exception as e:
+            self._terminar(clave, vuelo, error=e)
+        else:
+            self._terminar(clave, vuelo, resultado="".join(vuelo.fragmentos))
+
+    async def run(self, clave, funcion):
+        """
+        Devuelve el resultado de `await funcion()`, compartido con los pedidos
+        simultáneos de la misma clave.
+        """
+        while True:
+            vuelo, propio = self._unirse(clave)
+            if propio:
+                self._iniciar(vuelo, self._generar(clave, vuelo, funcion))
+            try:
+                return await asyncio.wrap_future(vuelo.futuro)
+            except FlightCancelled:
+                # Nadie de los que esperaban la canceló: se vuelve a generar
+                continue
+            finally:
+                self._dejar(clave, vuelo)
+
+    async def stream(self, clave, funcion):
+        """
+        Recorre el generador asíncrono `funcion()` compartiéndolo con los
+        pedidos simultáneos de la misma clave: los que llegan después reciben
+        primero los fragmentos ya generados y luego los nuevos.
+        """
+        while True:
+            vuelo, propio = self._unirse(clave)
+            if propio:
+                self._iniciar(vuelo, self._generar_fragmentos(clave, vuelo, funcion))
+
+            enviados = 0
+            texto_enviado = 0
+            try:
+                while True:
+                    terminado = vuelo.futuro.done()
+                    while enviados < len(vuelo.fragmentos):
+                        fragmento = vuelo.fragmentos[enviados]
+                        enviados += 1
+                        texto_enviado += len(fragmento)
+                        yield fragmento
+                    if terminado:
+                        # Si quien generaba no era un streaming, llega todo el texto junto
+                        resto = (await asyncio.wrap_future(vuelo.futuro))[texto_enviado:]
+                        if resto:
+                            yield resto
+                        return
+                    await asyncio.sleep(self.espera_fragmentos)
+            except FlightCancelled:
+                # Sin texto entregado todavía se puede empezar de nuevo; si no, se
+                # mezclarían dos respuestas distintas del modelo
+                if texto_enviado:
+                    raise
+            finally:
+                self._dejar(clave, vuelo)
@@ -0,0 +1,43 @@
+# wsgi.py
+"""
+Punto de entrada de producción.
+
+Expone `server` (la app Flask) sin modo debug ni recarga en caliente, y antes
+de aceptar tráfico carga los datos, construye los índices y deja en caché las
+figuras de la vista inicial de cada página:
+
+    gunicorn wsgi:server          (usa gunicorn.conf.py)
+    python wsgi.py                (servidor de Flask, sin debug)
+"""
+import multiprocessing
+import os
+import time
+
+from app import app, server
+from pages.gps import iniciar_ingesta_gps, precalentar_gps
+from pages.performance import precalentar_performance
+
+# Sin herramientas de desarrollo: ni recarga en caliente ni errores en el navegador
+app.enable_dev_tools(debug=False)
+
+
+def precalentar():
+    """Deja listos los datos y las cachés de la vista inicial de cada página."""
+    for nombre, funcion in [("GPS", precalentar_gps), ("Performance", precalentar_performance)]:
+        inicio = time.perf_counter()
+        try:
+            funcion()
+            print(f"Página {nombre} precalentada en {time.perf_counter() - inicio:.2f} s")
+        except Exception as e:
+            # Un dataset con problemas no debe impedir que arranque el resto
+            print(f"Error al precalentar la página {nombre}: {e}")
+
+
+# Los procesos de los informes PDF importan este módulo al arrancar con `python wsgi.py`
+if multiprocessing.parent_process() is None:
+    precalentar()
+
+if __name__ == "__main__":
+    # Con gunicorn la inicia cada worker (post_fork en gunicorn.conf.py)
+    iniciar_ingesta_gps()
+    app.run(host=os.environ.get("HOST", "0.0.0.0"), port=int(os.environ.get("PORT", 8060)), debug=False)